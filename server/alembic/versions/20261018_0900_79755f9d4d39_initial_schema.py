@@ -0,0 +1,148 @@
+"""initial schema
+
+Revision ID: 79755f9d4d39
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '79755f9d4d39'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('locations',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('address', sa.String(length=500), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('is_dog_friendly', sa.Boolean(), nullable=True),
+    sa.Column('tags', postgresql.ARRAY(sa.String()), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('nickname', sa.String(length=50), nullable=False),
+    sa.Column('avatar', sa.String(length=500), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('phone')
+    )
+    op.create_table('dogs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('breed', sa.String(length=50), nullable=False),
+    sa.Column('size', sa.Enum('small', 'medium', 'large', 'giant', name='dogsize'), nullable=False),
+    sa.Column('gender', sa.Enum('male', 'female', name='doggender'), nullable=False),
+    sa.Column('age_months', sa.Integer(), nullable=False),
+    sa.Column('mbti', sa.String(length=4), nullable=True),
+    sa.Column('avatar', sa.String(length=500), nullable=True),
+    sa.Column('images', postgresql.ARRAY(sa.String()), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('sessions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('creator_id', sa.UUID(), nullable=False),
+    sa.Column('location_id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('scheduled_at', sa.DateTime(), nullable=False),
+    sa.Column('max_dogs', sa.Integer(), nullable=False),
+    sa.Column('requirements', sa.JSON(), nullable=True),
+    sa.Column(
+        'status',
+        sa.Enum('recruiting', 'full', 'upcoming', 'ended', 'cancelled', name='sessionstatus'),
+        nullable=True,
+    ),
+    sa.Column('chat_group_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('chat_groups',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_foreign_key(
+        'sessions_chat_group_id_fkey', 'sessions', 'chat_groups', ['chat_group_id'], ['id']
+    )
+    op.create_table('posts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('dog_id', sa.UUID(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('images', postgresql.ARRAY(sa.String()), nullable=True),
+    sa.Column('tags', postgresql.ARRAY(sa.String()), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['dog_id'], ['dogs.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('session_participants',
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('dog_id', sa.UUID(), nullable=False),
+    sa.Column('joined_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['dog_id'], ['dogs.id'], ),
+    sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ),
+    sa.PrimaryKeyConstraint('session_id', 'dog_id')
+    )
+    op.create_table('chat_messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('group_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column(
+        'message_type',
+        sa.Enum('text', 'voice', 'location', 'system', name='chatmessagetype'),
+        nullable=True,
+    ),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['group_id'], ['chat_groups.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('comments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('post_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('comments')
+    op.drop_table('chat_messages')
+    op.drop_table('session_participants')
+    op.drop_table('posts')
+    op.drop_constraint('sessions_chat_group_id_fkey', 'sessions', type_='foreignkey')
+    op.drop_table('chat_groups')
+    op.drop_table('sessions')
+    op.drop_table('dogs')
+    op.drop_table('users')
+    op.drop_table('locations')
+    sa.Enum(name='chatmessagetype').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='sessionstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='doggender').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='dogsize').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,63 @@
+"""add location geohash
+
+Revision ID: 2939aac51ad6
+Revises: 79755f9d4d39
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.core import geo
+
+# revision identifiers, used by Alembic.
+revision: str = '2939aac51ad6'
+down_revision: Union[str, None] = '79755f9d4d39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    op.add_column(
+        'locations', sa.Column('geohash', sa.String(length=12, collation='C'), nullable=True)
+    )
+
+    if not context.is_offline_mode():
+        _backfill_geohash(op.get_bind())
+
+    op.alter_column('locations', 'geohash', nullable=False)
+    op.create_index(op.f('ix_locations_geohash'), 'locations', ['geohash'], unique=False)
+
+
+def _backfill_geohash(bind) -> None:
+    """Backfill existing rows in batches; geohash encoding is done in Python."""
+    locations = sa.table(
+        'locations',
+        sa.column('id', sa.UUID()),
+        sa.column('latitude', sa.Float()),
+        sa.column('longitude', sa.Float()),
+        sa.column('geohash', sa.String()),
+    )
+    while True:
+        rows = bind.execute(
+            sa.select(locations.c.id, locations.c.latitude, locations.c.longitude)
+            .where(locations.c.geohash.is_(None))
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            locations.update()
+            .where(locations.c.id == sa.bindparam('_id'))
+            .values(geohash=sa.bindparam('_geohash')),
+            [{'_id': row.id, '_geohash': geo.encode(row.latitude, row.longitude)} for row in rows],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_locations_geohash'), table_name='locations')
+    op.drop_column('locations', 'geohash')
@@ -0,0 +1,55 @@
+"""chat history index
+
+Revision ID: e1a0c7b587ab
+Revises: 2939aac51ad6
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a0c7b587ab'
+down_revision: Union[str, None] = '2939aac51ad6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so a large chat_messages table stays writable
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_chat_messages_group_created_id',
+            'chat_messages',
+            ['group_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+    # Groups no longer load their messages to cascade a delete
+    op.drop_constraint('chat_messages_group_id_fkey', 'chat_messages', type_='foreignkey')
+    op.create_foreign_key(
+        'chat_messages_group_id_fkey',
+        'chat_messages',
+        'chat_groups',
+        ['group_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('chat_messages_group_id_fkey', 'chat_messages', type_='foreignkey')
+    op.create_foreign_key(
+        'chat_messages_group_id_fkey', 'chat_messages', 'chat_groups', ['group_id'], ['id']
+    )
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_chat_messages_group_created_id',
+            table_name='chat_messages',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,138 @@
+"""partition chat messages by month
+
+Revision ID: 5b7d2e9c41f3
+Revises: e1a0c7b587ab
+Create Date: 2026-10-18 09:30:00.000000
+
+Rebuilds chat_messages as a table range-partitioned on created_at, with one
+partition per month plus a default partition as a safety net. Existing rows
+are copied across. Later months are created by the chat archiver
+(app.services.chat_archive).
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7d2e9c41f3'
+down_revision: Union[str, None] = 'e1a0c7b587ab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+message_type = postgresql.ENUM(
+    'text', 'voice', 'location', 'system', name='chatmessagetype', create_type=False
+)
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _create_partitions(first: datetime, last: datetime) -> None:
+    month = first
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE chat_messages_p{month:%Y_%m} PARTITION OF chat_messages "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+        )
+        month = _add_months(month, 1)
+
+
+def upgrade() -> None:
+    op.add_column('chat_groups', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+    op.rename_table('chat_messages', 'chat_messages_unpartitioned')
+    op.execute(
+        'ALTER TABLE chat_messages_unpartitioned '
+        'RENAME CONSTRAINT chat_messages_pkey TO chat_messages_unpartitioned_pkey'
+    )
+    op.drop_index('ix_chat_messages_group_created_id', table_name='chat_messages_unpartitioned')
+
+    op.create_table('chat_messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('group_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('message_type', message_type, nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(
+        ['group_id'], ['chat_groups.id'], name='chat_messages_group_id_fkey', ondelete='CASCADE'
+    ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='chat_messages_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', 'created_at', name='chat_messages_pkey'),
+    postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index(
+        'ix_chat_messages_group_created_id',
+        'chat_messages',
+        ['group_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+    current = _month_start(datetime.utcnow())
+    first = current
+    if not context.is_offline_mode():
+        oldest = op.get_bind().scalar(
+            sa.text('SELECT min(created_at) FROM chat_messages_unpartitioned')
+        )
+        if oldest is not None:
+            first = min(first, _month_start(oldest))
+    _create_partitions(first, _add_months(current, MONTHS_AHEAD))
+    op.execute('CREATE TABLE chat_messages_default PARTITION OF chat_messages DEFAULT')
+
+    op.execute(
+        'INSERT INTO chat_messages (id, group_id, user_id, content, message_type, created_at) '
+        'SELECT id, group_id, user_id, content, message_type, created_at '
+        'FROM chat_messages_unpartitioned'
+    )
+    op.drop_table('chat_messages_unpartitioned')
+
+
+def downgrade() -> None:
+    # Messages already moved to cold storage are not brought back
+    op.rename_table('chat_messages', 'chat_messages_partitioned')
+    op.execute(
+        'ALTER TABLE chat_messages_partitioned '
+        'RENAME CONSTRAINT chat_messages_pkey TO chat_messages_partitioned_pkey'
+    )
+    op.drop_index('ix_chat_messages_group_created_id', table_name='chat_messages_partitioned')
+
+    op.create_table('chat_messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('group_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('message_type', message_type, nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(
+        ['group_id'], ['chat_groups.id'], name='chat_messages_group_id_fkey', ondelete='CASCADE'
+    ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='chat_messages_user_id_fkey'),
+    sa.PrimaryKeyConstraint('id', name='chat_messages_pkey'),
+    )
+    op.execute(
+        'INSERT INTO chat_messages (id, group_id, user_id, content, message_type, created_at) '
+        'SELECT id, group_id, user_id, content, message_type, created_at '
+        'FROM chat_messages_partitioned'
+    )
+    op.drop_table('chat_messages_partitioned')
+    op.create_index(
+        'ix_chat_messages_group_created_id',
+        'chat_messages',
+        ['group_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+    op.drop_column('chat_groups', 'archived_at')
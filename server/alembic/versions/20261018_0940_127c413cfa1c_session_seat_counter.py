@@ -0,0 +1,41 @@
+"""session seat counter
+
+Revision ID: 127c413cfa1c
+Revises: 5b7d2e9c41f3
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '127c413cfa1c'
+down_revision: Union[str, None] = '5b7d2e9c41f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'sessions',
+        sa.Column('current_dogs', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.execute(
+        'UPDATE sessions SET current_dogs = counts.total '
+        'FROM (SELECT session_id, count(*) AS total FROM session_participants '
+        'GROUP BY session_id) AS counts '
+        'WHERE sessions.id = counts.session_id'
+    )
+    # Sessions oversold before the counter existed keep their participants
+    op.execute('UPDATE sessions SET max_dogs = current_dogs WHERE current_dogs > max_dogs')
+    op.create_check_constraint(
+        'ck_sessions_seats', 'sessions', 'current_dogs >= 0 AND current_dogs <= max_dogs'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_sessions_seats', 'sessions', type_='check')
+    op.drop_column('sessions', 'current_dogs')
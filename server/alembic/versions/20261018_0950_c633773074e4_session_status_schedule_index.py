@@ -0,0 +1,39 @@
+"""session status schedule index
+
+Revision ID: c633773074e4
+Revises: 127c413cfa1c
+Create Date: 2026-10-18 09:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c633773074e4'
+down_revision: Union[str, None] = '127c413cfa1c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_sessions_status_scheduled_at',
+            'sessions',
+            ['status', 'scheduled_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_sessions_status_scheduled_at',
+            table_name='sessions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
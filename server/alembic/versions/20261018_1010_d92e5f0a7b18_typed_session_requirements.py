@@ -0,0 +1,162 @@
+"""typed session requirements
+
+Revision ID: d92e5f0a7b18
+Revises: 8f4a1d6b2c95
+Create Date: 2026-10-18 10:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd92e5f0a7b18'
+down_revision: Union[str, None] = '8f4a1d6b2c95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ANY = '*'
+MAX_AGE_MONTHS = 360
+SIZES = ['small', 'medium', 'large', 'giant']
+MBTI_TYPES = {a + b + c + d for a in 'EI' for b in 'SN' for c in 'TF' for d in 'JP'}
+
+GIN_INDEXES = {
+    'ix_sessions_allowed_sizes': 'allowed_sizes',
+    'ix_sessions_allowed_breeds': 'allowed_breeds',
+    'ix_sessions_allowed_mbti': 'allowed_mbti',
+}
+
+sessions = sa.table(
+    'sessions',
+    sa.column('id', sa.UUID()),
+    sa.column('requirements', sa.JSON()),
+    sa.column('allowed_sizes', postgresql.ARRAY(sa.String())),
+    sa.column('age_min_months', sa.Integer()),
+    sa.column('age_max_months', sa.Integer()),
+    sa.column('allowed_breeds', postgresql.ARRAY(sa.String())),
+    sa.column('allowed_mbti', postgresql.ARRAY(sa.String())),
+)
+
+
+def _months(value):
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= MAX_AGE_MONTHS:
+        return value
+    return None
+
+
+def _typed(requirements):
+    """Turn free-form requirements JSON into the shape SessionRequirements accepts."""
+    sizes = [size for size in SIZES if size in (requirements.get('sizes') or ())]
+    low, high = requirements.get('size_min'), requirements.get('size_max')
+    if low in SIZES or high in SIZES:
+        start = SIZES.index(low) if low in SIZES else 0
+        stop = SIZES.index(high) + 1 if high in SIZES else len(SIZES)
+        sizes = [size for size in sizes or SIZES if size in SIZES[start:stop]]
+    if len(sizes) == len(SIZES):
+        sizes = []
+
+    age_min = _months(requirements.get('age_min_months'))
+    age_max = _months(requirements.get('age_max_months'))
+    if age_min is not None and age_max is not None and age_min > age_max:
+        age_min, age_max = age_max, age_min
+
+    breeds = sorted(
+        {
+            breed.strip()
+            for breed in requirements.get('breeds') or ()
+            if isinstance(breed, str) and breed.strip()
+        }
+    )
+    mbti = sorted(
+        {
+            value.upper()
+            for value in requirements.get('mbti') or ()
+            if isinstance(value, str) and value.upper() in MBTI_TYPES
+        }
+    )
+    return {
+        'sizes': sizes,
+        'age_min_months': age_min,
+        'age_max_months': age_max,
+        'breeds': breeds,
+        'mbti': mbti,
+    }
+
+
+def upgrade() -> None:
+    for name, length in (('allowed_sizes', 10), ('allowed_breeds', 50), ('allowed_mbti', 4)):
+        op.add_column(
+            'sessions',
+            sa.Column(
+                name,
+                postgresql.ARRAY(sa.String(length=length)),
+                server_default='{*}',
+                nullable=False,
+            ),
+        )
+    op.add_column(
+        'sessions', sa.Column('age_min_months', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.add_column(
+        'sessions',
+        sa.Column(
+            'age_max_months', sa.Integer(), server_default=str(MAX_AGE_MONTHS), nullable=False
+        ),
+    )
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(sessions.c.id, sessions.c.requirements).where(
+            sessions.c.requirements.isnot(None)
+        )
+    ).all()
+    for session_id, requirements in rows:
+        typed = _typed(requirements if isinstance(requirements, dict) else {})
+        bind.execute(
+            sessions.update()
+            .where(sessions.c.id == session_id)
+            .values(
+                requirements=typed,
+                allowed_sizes=typed['sizes'] or [ANY],
+                age_min_months=typed['age_min_months'] or 0,
+                age_max_months=(
+                    MAX_AGE_MONTHS if typed['age_max_months'] is None else typed['age_max_months']
+                ),
+                allowed_breeds=sorted({breed.casefold() for breed in typed['breeds']}) or [ANY],
+                allowed_mbti=typed['mbti'] or [ANY],
+            )
+        )
+
+    with op.get_context().autocommit_block():
+        for index_name, column in GIN_INDEXES.items():
+            op.create_index(
+                index_name,
+                'sessions',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in GIN_INDEXES:
+            op.drop_index(
+                index_name,
+                table_name='sessions',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    for column in (
+        'age_max_months',
+        'age_min_months',
+        'allowed_mbti',
+        'allowed_breeds',
+        'allowed_sizes',
+    ):
+        op.drop_column('sessions', column)
@@ -0,0 +1,62 @@
+"""follows and timelines
+
+Revision ID: 3b7e9c41d0a2
+Revises: d92e5f0a7b18
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9c41d0a2'
+down_revision: Union[str, None] = 'd92e5f0a7b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'follows',
+        sa.Column('follower_id', sa.UUID(), nullable=False),
+        sa.Column('followee_id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['followee_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['follower_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('follower_id', 'followee_id'),
+    )
+    op.create_index(
+        'ix_follows_followee_id_follower_id',
+        'follows',
+        ['followee_id', 'follower_id'],
+        unique=False,
+    )
+    op.add_column(
+        'users', sa.Column('follower_count', sa.Integer(), server_default='0', nullable=False)
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_posts_user_id_created_at',
+            'posts',
+            ['user_id', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_posts_user_id_created_at',
+            table_name='posts',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('users', 'follower_count')
+    op.drop_index('ix_follows_followee_id_follower_id', table_name='follows')
+    op.drop_table('follows')
@@ -0,0 +1,65 @@
+"""post like and comment counters
+
+Revision ID: a5c2e8f61b94
+Revises: 3b7e9c41d0a2
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c2e8f61b94'
+down_revision: Union[str, None] = '3b7e9c41d0a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'post_likes',
+        sa.Column('post_id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('post_id', 'user_id'),
+    )
+    op.add_column(
+        'posts', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.add_column(
+        'posts', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False)
+    )
+
+    op.execute(
+        'UPDATE posts SET comment_count = counted.n'
+        ' FROM (SELECT post_id, count(*) AS n FROM comments GROUP BY post_id) AS counted'
+        ' WHERE posts.id = counted.post_id'
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_comments_post_id',
+            'comments',
+            ['post_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_comments_post_id',
+            table_name='comments',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('posts', 'comment_count')
+    op.drop_column('posts', 'like_count')
+    op.drop_table('post_likes')
@@ -0,0 +1,128 @@
+"""tag index and popularity
+
+Revision ID: 6e1f3a9c7d25
+Revises: a5c2e8f61b94
+Create Date: 2026-10-18 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1f3a9c7d25'
+down_revision: Union[str, None] = 'a5c2e8f61b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Table with a tags column -> the kind recorded in tag_stats
+TAGGED_TABLES = {'posts': 'post', 'locations': 'location'}
+
+# Rows read and rewritten per round trip
+BATCH_SIZE = 1000
+
+# tag_stats.tag is String(30)
+MAX_TAG_LENGTH = 30
+
+
+def _normalize_tag(value: str) -> Union[str, None]:
+    """app.schemas.tag.normalize_tag as of this revision; None where it would reject.
+
+    Copied rather than imported so later changes to the schema cannot
+    change what this migration writes.
+    """
+    tag = value.strip().lstrip('#＃').strip().casefold()
+    if not tag or len(tag) > MAX_TAG_LENGTH:
+        return None
+    return tag
+
+
+def _normalized(tags: list[str]) -> list[str]:
+    """What the tag schemas stored for ``tags`` at this revision: normalized, valid, unique."""
+    normalized = (_normalize_tag(tag) for tag in tags)
+    return list(dict.fromkeys(tag for tag in normalized if tag is not None))
+
+
+def _rewrite_tags(table_name: str) -> None:
+    """Normalize stored tags in Python, the way new tags were written at this revision."""
+    bind = op.get_bind()
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.UUID()),
+        sa.column('tags', postgresql.ARRAY(sa.String())),
+    )
+    rewrite = (
+        table.update()
+        .where(table.c.id == sa.bindparam('row_id'))
+        .values(tags=sa.bindparam('new_tags'))
+    )
+    last = None
+    while True:
+        stmt = (
+            sa.select(table.c.id, table.c.tags)
+            .where(sa.func.cardinality(table.c.tags) > 0)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if last is not None:
+            stmt = stmt.where(table.c.id > last)
+        rows = bind.execute(stmt).all()
+        if not rows:
+            return
+        changed = [
+            {'row_id': row_id, 'new_tags': new_tags}
+            for row_id, tags in rows
+            if (new_tags := _normalized(tags)) != tags
+        ]
+        if changed:
+            bind.execute(rewrite, changed)
+        last = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tag_stats',
+        sa.Column('kind', sa.String(length=10), nullable=False),
+        sa.Column('tag', sa.String(length=30), nullable=False),
+        sa.Column('use_count', sa.Integer(), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'tag'),
+    )
+    op.create_index('ix_tag_stats_last_used_at', 'tag_stats', ['last_used_at'], unique=False)
+
+    for table, kind in TAGGED_TABLES.items():
+        # Stored tags predate normalization; rewrite them the way new ones are written
+        _rewrite_tags(table)
+        op.execute(
+            'INSERT INTO tag_stats (kind, tag, use_count, last_used_at)'
+            f" SELECT '{kind}', tag, count(*), max(created_at)"
+            f' FROM {table}, unnest(tags) AS tag GROUP BY tag'
+        )
+
+    with op.get_context().autocommit_block():
+        for table in TAGGED_TABLES:
+            op.create_index(
+                f'ix_{table}_tags',
+                table,
+                ['tags'],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TAGGED_TABLES:
+            op.drop_index(
+                f'ix_{table}_tags',
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    op.drop_index('ix_tag_stats_last_used_at', table_name='tag_stats')
+    op.drop_table('tag_stats')
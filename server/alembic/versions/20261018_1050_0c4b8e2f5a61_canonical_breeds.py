@@ -0,0 +1,71 @@
+"""canonical breed names
+
+Revision ID: 0c4b8e2f5a61
+Revises: 6e1f3a9c7d25
+Create Date: 2026-10-18 10:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.breeds import canonical_breed
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c4b8e2f5a61'
+down_revision: Union[str, None] = '6e1f3a9c7d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ANY = '*'
+
+dogs = sa.table(
+    'dogs',
+    sa.column('breed', sa.String()),
+)
+
+sessions = sa.table(
+    'sessions',
+    sa.column('id', sa.UUID()),
+    sa.column('requirements', sa.JSON()),
+    sa.column('allowed_breeds', postgresql.ARRAY(sa.String())),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Few distinct spellings; one UPDATE each rewrites every dog that uses it
+    for (breed,) in bind.execute(sa.select(dogs.c.breed).distinct()).all():
+        canonical = canonical_breed(breed)
+        if canonical != breed:
+            bind.execute(dogs.update().where(dogs.c.breed == breed).values(breed=canonical))
+
+    rows = bind.execute(
+        sa.select(sessions.c.id, sessions.c.requirements).where(
+            sessions.c.requirements.isnot(None)
+        )
+    ).all()
+    for session_id, requirements in rows:
+        if not isinstance(requirements, dict):
+            continue
+        breeds = requirements.get('breeds') or []
+        canonical = list(dict.fromkeys(canonical_breed(breed) for breed in breeds))
+        if canonical == breeds:
+            continue
+        bind.execute(
+            sessions.update()
+            .where(sessions.c.id == session_id)
+            .values(
+                requirements={**requirements, 'breeds': canonical},
+                allowed_breeds=sorted({breed.casefold() for breed in canonical}) or [ANY],
+            )
+        )
+
+
+def downgrade() -> None:
+    # The spellings replaced by catalogue names are not kept
+    pass
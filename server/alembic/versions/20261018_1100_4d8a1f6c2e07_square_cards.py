@@ -0,0 +1,78 @@
+"""square session cards
+
+Revision ID: 4d8a1f6c2e07
+Revises: 0c4b8e2f5a61
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8a1f6c2e07'
+down_revision: Union[str, None] = '0c4b8e2f5a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQUARE_AVATAR_WALL_SIZE when this revision was written
+AVATAR_WALL_SIZE = 9
+
+session_status = postgresql.ENUM(
+    'recruiting', 'full', 'upcoming', 'ended', 'cancelled', name='sessionstatus', create_type=False
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'square_cards',
+        sa.Column('session_id', sa.UUID(), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('scheduled_at', sa.DateTime(), nullable=False),
+        sa.Column('status', session_status, nullable=False),
+        sa.Column('current_dogs', sa.Integer(), nullable=False),
+        sa.Column('max_dogs', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.UUID(), nullable=False),
+        sa.Column('location_name', sa.String(length=100), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('geohash', sa.String(length=12, collation='C'), nullable=False),
+        sa.Column(
+            'avatars',
+            postgresql.ARRAY(sa.String(length=500)),
+            server_default='{}',
+            nullable=False,
+        ),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('session_id'),
+    )
+
+    op.execute(
+        'INSERT INTO square_cards (session_id, title, scheduled_at, status, current_dogs,'
+        ' max_dogs, location_id, location_name, latitude, longitude, geohash, avatars,'
+        ' updated_at)'
+        ' SELECT s.id, s.title, s.scheduled_at, s.status, s.current_dogs, s.max_dogs,'
+        ' l.id, l.name, l.latitude, l.longitude, l.geohash,'
+        ' ARRAY(SELECT d.avatar FROM session_participants p JOIN dogs d ON d.id = p.dog_id'
+        f' WHERE p.session_id = s.id ORDER BY p.joined_at, p.dog_id LIMIT {AVATAR_WALL_SIZE}),'
+        ' now() AT TIME ZONE \'utc\''
+        ' FROM sessions s JOIN locations l ON l.id = s.location_id'
+        " WHERE s.status IN ('recruiting', 'full', 'upcoming')"
+    )
+    op.create_index(
+        'ix_square_cards_scheduled_at',
+        'square_cards',
+        ['scheduled_at', 'session_id'],
+        unique=False,
+    )
+    op.create_index('ix_square_cards_geohash', 'square_cards', ['geohash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_square_cards_geohash', table_name='square_cards')
+    op.drop_index('ix_square_cards_scheduled_at', table_name='square_cards')
+    op.drop_table('square_cards')
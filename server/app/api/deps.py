@@ -1,18 +1,54 @@
 """API dependencies."""
-from typing import Annotated
+from typing import Annotated, AsyncGenerator, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import verify_token
-from app.database import get_db
+from app.database import AsyncSessionLocal
 from app.services.auth_service import AuthService
+from app.services.loaders import Loaders
+from app.services.read_routing import read_router
 from app.models.user import User
 
 security = HTTPBearer()
 
 
+def _token_user_id(request: Request) -> Optional[str]:
+    """Return the user id of the request's bearer token, without loading the user."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = verify_token(token)
+    return payload.get("sub") if payload else None
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get a database session on the primary.
+
+    If the request writes, its user reads from the primary for a while, so
+    they see their own changes.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+        if session.info.get("wrote"):
+            user_id = _token_user_id(request)
+            if user_id is not None:
+                await read_router.pin(user_id)
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get a read-only database session, on the replica when one is configured."""
+    async with await read_router.open(_token_user_id(request)) as session:
+        yield session
+
+
+async def get_loaders(db: Annotated[AsyncSession, Depends(get_read_db)]) -> Loaders:
+    """Get the request's batched loaders, on the same session as ``get_read_db``."""
+    return Loaders(db)
+
+
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -34,7 +70,7 @@ async def get_current_user(
             detail="Invalid authentication credentials",
         )
 
-    user = await AuthService.get_user_by_id(db, user_id)
+    user = await AuthService.get_user_by_id_cached(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,89 @@
+"""Health, statistics and metrics routes."""
+from fastapi import APIRouter, Response
+
+from app.core.metrics import metrics
+from app.core.security import token_cache
+from app.services.auth_service import user_cache
+from app.services.breed_catalogue import breed_catalogue
+from app.services.chat_archive import chat_archiver
+from app.services.chat_hub import hub
+from app.services.chat_writer import chat_writer
+from app.services.counters import post_counters
+from app.services.dog_service import dog_cache
+from app.services.matching import session_matcher
+from app.services.media_service import media_uploads
+from app.services.notification_service import push_dispatcher
+from app.services.read_routing import read_router
+from app.services.tag_index import tag_autocomplete
+from app.services.timeline import timelines
+
+router = APIRouter()
+
+
+@router.get("/")
+async def root():
+    return {"message": "Doggy Meetup API", "version": "1.0.0"}
+
+
+@router.get("/health")
+async def health():
+    return {"status": "healthy"}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/health/queries")
+async def query_stats():
+    return metrics.stats()
+
+
+@router.get("/health/database")
+async def database_stats():
+    return read_router.stats()
+
+
+@router.get("/health/cache")
+async def cache_stats():
+    return {
+        "token": token_cache.stats(),
+        "user": user_cache.stats(),
+        "dog": dog_cache.stats(),
+    }
+
+
+@router.get("/health/chat")
+async def chat_stats():
+    return {"hub": hub.stats(), "writer": chat_writer.stats(), "archive": chat_archiver.stats()}
+
+
+@router.get("/health/push")
+async def push_stats():
+    return push_dispatcher.stats()
+
+
+@router.get("/health/matching")
+async def matching_stats():
+    return session_matcher.stats()
+
+
+@router.get("/health/tags")
+async def tag_stats():
+    return tag_autocomplete.stats()
+
+
+@router.get("/health/breeds")
+async def breed_stats():
+    return breed_catalogue.stats()
+
+
+@router.get("/health/feed")
+async def feed_stats():
+    return {"timelines": timelines.stats(), "counters": post_counters.stats()}
+
+
+@router.get("/health/media")
+async def media_stats():
+    return media_uploads.stats()
@@ -0,0 +1,51 @@
+"""JSON responses rendered from ORM rows in one pass.
+
+A route that returns ``DogResponse.model_validate(dog)`` under
+``response_model=DogResponse`` pays for the model several times: the route
+validates the row into a model, then FastAPI dumps that model, validates
+the dump against the response model again and walks the result with
+``jsonable_encoder`` before encoding it. List routes also build a Python
+list of models first.
+
+``render`` and ``render_list`` validate rows into the response model once,
+in pydantic-core, reading ORM attributes directly, and serialize the result
+to JSON bytes in the same place. The route returns those bytes as a
+``Response``, which FastAPI sends as is. Routes keep ``response_model`` for
+the OpenAPI schema.
+
+Already-built models pass through validation untouched, so composite
+responses such as a page of sessions are rendered the same way.
+"""
+from functools import cache
+from typing import Any, Iterable
+
+from fastapi import Response, status
+from pydantic import BaseModel, TypeAdapter
+
+
+class JSONBytesResponse(Response):
+    """A response whose body is already encoded JSON."""
+
+    media_type = "application/json"
+
+
+@cache
+def _adapter(tp: Any) -> TypeAdapter:
+    # Building the validator and serializer is the expensive part; do it once per type
+    return TypeAdapter(tp)
+
+
+def render(
+    model: type[BaseModel], row: Any, status_code: int = status.HTTP_200_OK
+) -> Response:
+    """Render one row, or a mapping whose values may be rows, as ``model``."""
+    adapter = _adapter(model)
+    value = adapter.validate_python(row, from_attributes=True)
+    return JSONBytesResponse(adapter.dump_json(value), status_code=status_code)
+
+
+def render_list(model: type[BaseModel], rows: Iterable[Any]) -> Response:
+    """Render rows as a JSON array of ``model``."""
+    adapter = _adapter(list[model])
+    value = adapter.validate_python(rows, from_attributes=True)
+    return JSONBytesResponse(adapter.dump_json(value))
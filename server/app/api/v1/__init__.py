@@ -1,4 +1,28 @@
 """API v1 package."""
-from app.api.v1 import auth, dogs
+from app.api.v1 import (
+    auth,
+    dogs,
+    groups,
+    locations,
+    media,
+    notifications,
+    posts,
+    sessions,
+    tags,
+    users,
+    websocket,
+)
 
-__all__ = ["auth", "dogs"]
+__all__ = [
+    "auth",
+    "dogs",
+    "groups",
+    "locations",
+    "media",
+    "notifications",
+    "posts",
+    "sessions",
+    "tags",
+    "users",
+    "websocket",
+]
@@ -3,8 +3,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
+from app.api.responses import render
 from app.schemas.auth import SendCodeRequest, LoginRequest, RegisterRequest, TokenResponse
-from app.schemas.user import UserResponse
+from app.schemas.user import UserResponse, UserUpdate
 from app.services.auth_service import AuthService
 from app.models.user import User
 
@@ -47,10 +48,7 @@ async def register(
     # Generate token
     access_token = AuthService.generate_token(user.id)
 
-    return TokenResponse(
-        access_token=access_token,
-        user=UserResponse.model_validate(user)
-    )
+    return render(TokenResponse, {"access_token": access_token, "user": user})
 
 
 @router.post("/login", response_model=TokenResponse)
@@ -77,10 +75,7 @@ async def login(
     # Generate token
     access_token = AuthService.generate_token(user.id)
 
-    return TokenResponse(
-        access_token=access_token,
-        user=UserResponse.model_validate(user)
-    )
+    return render(TokenResponse, {"access_token": access_token, "user": user})
 
 
 @router.get("/me", response_model=UserResponse)
@@ -88,4 +83,20 @@ async def get_current_user_info(
     current_user: User = Depends(get_current_user),
 ):
     """获取当前用户信息"""
-    return UserResponse.model_validate(current_user)
+    return render(UserResponse, current_user)
+
+
+@router.put("/me", response_model=UserResponse)
+async def update_current_user_info(
+    data: UserUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """更新当前用户信息"""
+    user = await AuthService.update_user(db, current_user.id, data)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="用户不存在",
+        )
+    return render(UserResponse, user)
@@ -1,10 +1,15 @@
 """Dog API routes."""
-from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
-from app.schemas.dog import DogCreate, DogResponse, DogUpdate
+from app.api.deps import get_current_user, get_db, get_read_db
+from app.api.responses import render, render_list
+from app.schemas.dog import BreedSuggestion, DogCreate, DogResponse, DogUpdate
+from app.services.breed_catalogue import breed_catalogue
 from app.services.dog_service import DogService
+from app.services.ownership import WriteStatus
 from app.models.user import User
 
 router = APIRouter(prefix="/dogs", tags=["狗狗"])
@@ -13,11 +18,11 @@ router = APIRouter(prefix="/dogs", tags=["狗狗"])
 @router.get("", response_model=list[DogResponse])
 async def get_my_dogs(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """获取我的狗狗列表"""
     dogs = await DogService.get_user_dogs(db, current_user.id)
-    return [DogResponse.model_validate(dog) for dog in dogs]
+    return render_list(DogResponse, dogs)
 
 
 @router.post("", response_model=DogResponse)
@@ -28,14 +33,25 @@ async def create_dog(
 ):
     """创建狗狗档案"""
     dog = await DogService.create_dog(db, current_user.id, data)
-    return DogResponse.model_validate(dog)
+    return render(DogResponse, dog)
+
+
+@router.get("/breeds", response_model=list[BreedSuggestion])
+async def suggest_breeds(
+    q: str = Query("", max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+):
+    """品种联想（支持中文、拼音、英文混合输入）"""
+    matches = breed_catalogue.search(q, limit)
+    return render_list(BreedSuggestion, [match.breed for match in matches])
 
 
 @router.get("/{dog_id}", response_model=DogResponse)
 async def get_dog(
-    dog_id: str,
+    dog_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """获取狗狗详情"""
     dog = await DogService.get_dog_by_id(db, dog_id)
@@ -44,51 +60,43 @@ async def get_dog(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="狗狗不存在",
         )
-    return DogResponse.model_validate(dog)
+    return render(DogResponse, dog)
 
 
 @router.put("/{dog_id}", response_model=DogResponse)
 async def update_dog(
-    dog_id: str,
+    dog_id: UUID,
     data: DogUpdate,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """更新狗狗信息"""
-    # Check ownership
-    if not await DogService.check_ownership(db, dog_id, current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="无权操作此狗狗",
-        )
-
-    dog = await DogService.update_dog(db, dog_id, data)
-    if not dog:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="狗狗不存在",
-        )
-    return DogResponse.model_validate(dog)
+    outcome, dog = await DogService.update_owned_dog(db, dog_id, current_user.id, data)
+    _raise_for_outcome(outcome)
+    return render(DogResponse, dog)
 
 
 @router.delete("/{dog_id}")
 async def delete_dog(
-    dog_id: str,
+    dog_id: UUID,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """删除狗狗"""
-    # Check ownership
-    if not await DogService.check_ownership(db, dog_id, current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="无权操作此狗狗",
-        )
+    outcome = await DogService.delete_owned_dog(db, dog_id, current_user.id)
+    _raise_for_outcome(outcome)
+    return {"message": "删除成功"}
+
 
-    success = await DogService.delete_dog(db, dog_id)
-    if not success:
+def _raise_for_outcome(outcome: WriteStatus) -> None:
+    """Map an ownership-scoped write outcome to an HTTP error."""
+    if outcome is WriteStatus.not_found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="狗狗不存在",
         )
-    return {"message": "删除成功"}
+    if outcome is WriteStatus.forbidden:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权操作此狗狗",
+        )
@@ -0,0 +1,52 @@
+"""Chat group API routes."""
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_read_db
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.schemas.chat import ChatHistoryMessage, ChatHistoryPage
+from app.services.chat_service import ChatService
+from app.models.user import User
+
+router = APIRouter(prefix="/groups", tags=["群聊"])
+
+
+@router.get("/{group_id}/messages", response_model=ChatHistoryPage)
+async def get_group_messages(
+    group_id: UUID,
+    cursor: Optional[str] = Query(None, max_length=200),
+    direction: Literal["before", "after"] = Query("before"),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """获取群聊历史消息（游标分页）"""
+    key = None
+    if cursor is not None:
+        try:
+            key = decode_cursor(cursor, datetime.fromisoformat, UUID)
+        except InvalidCursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的分页游标",
+            )
+
+    if not await ChatService.is_member(db, group_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权访问此群聊",
+        )
+
+    rows, has_more = await ChatService.get_history(
+        db, group_id, cursor=key, direction=direction, limit=limit
+    )
+    return ChatHistoryPage(
+        messages=[ChatHistoryMessage.model_validate(row) for row in rows],
+        has_more=has_more,
+        before_cursor=encode_cursor(rows[0].created_at, rows[0].id) if rows else cursor,
+        after_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if rows else cursor,
+    )
@@ -0,0 +1,55 @@
+"""Location API routes."""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_db, get_read_db
+from app.api.responses import render, render_list
+from app.schemas.location import LocationCreate, LocationResponse, NearbyLocationResponse
+from app.schemas.tag import normalize_tag
+from app.services.location_service import LocationService
+from app.models.user import User
+
+router = APIRouter(prefix="/locations", tags=["地点"])
+
+
+@router.get("/nearby", response_model=list[NearbyLocationResponse])
+async def get_nearby_locations(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(10, gt=0, le=200),
+    limit: int = Query(20, ge=1, le=100),
+    tag: list[str] = Query([], max_length=10),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """获取附近地点（按距离排序，可按标签筛选）"""
+    try:
+        tags = [normalize_tag(value) for value in tag]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的标签",
+        )
+    matches = await LocationService.get_nearby(
+        db, lat, lng, radius_km=radius, limit=limit, tags=tags
+    )
+    return render_list(
+        NearbyLocationResponse,
+        [
+            NearbyLocationResponse.model_construct(
+                **dict(LocationResponse.model_validate(location)),
+                distance_km=round(distance, 3),
+            )
+            for location, distance in matches
+        ],
+    )
+
+
+@router.post("", response_model=LocationResponse)
+async def create_location(
+    data: LocationCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """创建地点"""
+    location = await LocationService.create_location(db, data, created_by=current_user.id)
+    return render(LocationResponse, location)
@@ -0,0 +1,131 @@
+"""Media upload API routes."""
+from typing import Awaitable
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.api.deps import get_current_user
+from app.schemas.media import (
+    MediaPurpose,
+    MediaResponse,
+    UploadComplete,
+    UploadRequest,
+    UploadTicket,
+)
+from app.services.media_service import EXTENSIONS, MediaNotFound, media_uploads
+from app.services.media_storage import LocalMediaStorage, UploadTooLarge
+from app.services.thumbnails import InvalidImage, ThumbnailsUnavailable
+from app.models.user import User
+
+router = APIRouter(prefix="/media", tags=["媒体"])
+
+
+def _check_length(request: Request, max_bytes: int) -> None:
+    """Refuse a body whose declared length is already over the limit."""
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="文件过大",
+        )
+
+
+async def _finish(upload: Awaitable[MediaResponse]) -> MediaResponse:
+    """Map the ways an upload can fail to HTTP errors."""
+    try:
+        return await upload
+    except MediaNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="上传的文件不存在",
+        )
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="文件过大",
+        )
+    except InvalidImage:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="不是有效的图片",
+        )
+    except ThumbnailsUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="图片处理暂时不可用，请稍后重试",
+        )
+
+
+@router.post("/uploads", response_model=UploadTicket)
+async def create_upload(
+    data: UploadRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """申请图片直传地址（客户端直接上传到存储，不经过 API）"""
+    if data.size is not None and data.size > media_uploads.max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="文件过大",
+        )
+    return media_uploads.ticket(current_user.id, data.purpose, data.content_type)
+
+
+@router.post("/uploads/complete", response_model=MediaResponse)
+async def complete_upload(
+    data: UploadComplete,
+    current_user: User = Depends(get_current_user),
+):
+    """确认直传完成并生成缩略图"""
+    if not media_uploads.owns(current_user.id, data.key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权操作该文件",
+        )
+    return await _finish(media_uploads.complete(data.key))
+
+
+@router.put("/uploads/{key:path}", status_code=status.HTTP_204_NO_CONTENT)
+async def put_upload(
+    key: str,
+    request: Request,
+    max_bytes: int = Query(...),
+    expires: int = Query(...),
+    signature: str = Query(...),
+):
+    """本地存储的直传地址（开发与测试环境代替 S3 预签名地址）"""
+    storage = media_uploads.storage
+    content_type = request.headers.get("content-type", "")
+    if not isinstance(storage, LocalMediaStorage) or not storage.verify_upload(
+        key, content_type, max_bytes, expires, signature
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="上传地址无效或已过期",
+        )
+    _check_length(request, max_bytes)
+    try:
+        await storage.write(key, request.stream(), content_type, max_bytes)
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="文件过大",
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("", response_model=MediaResponse)
+async def upload_media(
+    request: Request,
+    purpose: MediaPurpose = Query(...),
+    current_user: User = Depends(get_current_user),
+):
+    """经 API 中转上传图片（请求体为图片本身，边收边写入存储）"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="不支持的图片格式",
+        )
+    _check_length(request, media_uploads.max_bytes)
+    return await _finish(
+        media_uploads.receive(current_user.id, purpose, content_type, request.stream())
+    )
@@ -0,0 +1,20 @@
+"""Notification API routes."""
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_db
+from app.schemas.notification import DeviceTokenRegister
+from app.services.notification_service import NotificationService
+from app.models.user import User
+
+router = APIRouter(prefix="/notifications", tags=["通知"])
+
+
+@router.post("/devices", status_code=status.HTTP_204_NO_CONTENT)
+async def register_device(
+    data: DeviceTokenRegister,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """注册推送设备"""
+    await NotificationService.register_token(db, current_user.id, data.token, data.platform)
@@ -0,0 +1,191 @@
+"""Post API routes."""
+import asyncio
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_db, get_loaders, get_read_db
+from app.api.responses import render
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.schemas.post import (
+    CommentCreate,
+    CommentResponse,
+    PostCreate,
+    PostPage,
+    PostResponse,
+)
+from app.schemas.dog import DogBrief
+from app.schemas.tag import normalize_tag
+from app.schemas.user import UserBrief
+from app.services.counters import post_counters
+from app.services.dog_service import DogService
+from app.services.loaders import Loaders
+from app.services.post_service import PostService
+from app.services.tag_service import TagService
+from app.services.timeline import timelines
+from app.models.post import Post
+from app.models.user import User
+
+router = APIRouter(prefix="/posts", tags=["动态"])
+
+
+@router.post("", response_model=PostResponse)
+async def create_post(
+    data: PostCreate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """发布动态"""
+    if not await DogService.check_ownership(db, data.dog_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权操作此狗狗",
+        )
+    post = await PostService.create_post(db, current_user.id, data)
+    background_tasks.add_task(timelines.publish, post.id, post.user_id, post.created_at)
+    return render(PostResponse, post)
+
+
+@router.get("/feed", response_model=PostPage)
+async def get_feed(
+    cursor: Optional[str] = Query(None, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """获取关注的人的动态"""
+    before = None
+    if cursor is not None:
+        try:
+            (before,) = decode_cursor(cursor, int)
+        except InvalidCursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的分页游标",
+            )
+
+    post_ids, next_before = await timelines.page(db, current_user.id, before, limit)
+    posts = await PostService.get_posts(db, post_ids)
+    page = {
+        "posts": await _with_counts(posts, loaders),
+        "has_more": next_before is not None,
+        "next_cursor": encode_cursor(next_before) if next_before is not None else None,
+    }
+    return render(PostPage, page)
+
+
+@router.get("/tagged", response_model=PostPage)
+async def get_tagged_posts(
+    tag: str = Query(..., min_length=1, max_length=40),
+    cursor: Optional[str] = Query(None, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """按话题浏览动态"""
+    try:
+        tag = normalize_tag(tag)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的标签",
+        )
+    before = None
+    if cursor is not None:
+        try:
+            before = decode_cursor(cursor, datetime.fromisoformat, UUID)
+        except InvalidCursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的分页游标",
+            )
+
+    posts, next_before = await TagService.get_tagged_posts(db, tag, before, limit)
+    page = {
+        "posts": await _with_counts(posts, loaders),
+        "has_more": next_before is not None,
+        "next_cursor": encode_cursor(*next_before) if next_before else None,
+    }
+    return render(PostPage, page)
+
+
+@router.get("/{post_id}", response_model=PostResponse)
+async def get_post(
+    post_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """获取动态详情"""
+    post = await _get_post_or_404(db, post_id)
+    (response,) = await _with_counts([post], loaders)
+    return render(PostResponse, response)
+
+
+@router.post("/{post_id}/like", status_code=status.HTTP_204_NO_CONTENT)
+async def like_post(
+    post_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """点赞"""
+    await _get_post_or_404(db, post_id)
+    await PostService.like_post(db, post_id, current_user.id)
+
+
+@router.delete("/{post_id}/like", status_code=status.HTTP_204_NO_CONTENT)
+async def unlike_post(
+    post_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """取消点赞"""
+    await PostService.unlike_post(db, post_id, current_user.id)
+
+
+@router.post("/{post_id}/comments", response_model=CommentResponse)
+async def add_comment(
+    post_id: UUID,
+    data: CommentCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """发表评论"""
+    await _get_post_or_404(db, post_id)
+    comment = await PostService.add_comment(db, post_id, current_user.id, data)
+    return render(CommentResponse, comment)
+
+
+async def _get_post_or_404(db: AsyncSession, post_id: UUID) -> Post:
+    post = await PostService.get_post(db, post_id)
+    if not post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="动态不存在",
+        )
+    return post
+
+
+async def _with_counts(posts: list[Post], loaders: Loaders) -> list[PostResponse]:
+    """Serialize posts with author, dog and counts that include unflushed deltas."""
+    counts, authors, dogs = await asyncio.gather(
+        post_counters.counts(posts),
+        loaders.users.load_many(post.user_id for post in posts),
+        loaders.dogs.load_many(post.dog_id for post in posts),
+    )
+    return [
+        PostResponse.model_validate(post).model_copy(
+            update={
+                **counts[post.id],
+                "author": UserBrief.model_validate(author) if author else None,
+                "author_dog": DogBrief.model_validate(dog) if dog else None,
+            }
+        )
+        for post, author, dog in zip(posts, authors, dogs)
+    ]
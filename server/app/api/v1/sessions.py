@@ -0,0 +1,273 @@
+"""Session API routes."""
+import asyncio
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_db, get_loaders, get_read_db
+from app.api.responses import render
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.schemas.dog import DogBrief
+from app.schemas.location import LocationBrief
+from app.schemas.session import (
+    EligibleSession,
+    EligibleSessionPage,
+    SessionCard,
+    SessionCreate,
+    SessionJoin,
+    SessionResponse,
+    SquareCardResponse,
+    SquarePage,
+    SquareSort,
+)
+from app.schemas.user import UserBrief
+from app.services.dog_service import DogService
+from app.services.loaders import Loaders
+from app.services.notification_service import NotificationService
+from app.services.session_service import SeatStatus, SessionService
+from app.services.square import SquareService
+from app.models.session import Session
+from app.models.user import User
+
+router = APIRouter(prefix="/sessions", tags=["聚会"])
+
+SEAT_ERRORS = {
+    SeatStatus.not_found: (status.HTTP_404_NOT_FOUND, "聚会不存在"),
+    SeatStatus.closed: (status.HTTP_409_CONFLICT, "聚会已停止报名"),
+    SeatStatus.full: (status.HTTP_409_CONFLICT, "聚会已满员"),
+    SeatStatus.already_joined: (status.HTTP_409_CONFLICT, "狗狗已参加此聚会"),
+    SeatStatus.not_joined: (status.HTTP_409_CONFLICT, "狗狗未参加此聚会"),
+}
+
+
+@router.post("", response_model=SessionResponse)
+async def create_session(
+    data: SessionCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """发起聚会"""
+    session = await SessionService.create_session(db, current_user.id, data)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="地点不存在",
+        )
+    return render(SessionResponse, session)
+
+
+@router.get("", response_model=SquarePage)
+async def list_square(
+    sort: SquareSort = Query(SquareSort.time),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius: float = Query(10, gt=0, le=200),
+    cursor: Optional[str] = Query(None, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """广场：按时间或距离浏览聚会"""
+    by_distance = sort is SquareSort.distance
+    if by_distance and (lat is None or lng is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="按距离排序需要提供位置",
+        )
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(
+                cursor, *((float, UUID) if by_distance else (datetime.fromisoformat, UUID))
+            )
+            # A page ends at a card within the radius, so its distance is too
+            if by_distance and not 0 <= after[0] <= radius:
+                raise InvalidCursor(cursor)
+        except InvalidCursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的分页游标",
+            )
+
+    if by_distance:
+        matches, next_after = await SquareService.nearby(db, lat, lng, radius, after, limit)
+        cards = [
+            SquareCardResponse.model_validate(card).model_copy(
+                update={"distance_km": round(distance, 3)}
+            )
+            for card, distance in matches
+        ]
+    else:
+        cards, next_after = await SquareService.by_time(db, after, limit)
+    page = {
+        "cards": cards,
+        "has_more": next_after is not None,
+        "next_cursor": encode_cursor(*next_after) if next_after else None,
+    }
+    return render(SquarePage, page)
+
+
+@router.get("/eligible", response_model=EligibleSessionPage)
+async def list_eligible_sessions(
+    dog_id: Optional[UUID] = Query(None),
+    cursor: Optional[str] = Query(None, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """只看我的狗狗能参加的聚会"""
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor, datetime.fromisoformat, UUID)
+        except InvalidCursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的分页游标",
+            )
+
+    dogs = await DogService.get_user_dogs(db, current_user.id)
+    if dog_id is not None:
+        dogs = [dog for dog in dogs if dog.id == dog_id]
+        if not dogs:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="狗狗不存在",
+            )
+
+    matches, next_after = await SessionService.list_eligible(db, dogs, after, limit)
+    cards = await _cards(loaders, [session for session, _ in matches])
+    # Each session is validated once; adding the dog ids needs no second pass
+    page = {
+        "sessions": [
+            EligibleSession.model_construct(**dict(card), eligible_dog_ids=dog_ids)
+            for card, (_, dog_ids) in zip(cards, matches)
+        ],
+        "has_more": next_after is not None,
+        "next_cursor": encode_cursor(*next_after) if next_after else None,
+    }
+    return render(EligibleSessionPage, page)
+
+
+@router.get("/{session_id}", response_model=SessionCard)
+async def get_session(
+    session_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    loaders: Loaders = Depends(get_loaders),
+):
+    """获取聚会详情"""
+    session = await SessionService.get_session(db, session_id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="聚会不存在",
+        )
+    (card,) = await _cards(loaders, [session])
+    return render(SessionCard, card)
+
+
+@router.post("/{session_id}/join", response_model=SessionResponse)
+async def join_session(
+    session_id: UUID,
+    data: SessionJoin,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """参加聚会"""
+    await _check_dog_owner(db, data.dog_id, current_user)
+    outcome, session = await SessionService.join_session(db, session_id, data.dog_id)
+    _raise_for_seat(outcome)
+    return render(SessionResponse, session)
+
+
+@router.post("/{session_id}/leave", response_model=SessionResponse)
+async def leave_session(
+    session_id: UUID,
+    data: SessionJoin,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """离开聚会"""
+    await _check_dog_owner(db, data.dog_id, current_user)
+    outcome, session = await SessionService.leave_session(db, session_id, data.dog_id)
+    _raise_for_seat(outcome)
+    return render(SessionResponse, session)
+
+
+@router.post("/{session_id}/start", response_model=SessionResponse)
+async def start_session(
+    session_id: UUID,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """提前开始聚会，并推送给不在线的参与者"""
+    session = await SessionService.get_session(db, session_id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="聚会不存在",
+        )
+    if session.creator_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="只有发起人可以开始聚会",
+        )
+    session = await SessionService.start_session(db, session_id, current_user.id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="聚会已开始或已结束",
+        )
+    background_tasks.add_task(
+        NotificationService.notify_session_started,
+        session.id,
+        session.title,
+        session.chat_group_id,
+    )
+    return render(SessionResponse, session)
+
+
+async def _cards(loaders: Loaders, sessions: list[Session]) -> list[SessionCard]:
+    """Build session cards; related rows cost one query per kind for the whole page."""
+    creators, places, dogs = await asyncio.gather(
+        loaders.users.load_many(session.creator_id for session in sessions),
+        loaders.locations.load_many(session.location_id for session in sessions),
+        loaders.session_dogs.load_many(session.id for session in sessions),
+    )
+    return [
+        SessionCard.model_construct(
+            **dict(SessionResponse.model_validate(session)),
+            creator=UserBrief.model_validate(creator) if creator else None,
+            place=LocationBrief.model_validate(place) if place else None,
+            dogs=[DogBrief.model_validate(dog) for dog in participants],
+        )
+        for session, creator, place, participants in zip(sessions, creators, places, dogs)
+    ]
+
+
+async def _check_dog_owner(db: AsyncSession, dog_id: UUID, user: User) -> None:
+    """Reject dogs that do not exist or belong to someone else."""
+    dog = await DogService.get_dog_by_id(db, dog_id)
+    if not dog:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="狗狗不存在",
+        )
+    if dog.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="无权操作此狗狗",
+        )
+
+
+def _raise_for_seat(outcome: SeatStatus) -> None:
+    """Map a join/leave outcome to an HTTP error."""
+    if outcome in SEAT_ERRORS:
+        status_code, detail = SEAT_ERRORS[outcome]
+        raise HTTPException(status_code=status_code, detail=detail)
@@ -0,0 +1,25 @@
+"""Tag API routes."""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_read_db
+from app.core.config import settings
+from app.schemas.tag import TagKind, TagSuggestion
+from app.services.tag_service import TagService
+from app.models.user import User
+
+router = APIRouter(prefix="/tags", tags=["标签"])
+
+
+@router.get("/suggest", response_model=list[TagSuggestion])
+async def suggest_tags(
+    q: str = Query("", max_length=40),
+    kind: TagKind = Query(TagKind.post),
+    limit: int = Query(settings.TAG_SUGGEST_LIMIT, ge=1, le=settings.TAG_SUGGEST_LIMIT),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """标签联想（不输入时返回热门标签）"""
+    prefix = q.strip().lstrip("#＃").strip().casefold()
+    suggestions = await TagService.suggest(db, kind, prefix, limit)
+    return [TagSuggestion(tag=tag, count=count) for tag, count in suggestions]
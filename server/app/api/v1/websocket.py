@@ -0,0 +1,109 @@
+"""WebSocket routes."""
+from uuid import UUID
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.core.security import verify_token
+from app.database import AsyncSessionLocal
+from app.schemas.chat import ChatMessageCreate, ChatMessageResponse
+from app.services.chat_hub import ClientConnection, hub
+from app.services.chat_service import ChatService
+from app.services.chat_writer import chat_writer
+from app.services.presence import presence
+
+router = APIRouter()
+
+
+@router.websocket("/ws")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    token: str = Query(...),
+):
+    """聊天 WebSocket 连接"""
+    payload = verify_token(token)
+    try:
+        user_id = UUID(str(payload["sub"]))
+    except (TypeError, KeyError, ValueError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    connection = hub.connect(websocket, str(user_id))
+    await presence.mark_online(user_id)
+
+    try:
+        while True:
+            try:
+                data = await websocket.receive_json()
+            except (ValueError, KeyError):
+                # Not JSON, or a binary frame
+                data = None
+            if not isinstance(data, dict):
+                hub.send_local(connection, {"type": "error", "detail": "消息格式错误"})
+                continue
+            msg_type = data.get("type")
+
+            if msg_type == "ping":
+                hub.send_local(connection, {"type": "pong"})
+                await presence.mark_online(user_id)
+            elif msg_type in ("join_group", "leave_group", "send_message", "share_location"):
+                await _handle_group_event(connection, user_id, msg_type, data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await hub.disconnect(connection)
+        if not hub.is_connected(str(user_id)):
+            await presence.mark_offline(user_id)
+
+
+async def _handle_group_event(
+    connection: ClientConnection, user_id: UUID, msg_type: str, data: dict
+) -> None:
+    try:
+        group_id = UUID(str(data.get("group_id")))
+    except ValueError:
+        hub.send_local(connection, {"type": "error", "detail": "无效的小组"})
+        return
+    group_key = str(group_id)
+
+    if msg_type == "leave_group":
+        await hub.leave(connection, group_key)
+        return
+
+    if group_key not in connection.groups:
+        async with AsyncSessionLocal() as db:
+            if not await ChatService.is_member(db, group_id, user_id):
+                hub.send_local(connection, {"type": "error", "detail": "不是小组成员"})
+                return
+        await hub.join(connection, group_key)
+
+    if msg_type == "send_message":
+        try:
+            message_in = ChatMessageCreate.model_validate(data)
+        except ValidationError:
+            hub.send_local(connection, {"type": "error", "detail": "消息格式错误"})
+            return
+        # Persisted in the background by the write-behind writer
+        message = await chat_writer.submit(
+            group_id, user_id, message_in.content, message_in.message_type
+        )
+        await hub.publish(
+            group_key,
+            {
+                "type": "new_message",
+                "group_id": group_key,
+                "message": ChatMessageResponse.model_validate(message).model_dump(mode="json"),
+            },
+        )
+    elif msg_type == "share_location":
+        await hub.publish(
+            group_key,
+            {
+                "type": "location_shared",
+                "group_id": group_key,
+                "user_id": str(user_id),
+                "latitude": data.get("latitude"),
+                "longitude": data.get("longitude"),
+            },
+        )
@@ -0,0 +1,129 @@
+"""Dog breed catalogue.
+
+Breeds are stored under their canonical Chinese name. ``canonical_breed``
+maps common aliases, English names and pinyin to that name, so "金毛",
+"Golden Retriever" and "jinmaoxunhuiquan" are all stored as "金毛寻回犬"
+and breed requirements can be compared by exact match. Text that matches no
+catalogue entry is kept as typed, with whitespace tidied.
+"""
+import re
+import unicodedata
+from functools import cache
+from typing import NamedTuple, Optional
+
+MIXED_BREED = "串串/未知"
+
+
+class Breed(NamedTuple):
+    name: str
+    en: str
+    aliases: tuple[str, ...] = ()
+
+
+# Most commonly kept breeds first; suggestions keep this order among equal matches
+BREEDS = (
+    Breed("贵宾犬", "Poodle", ("泰迪", "泰迪犬", "贵宾", "Toy Poodle", "Teddy")),
+    Breed(MIXED_BREED, "Mixed / Unknown", ("串串", "混血", "混种", "未知", "不知道", "Mutt")),
+    Breed("比熊犬", "Bichon Frise", ("比熊",)),
+    Breed("柯基犬", "Welsh Corgi", ("柯基", "威尔士柯基", "Corgi")),
+    Breed("金毛寻回犬", "Golden Retriever", ("金毛", "Golden")),
+    Breed("中华田园犬", "Chinese Rural Dog", ("田园犬", "土狗", "中华田园")),
+    Breed("博美犬", "Pomeranian", ("博美",)),
+    Breed("柴犬", "Shiba Inu", ("柴柴", "Shiba")),
+    Breed("拉布拉多寻回犬", "Labrador Retriever", ("拉布拉多", "拉拉", "Labrador")),
+    Breed("西伯利亚雪橇犬", "Siberian Husky", ("哈士奇", "二哈", "Husky")),
+    Breed("边境牧羊犬", "Border Collie", ("边牧",)),
+    Breed("萨摩耶犬", "Samoyed", ("萨摩耶",)),
+    Breed("法国斗牛犬", "French Bulldog", ("法斗", "Frenchie")),
+    Breed("雪纳瑞", "Schnauzer", ("雪纳瑞犬",)),
+    Breed("吉娃娃", "Chihuahua"),
+    Breed("约克夏梗", "Yorkshire Terrier", ("约克夏", "Yorkie")),
+    Breed("马尔济斯犬", "Maltese", ("马尔济斯",)),
+    Breed("西施犬", "Shih Tzu", ("西施",)),
+    Breed("巴哥犬", "Pug", ("巴哥",)),
+    Breed("腊肠犬", "Dachshund", ("腊肠",)),
+    Breed("比格犬", "Beagle", ("比格",)),
+    Breed("阿拉斯加雪橇犬", "Alaskan Malamute", ("阿拉斯加", "Malamute")),
+    Breed("德国牧羊犬", "German Shepherd", ("德牧",)),
+    Breed("松狮犬", "Chow Chow", ("松狮",)),
+    Breed("秋田犬", "Akita", ("秋田",)),
+    Breed("沙皮犬", "Shar Pei", ("沙皮",)),
+    Breed("京巴犬", "Pekingese", ("京巴", "北京犬")),
+    Breed("喜乐蒂牧羊犬", "Shetland Sheepdog", ("喜乐蒂", "Sheltie")),
+    Breed("柯利牧羊犬", "Rough Collie", ("苏牧", "苏格兰牧羊犬", "Collie")),
+    Breed("澳大利亚牧羊犬", "Australian Shepherd", ("澳牧", "Aussie")),
+    Breed("古代牧羊犬", "Old English Sheepdog", ("古牧",)),
+    Breed("西高地白梗", "West Highland White Terrier", ("西高地", "Westie")),
+    Breed("杰克罗素梗", "Jack Russell Terrier", ("杰克罗素",)),
+    Breed("贝灵顿梗", "Bedlington Terrier", ("贝灵顿",)),
+    Breed("牛头梗", "Bull Terrier"),
+    Breed("英国斗牛犬", "English Bulldog", ("英斗",)),
+    Breed("可卡犬", "Cocker Spaniel", ("可卡",)),
+    Breed("查理王小猎犬", "Cavalier King Charles Spaniel", ("查理王", "骑士查理王")),
+    Breed("蝴蝶犬", "Papillon", ("蝴蝶",)),
+    Breed("斑点狗", "Dalmatian", ("斑点犬", "大麦町")),
+    Breed("惠比特犬", "Whippet", ("惠比特",)),
+    Breed("灵缇犬", "Greyhound", ("灵缇",)),
+    Breed("杜宾犬", "Dobermann", ("杜宾", "Doberman")),
+    Breed("罗威纳犬", "Rottweiler", ("罗威纳",)),
+    Breed("大白熊犬", "Great Pyrenees", ("大白熊",)),
+    Breed("伯恩山犬", "Bernese Mountain Dog", ("伯恩山",)),
+    Breed("圣伯纳犬", "Saint Bernard", ("圣伯纳",)),
+    Breed("大丹犬", "Great Dane", ("大丹",)),
+)
+
+# Reading of every character used above, for pinyin search
+_PINYIN = (
+    "贵gui 宾bin 泰tai 迪di 犬quan 串chuan 混hun 血xue 种zhong 未wei 知zhi 不bu 道dao "
+    "比bi 熊xiong 柯ke 基ji 威wei 尔er 士shi 金jin 毛mao 寻xun 回hui 中zhong 华hua "
+    "田tian 园yuan 土tu 狗gou 博bo 美mei 柴chai 拉la 布bu 多duo 西xi 伯bo 利li 亚ya "
+    "雪xue 橇qiao 哈ha 奇qi 二er 边bian 境jing 牧mu 羊yang 萨sa 摩mo 耶ye 法fa 国guo "
+    "斗dou 牛niu 纳na 瑞rui 吉ji 娃wa 约yue 克ke 夏xia 梗geng 马ma 济ji 斯si 施shi "
+    "巴ba 哥ge 腊la 肠chang 格ge 阿a 加jia 德de 松song 狮shi 秋qiu 沙sha 皮pi 京jing "
+    "北bei 喜xi 乐le 蒂di 苏su 澳ao 大da 古gu 代dai 高gao 地di 白bai 杰jie 罗luo "
+    "素su 贝bei 灵ling 顿dun 头tou 英ying 可ke 卡ka 查cha 理li 王wang 小xiao 猎lie "
+    "骑qi 蝴hu 蝶die 斑ban 点dian 麦mai 町ting 惠hui 特te 缇ti 杜du 恩en 山shan "
+    "圣sheng 丹dan 兰lan"
+)
+PINYIN = {entry[0]: entry[1:] for entry in _PINYIN.split()}
+
+_SEPARATORS = re.compile(r"[\s\-_·・.,，。/／'’()（）]+")
+
+
+def fold(text: str) -> str:
+    """Casefold and drop spaces and punctuation, for comparing breed spellings."""
+    return _SEPARATORS.sub("", unicodedata.normalize("NFKC", text).casefold())
+
+
+def to_pinyin(text: str) -> str:
+    """Replace the Chinese characters the catalogue knows with their pinyin."""
+    return "".join(PINYIN.get(char, char) for char in fold(text))
+
+
+def pinyin_initials(text: str) -> Optional[str]:
+    """First letters of each character's pinyin, if every character is known."""
+    folded = fold(text)
+    if not folded or any(char not in PINYIN for char in folded):
+        return None
+    return "".join(PINYIN[char][0] for char in folded)
+
+
+@cache
+def _lookup() -> dict[str, str]:
+    lookup: dict[str, str] = {}
+    for breed in BREEDS:
+        for text in (breed.name, breed.en, *breed.aliases):
+            lookup.setdefault(fold(text), breed.name)
+            lookup.setdefault(to_pinyin(text), breed.name)
+    return lookup
+
+
+def find_breed(text: str) -> Optional[str]:
+    """Return the canonical name ``text`` spells, or ``None``."""
+    folded = fold(text)
+    return _lookup().get(folded) or _lookup().get(to_pinyin(folded))
+
+
+def canonical_breed(text: str) -> str:
+    """Return the name a breed is stored under."""
+    return find_breed(text) or " ".join(text.split())
@@ -0,0 +1,287 @@
+"""Caching utilities."""
+import asyncio
+import enum
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+from redis.exceptions import RedisError
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT")
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a time-to-live.
+
+    Safe to share between threads; every lookup is O(1). Entries past their
+    expiry are dropped lazily on access, and the least recently used entry is
+    evicted once ``maxsize`` is reached.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float | None = None) -> None:
+        """Store a value, optionally with a shorter TTL than the default."""
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (self._clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+            }
+
+
+def snapshot(instance: object) -> dict[str, Any]:
+    """Copy the column values of an ORM instance into a plain dict."""
+    mapper = sa_inspect(instance).mapper
+    return {attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs}
+
+
+async def restore(db: AsyncSession, model: type[ModelT], data: dict[str, Any]) -> ModelT:
+    """Attach a snapshot to ``db`` as a persistent instance without querying."""
+    instance = model(**data)
+    make_transient_to_detached(instance)
+    return await db.merge(instance, load=False)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> str:
+    """Serialize snapshots (UUIDs, datetimes, enums) to JSON."""
+    return json.dumps(value, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_snapshot(model: type, data: dict[str, Any]) -> dict[str, Any]:
+    """Convert a JSON-decoded snapshot back to the model's column types."""
+    columns = {attr.key: attr.columns[0] for attr in sa_inspect(model).column_attrs}
+    loaded = {}
+    for key, value in data.items():
+        column = columns.get(key)
+        if column is None:
+            continue
+        if isinstance(value, str):
+            python_type = column.type.python_type
+            if python_type is uuid.UUID:
+                value = uuid.UUID(value)
+            elif python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            elif issubclass(python_type, enum.Enum):
+                value = python_type(value)
+        loaded[key] = value
+    return loaded
+
+
+class ReadThroughCache:
+    """JSON read-through cache backed by Redis.
+
+    Misses are filled by calling a loader. Concurrent misses for the same key
+    are collapsed: within a process they share one in-flight load (taken over
+    by a waiter if its owner is cancelled), and across processes a short Redis
+    lock lets one caller load while the others poll for the result. TTLs are
+    jittered so keys written together do not all expire together. Redis
+    errors degrade to calling the loader directly.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: int,
+        jitter: float = 0.1,
+        lock_seconds: float = 5.0,
+        wait_seconds: float = 1.0,
+    ) -> None:
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.jitter = jitter
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, *parts: Any) -> str:
+        """Build a namespaced cache key."""
+        return ":".join([self.namespace, *(str(part) for part in parts)])
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        """Return the cached JSON value for ``key``, loading it on a miss.
+
+        The loader must return JSON-serializable data (see ``dumps``); ``None``
+        is cached too so lookups of missing rows do not reach the database.
+        ``ttl_seconds`` shortens the TTL of a value loaded by this call.
+        """
+        redis = get_redis()
+        try:
+            raw = await redis.get(key)
+        except (RedisError, OSError):
+            logger.warning("Cache read failed for %s", key, exc_info=True)
+            return await loader()
+
+        if raw is not None:
+            self.hits += 1
+            return json.loads(raw)
+
+        self.misses += 1
+        inflight = self._inflight.get(key)
+        while inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The owner was cancelled, not us: take over the load
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            inflight = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(redis, key, loader, ttl_seconds)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a failure nobody else awaited is not logged
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _load(
+        self,
+        redis: Any,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float],
+    ) -> Any:
+        lock_key = f"{key}:lock"
+        try:
+            acquired = await redis.set(lock_key, "1", ex=self.lock_seconds, nx=True)
+        except (RedisError, OSError):
+            return await loader()
+
+        if not acquired:
+            # Another process is loading; wait briefly for its result
+            deadline = time.monotonic() + self.wait_seconds
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+                try:
+                    raw = await redis.get(key)
+                except (RedisError, OSError):
+                    break
+                if raw is not None:
+                    return json.loads(raw)
+
+        try:
+            value = await loader()
+            ttl = self.ttl_seconds * (1 + random.uniform(-self.jitter, self.jitter))
+            if ttl_seconds is not None:
+                ttl = min(ttl, ttl_seconds)
+            try:
+                await redis.set(key, dumps(value), ex=max(1, int(ttl)))
+            except (RedisError, OSError):
+                logger.warning("Cache write failed for %s", key, exc_info=True)
+            return value
+        finally:
+            if acquired:
+                try:
+                    await redis.delete(lock_key)
+                except (RedisError, OSError):
+                    pass
+
+    async def invalidate(self, *keys: str) -> None:
+        """Delete cached keys after the underlying rows change."""
+        if not keys:
+            return
+        try:
+            await get_redis().delete(*keys)
+        except (RedisError, OSError):
+            logger.warning("Cache invalidation failed for %s", keys, exc_info=True)
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters."""
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,187 @@
+"""Geohash encoding and distance helpers."""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Geohash precision stored on rows (~4.8m x 4.8m cells)
+GEOHASH_PRECISION = 9
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE_MAP = {char: index for index, char in enumerate(_BASE32)}
+
+# Sorts after every geohash character, so [cell, cell + PREFIX_END) spans a cell
+PREFIX_END = "{"
+
+# Box size, as a multiple of max_cells, that covering_cells enumerates before
+# dropping the cells that miss the search ring
+GRID_FACTOR = 4
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Encode a coordinate into a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def decode_bbox(geohash: str) -> tuple[float, float, float, float]:
+    """Decode a geohash into its (min_lat, min_lng, max_lat, max_lng) box."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = _DECODE_MAP[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def cell_size_deg(precision: int) -> tuple[float, float]:
+    """Return the (height, width) in degrees of a cell at the given precision."""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def covering_cells(
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    max_cells: int = 16,
+    inner_km: float = 0.0,
+) -> list[str]:
+    """Return geohash prefixes whose union covers the search ring.
+
+    The ring is the circle of ``radius_km``, less the disk of ``inner_km``
+    when a search resumes past points already seen. Picks the finest
+    precision at which no more than ``max_cells`` cells of the ring's
+    bounding box reach into the ring, so every query is a bounded number of
+    index prefix scans regardless of table size.
+    """
+    km_per_deg = math.pi * EARTH_RADIUS_KM / 180.0
+    d_lat = radius_km / km_per_deg
+    min_lat = max(latitude - d_lat, -90.0)
+    max_lat = min(latitude + d_lat, 90.0)
+    # Use the poleward edge of the box, where longitude degrees are shortest
+    edge_lat = max(abs(min_lat), abs(max_lat))
+    lng_scale = math.cos(math.radians(edge_lat))
+    d_lng = 180.0 if lng_scale < 1e-6 else min(radius_km / (km_per_deg * lng_scale), 180.0)
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size_deg(precision)
+        lat_start = int((min_lat + 90.0) // height)
+        lat_stop = min(int((max_lat + 90.0) // height), int(180.0 / height) - 1)
+        lng_start = math.floor((longitude - d_lng + 180.0) / width)
+        lng_stop = math.floor((longitude + d_lng + 180.0) / width)
+        lng_cells = int(360.0 / width)
+        lng_count = min(lng_stop - lng_start + 1, lng_cells)
+
+        if (lat_stop - lat_start + 1) * lng_count > max_cells * GRID_FACTOR and precision > 1:
+            continue
+
+        cells = set()
+        for lat_index in range(lat_start, lat_stop + 1):
+            lat = -90.0 + (lat_index + 0.5) * height
+            for offset in range(lng_count):
+                lng_index = (lng_start + offset) % lng_cells
+                lng = -180.0 + (lng_index + 0.5) * width
+                cells.add(encode(lat, lng, precision))
+        cells = {
+            cell
+            for cell in cells
+            if min_distance_km(latitude, longitude, cell) <= radius_km
+            and max_distance_km(latitude, longitude, cell) >= inner_km
+        }
+        if len(cells) > max_cells and precision > 1:
+            continue
+        return sorted(cells)
+
+    return sorted(_BASE32)
+
+
+def min_distance_km(latitude: float, longitude: float, geohash: str) -> float:
+    """A lower bound on the distance to any point of a geohash cell.
+
+    Takes the haversine terms at their smallest over the cell: the nearest
+    latitude, the nearest longitude and the smallest cosine.
+    """
+    min_lat, min_lng, max_lat, max_lng = decode_bbox(geohash)
+    d_lat = max(min_lat - latitude, latitude - max_lat, 0.0)
+    if min_lng <= longitude <= max_lng:
+        d_lng = 0.0
+    else:
+        d_lng = min(abs((lng - longitude + 180.0) % 360.0 - 180.0) for lng in (min_lng, max_lng))
+    cos_cell = max(min(math.cos(math.radians(min_lat)), math.cos(math.radians(max_lat))), 0.0)
+    a = (
+        math.sin(math.radians(d_lat) / 2) ** 2
+        + math.cos(math.radians(latitude)) * cos_cell * math.sin(math.radians(d_lng) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def max_distance_km(latitude: float, longitude: float, geohash: str) -> float:
+    """Distance to the farthest point of a geohash cell; inf if that may not be a corner.
+
+    Within 90 degrees of longitude of the centre, distance grows away from
+    the centre along every meridian and parallel, so the farthest point is
+    a corner.
+    """
+    min_lat, min_lng, max_lat, max_lng = decode_bbox(geohash)
+    for lng in (min_lng, max_lng):
+        if abs((lng - longitude + 180.0) % 360.0 - 180.0) > 90.0:
+            return math.inf
+    return max(
+        haversine_km(latitude, longitude, lat, lng)
+        for lat in (min_lat, max_lat)
+        for lng in (min_lng, max_lng)
+    )
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
@@ -0,0 +1,403 @@
+"""Per-request latency, query counts and slow queries, exported for Prometheus.
+
+Two hooks feed one ``Metrics`` object per worker process:
+
+* ``MetricsMiddleware``, a plain ASGI middleware, times every HTTP request
+  and files it under its route template (``/api/v1/dogs/{dog_id}``, never
+  the raw path) and status code. While the request runs, a context variable
+  holds its ``RequestStats``.
+* Engine events count every statement and its time. Statements run inside
+  a request are also added to that request's ``RequestStats``.
+
+When a request finishes, its query count and DB time go into per-route
+histograms. If a single request ran the same statement ``n_plus_one_threshold``
+times or more, the route is flagged as a likely N+1. Statements slower than
+``slow_query_ms`` are kept in a bounded log, keyed by their normalized SQL
+with literals and bind parameters replaced by ``?``.
+
+``render`` writes everything in the Prometheus text format for ``/metrics``.
+``stats`` returns the slow-query log and N+1 flags for ``/health/queries``.
+The hot path does no more than a clock read, a few dict updates and a
+bisect per request or statement. Statements are normalized only when they
+are slow or flagged.
+"""
+import bisect
+import logging
+import re
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Requests that matched no route share one label instead of one per path
+UNMATCHED_ROUTE = "<unmatched>"
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"(\([?., ]+\))(?:\s*,\s*\([?., ]+\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """Reduce a statement to its shape: no literals, one ``?`` per list."""
+    text = _STRING.sub("?", statement)
+    text = _PARAM.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _PARAM_LIST.sub("?, ...", text)
+    text = _ROW_LIST.sub(r"\1, ...", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket, cumulated on export."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Return ``(le, count)`` pairs, ending with ``+Inf``."""
+        pairs, running = [], 0
+        for bound, count in zip((*map(_format_number, self.buckets), "+Inf"), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def quantile(self, share: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``share`` quantile, if any."""
+        if not self.count:
+            return None
+        target, running = share * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return float("inf")
+
+
+@dataclass
+class RequestStats:
+    """Queries run while serving one request."""
+
+    scope: dict
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def route(self) -> Optional[str]:
+        """Route template once routing has run, else the raw path."""
+        return route_template(self.scope) or self.scope.get("path")
+
+
+@dataclass
+class SlowQuery:
+    """Aggregate of the slow executions of one normalized statement."""
+
+    statement: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_route: Optional[str] = None
+    last_seen_at: Optional[datetime] = None
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Metrics:
+    """Request and query metrics of this worker process."""
+
+    def __init__(
+        self,
+        slow_query_ms: float = settings.SLOW_QUERY_MS,
+        slow_query_log_size: int = settings.SLOW_QUERY_LOG_SIZE,
+        n_plus_one_threshold: int = settings.N_PLUS_ONE_THRESHOLD,
+        latency_buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.slow_query_log_size = slow_query_log_size
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.latency_buckets = latency_buckets
+
+        self.requests: Counter[tuple[str, str, int]] = Counter()
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.query_counts: dict[tuple[str, str], Histogram] = {}
+        self.db_seconds: Counter[tuple[str, str]] = Counter()
+        self.n_plus_one: Counter[tuple[str, str]] = Counter()
+        self.slow_queries: OrderedDict[str, SlowQuery] = OrderedDict()
+
+        # All statements, including those run by background workers
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.slow_query_count = 0
+
+    def instrument_engine(self, engine: Any) -> None:
+        """Count and time every statement run through ``engine``."""
+        target = getattr(engine, "sync_engine", engine)
+        event.listen(target, "before_cursor_execute", self._before_execute)
+        event.listen(target, "after_cursor_execute", self._after_execute)
+        event.listen(target, "handle_error", self._on_error)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.record_query(statement, time.perf_counter() - conn.info["query_started"].pop())
+
+    def _on_error(self, context: Any) -> None:
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            self.record_query(context.statement or "", time.perf_counter() - started.pop())
+
+    def record_query(self, statement: str, seconds: float) -> None:
+        """Account one executed statement to this process and the current request."""
+        self.queries += 1
+        self.query_seconds += seconds
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+            stats.statements[statement] += 1
+        if seconds >= self.slow_query_seconds:
+            self._log_slow(statement, seconds, stats.route if stats is not None else None)
+
+    def _log_slow(self, statement: str, seconds: float, route: Optional[str]) -> None:
+        shape = normalize_sql(statement)
+        self.slow_query_count += 1
+        entry = self.slow_queries.pop(shape, None) or SlowQuery(shape)
+        entry.count += 1
+        entry.total_seconds += seconds
+        entry.max_seconds = max(entry.max_seconds, seconds)
+        entry.last_route = route
+        entry.last_seen_at = datetime.utcnow()
+        # Most recently seen last; the least recently seen shape is evicted
+        self.slow_queries[shape] = entry
+        while len(self.slow_queries) > self.slow_query_log_size:
+            self.slow_queries.popitem(last=False)
+        logger.warning("Slow query (%.0f ms, route %s): %s", seconds * 1000, route, shape)
+
+    def record_request(
+        self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats
+    ) -> None:
+        """Account one finished HTTP request and flag repeated statements."""
+        key = (method, route)
+        self.requests[(method, route, status_code)] += 1
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(self.latency_buckets)
+            self.query_counts[key] = Histogram(QUERY_COUNT_BUCKETS)
+        latency.observe(seconds)
+        self.query_counts[key].observe(stats.queries)
+        if not stats.queries:
+            return
+
+        self.db_seconds[key] += stats.db_seconds
+        if stats.queries < self.n_plus_one_threshold:
+            return
+        for statement, count in stats.statements.items():
+            if count >= self.n_plus_one_threshold:
+                flag = (f"{method} {route}", normalize_sql(statement))
+                if not self.n_plus_one[flag]:
+                    logger.warning(
+                        "Possible N+1 in %s: statement ran %d times: %s", flag[0], count, flag[1]
+                    )
+                self.n_plus_one[flag] += 1
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP http_requests_total HTTP requests by route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(self.requests.items()):
+            labels = _labels(method=method, route=route, status=str(status_code))
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        for name, help_text, histograms in (
+            (
+                "http_request_duration_seconds",
+                "Time to the last byte of the response.",
+                self.latency,
+            ),
+            ("http_request_db_queries", "Statements run per request.", self.query_counts),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (method, route), histogram in sorted(histograms.items()):
+                labels = _labels(method=method, route=route)
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {_format_number(histogram.sum)}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        lines += [
+            "# HELP http_request_db_seconds_total Time spent in statements per route.",
+            "# TYPE http_request_db_seconds_total counter",
+        ]
+        for (method, route), seconds in sorted(self.db_seconds.items()):
+            labels = _labels(method=method, route=route)
+            lines.append(f"http_request_db_seconds_total{{{labels}}} {_format_number(seconds)}")
+
+        lines += [
+            "# HELP http_request_n_plus_one_total Requests that repeated one statement"
+            f" at least {self.n_plus_one_threshold} times.",
+            "# TYPE http_request_n_plus_one_total counter",
+        ]
+        flagged = Counter()
+        for (route, _), count in self.n_plus_one.items():
+            flagged[route] += count
+        for route, count in sorted(flagged.items()):
+            method, _, path = route.partition(" ")
+            labels = _labels(method=method, route=path)
+            lines.append(f"http_request_n_plus_one_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP db_queries_total Statements run by this process.",
+            "# TYPE db_queries_total counter",
+            f"db_queries_total {self.queries}",
+            "# HELP db_query_seconds_total Time spent in statements by this process.",
+            "# TYPE db_query_seconds_total counter",
+            f"db_query_seconds_total {_format_number(self.query_seconds)}",
+            "# HELP db_slow_queries_total Statements slower than the slow-query threshold.",
+            "# TYPE db_slow_queries_total counter",
+            f"db_slow_queries_total {self.slow_query_count}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> dict[str, Any]:
+        """Return the slow-query log and N+1 flags, worst first."""
+        slow = sorted(self.slow_queries.values(), key=lambda q: q.total_seconds, reverse=True)
+        return {
+            "routes": {
+                f"{method} {route}": {
+                    "requests": histogram.count,
+                    "p50_ms": _bucket_ms(histogram.quantile(0.5)),
+                    "p95_ms": _bucket_ms(histogram.quantile(0.95)),
+                    "p99_ms": _bucket_ms(histogram.quantile(0.99)),
+                    "queries_per_request": round(
+                        self.query_counts[(method, route)].sum / histogram.count, 1
+                    ),
+                }
+                for (method, route), histogram in sorted(self.latency.items())
+            },
+            "queries": self.queries,
+            "query_seconds": round(self.query_seconds, 3),
+            "slow_query_ms": self.slow_query_seconds * 1000,
+            "slow_queries": [
+                {
+                    "statement": entry.statement,
+                    "count": entry.count,
+                    "total_ms": round(entry.total_seconds * 1000, 1),
+                    "max_ms": round(entry.max_seconds * 1000, 1),
+                    "last_route": entry.last_route,
+                    "last_seen_at": entry.last_seen_at,
+                }
+                for entry in slow
+            ],
+            "n_plus_one": [
+                {"route": route, "statement": statement, "requests": count}
+                for (route, statement), count in self.n_plus_one.most_common()
+            ],
+        }
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing HTTP requests and collecting their queries."""
+
+    def __init__(self, app: Any, registry: Optional[Metrics] = None) -> None:
+        self.app = app
+        self.metrics = registry or metrics
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        finished: Optional[float] = None
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status_code, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                # Background tasks run after this; they are not response latency
+                finished = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self.metrics.record_request(
+                scope["method"],
+                route_template(scope) or UNMATCHED_ROUTE,
+                status_code,
+                (finished or time.perf_counter()) - started,
+                stats,
+            )
+
+
+def route_template(scope: dict) -> Optional[str]:
+    """Return the template of the route that served ``scope``, if one matched.
+
+    Routes of an included router may carry only their own path, without the
+    prefixes it was included under; those are taken from the request path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    regex = getattr(route, "path_regex", None)
+    path = scope.get("path", "")
+    if template is None or regex is None or regex.match(path):
+        return template
+    for cut in range(1, len(path)):
+        if path[cut] == "/" and regex.match(path[cut:]):
+            return path[:cut] + template
+    return template
+
+
+def _bucket_ms(bound: Optional[float]) -> Optional[float]:
+    # Quantiles are bucket upper bounds; beyond the last bucket there is none
+    return None if bound is None or bound == float("inf") else bound * 1000
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+metrics = Metrics()
@@ -0,0 +1,62 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row a client has seen, serialized as
+URL-safe base64 JSON. Clients pass it back unchanged; the service turns it
+into a row-value comparison that seeks straight into the index, so a page
+costs the same however deep it is.
+
+Cursors come from clients, so every part is type-checked before it is
+converted: numbers must be finite JSON numbers and everything else a string.
+Timestamps with an offset are normalised to naive UTC, matching the
+``DateTime`` columns they are compared with.
+"""
+import base64
+import binascii
+import json
+import math
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+# JSON types accepted for parts converted by these callables; others need a string
+_JSON_TYPES: dict[Any, tuple[type, ...]] = {int: (int,), float: (int, float)}
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded."""
+
+
+def encode_cursor(*parts: Any) -> str:
+    """Encode a sort key as an opaque cursor."""
+    raw = json.dumps([_to_json(part) for part in parts], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> tuple:
+    """Decode a cursor, converting each part with the matching callable."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(parts, list) or len(parts) != len(types):
+            raise InvalidCursor(cursor)
+        return tuple(_convert(convert, part, cursor) for convert, part in zip(types, parts))
+    except (binascii.Error, UnicodeDecodeError, AttributeError, TypeError, ValueError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def _convert(convert: Callable[[Any], Any], part: Any, cursor: str) -> Any:
+    if isinstance(part, bool) or not isinstance(part, _JSON_TYPES.get(convert, (str,))):
+        raise InvalidCursor(cursor)
+    value = convert(part)
+    if isinstance(value, float) and not math.isfinite(value):
+        raise InvalidCursor(cursor)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _to_json(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (str, int, float)) or value is None:
+        return value
+    return str(value)
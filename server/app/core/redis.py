@@ -0,0 +1,394 @@
+"""Redis client access.
+
+``REDIS_URL`` may be ``memory://`` to use an in-process stand-in that
+implements the subset of Redis commands the app relies on. It is meant for
+tests and single-process development only: nothing is shared between
+workers.
+"""
+import asyncio
+import bisect
+import fnmatch
+import time
+from typing import Any, Optional
+
+from redis.exceptions import ResponseError
+
+from app.core.config import settings
+
+MEMORY_URL_SCHEME = "memory://"
+
+_client: Any = None
+
+
+def get_redis() -> Any:
+    """Return the process-wide Redis client, creating it on first use."""
+    global _client
+    if _client is None:
+        if settings.REDIS_URL.startswith(MEMORY_URL_SCHEME):
+            _client = MemoryRedis()
+        else:
+            from redis import asyncio as aioredis
+
+            _client = aioredis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def set_redis(client: Any) -> None:
+    """Replace the process-wide client (used by tests and benchmarks)."""
+    global _client
+    _client = client
+
+
+def create_redis() -> Any:
+    """Return a new client for code that runs its own event loop (Celery tasks).
+
+    The ``memory://`` stand-in is per-process, so the shared instance is
+    returned instead.
+    """
+    if settings.REDIS_URL.startswith(MEMORY_URL_SCHEME):
+        return get_redis()
+    from redis import asyncio as aioredis
+
+    return aioredis.from_url(settings.REDIS_URL)
+
+
+def _to_bytes(value: Any) -> bytes:
+    """Encode a value the way redis-py does before sending it."""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    if isinstance(value, (int, float)):
+        return repr(value).encode()
+    raise TypeError(f"Invalid input of type {type(value).__name__}")
+
+
+def _score_bound(value: Any) -> tuple[float, bool]:
+    """Parse a sorted-set range bound into (score, exclusive)."""
+    if isinstance(value, (bytes, str)):
+        text = value.decode() if isinstance(value, bytes) else value
+        if text.startswith("("):
+            return float(text[1:]), True
+        return float(text), False
+    return float(value), False
+
+
+class _SortedSet:
+    """Members kept ordered by (score, member), as Redis orders them."""
+
+    def __init__(self) -> None:
+        self.scores: dict[bytes, float] = {}
+        self.entries: list[tuple[float, bytes]] = []
+
+    def add(self, member: bytes, score: float) -> bool:
+        old = self.scores.get(member)
+        if old is not None:
+            if old == score:
+                return False
+            del self.entries[bisect.bisect_left(self.entries, (old, member))]
+        self.scores[member] = score
+        bisect.insort(self.entries, (score, member))
+        return old is None
+
+    def remove(self, member: bytes) -> bool:
+        score = self.scores.pop(member, None)
+        if score is None:
+            return False
+        del self.entries[bisect.bisect_left(self.entries, (score, member))]
+        return True
+
+    def range_by_score(self, low: Any, high: Any) -> list[tuple[float, bytes]]:
+        low_score, low_open = _score_bound(low)
+        high_score, high_open = _score_bound(high)
+        first = bisect.bisect_left(self.entries, (low_score, b""))
+        result = []
+        for score, member in self.entries[first:]:
+            if score > high_score or (high_open and score == high_score):
+                break
+            if low_open and score == low_score:
+                continue
+            result.append((score, member))
+        return result
+
+
+class MemoryRedis:
+    """In-process stand-in for ``redis.asyncio.Redis``.
+
+    Values are stored and returned as bytes, matching a client created
+    without ``decode_responses``.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+        self._subscribers: dict[str, set["MemoryPubSub"]] = {}
+
+    def _alive(self, name: str) -> bool:
+        expires_at = self._expires.get(name)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        return name in self._data
+
+    async def get(self, name: str) -> Optional[bytes]:
+        return self._data.get(name) if self._alive(name) else None
+
+    async def mget(self, *names: str) -> list[Optional[bytes]]:
+        if len(names) == 1 and isinstance(names[0], (list, tuple)):
+            names = tuple(names[0])
+        return [await self.get(name) for name in names]
+
+    async def set(
+        self,
+        name: str,
+        value: Any,
+        ex: Optional[float] = None,
+        px: Optional[float] = None,
+        nx: bool = False,
+    ) -> Optional[bool]:
+        if nx and self._alive(name):
+            return None
+        self._data[name] = _to_bytes(value)
+        self._expires.pop(name, None)
+        if ex is not None:
+            self._expires[name] = time.monotonic() + ex
+        elif px is not None:
+            self._expires[name] = time.monotonic() + px / 1000
+        return True
+
+    async def delete(self, *names: str) -> int:
+        removed = 0
+        for name in names:
+            if self._alive(name):
+                removed += 1
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        return removed
+
+    async def exists(self, *names: str) -> int:
+        return sum(1 for name in names if self._alive(name))
+
+    async def expire(self, name: str, seconds: float) -> bool:
+        if not self._alive(name):
+            return False
+        self._expires[name] = time.monotonic() + seconds
+        return True
+
+    async def keys(self, pattern: str = "*") -> list[bytes]:
+        return [
+            name.encode()
+            for name in list(self._data)
+            if self._alive(name) and fnmatch.fnmatchcase(name, pattern)
+        ]
+
+    async def flushdb(self) -> bool:
+        self._data.clear()
+        self._expires.clear()
+        return True
+
+    async def rename(self, src: str, dst: str) -> bool:
+        if not self._alive(src):
+            raise ResponseError("no such key")
+        self._data[dst] = self._data.pop(src)
+        self._expires.pop(dst, None)
+        if src in self._expires:
+            self._expires[dst] = self._expires.pop(src)
+        return True
+
+    def _hash(self, name: str, create: bool = False) -> Optional[dict[bytes, bytes]]:
+        if self._alive(name):
+            value = self._data[name]
+            if not isinstance(value, dict):
+                raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            return value
+        if not create:
+            return None
+        fields = self._data[name] = {}
+        return fields
+
+    async def hincrby(self, name: str, key: Any, amount: int = 1) -> int:
+        fields = self._hash(name, create=True)
+        key = _to_bytes(key)
+        value = int(fields.get(key, b"0")) + amount
+        fields[key] = str(value).encode()
+        return value
+
+    async def hmget(self, name: str, keys: Any, *args: Any) -> list[Optional[bytes]]:
+        fields = self._hash(name) or {}
+        keys = [keys, *args] if isinstance(keys, (str, bytes)) else [*keys, *args]
+        return [fields.get(_to_bytes(key)) for key in keys]
+
+    async def hgetall(self, name: str) -> dict[bytes, bytes]:
+        return dict(self._hash(name) or {})
+
+    def _zset(self, name: str, create: bool = False) -> Optional[_SortedSet]:
+        if self._alive(name):
+            value = self._data[name]
+            if not isinstance(value, _SortedSet):
+                raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            return value
+        if not create:
+            return None
+        zset = self._data[name] = _SortedSet()
+        return zset
+
+    async def zadd(self, name: str, mapping: dict[Any, float], nx: bool = False) -> int:
+        zset = self._zset(name, create=True)
+        added = 0
+        for member, score in mapping.items():
+            member = _to_bytes(member)
+            if nx and member in zset.scores:
+                continue
+            added += zset.add(member, float(score))
+        return added
+
+    async def zrem(self, name: str, *members: Any) -> int:
+        zset = self._zset(name)
+        if zset is None:
+            return 0
+        removed = sum(zset.remove(_to_bytes(member)) for member in members)
+        if not zset.scores:
+            await self.delete(name)
+        return removed
+
+    async def zscore(self, name: str, member: Any) -> Optional[float]:
+        zset = self._zset(name)
+        return zset.scores.get(_to_bytes(member)) if zset is not None else None
+
+    async def zcard(self, name: str) -> int:
+        zset = self._zset(name)
+        return len(zset.scores) if zset is not None else 0
+
+    async def zrangebyscore(
+        self,
+        name: str,
+        min: Any,
+        max: Any,
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+        withscores: bool = False,
+    ) -> list[Any]:
+        zset = self._zset(name)
+        entries = zset.range_by_score(min, max) if zset is not None else []
+        if start is not None and num is not None:
+            entries = entries[start : start + num] if num >= 0 else entries[start:]
+        if withscores:
+            return [(member, score) for score, member in entries]
+        return [member for _, member in entries]
+
+    async def zrevrangebyscore(
+        self,
+        name: str,
+        max: Any,
+        min: Any,
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+        withscores: bool = False,
+    ) -> list[Any]:
+        zset = self._zset(name)
+        entries = zset.range_by_score(min, max)[::-1] if zset is not None else []
+        if start is not None and num is not None:
+            entries = entries[start : start + num] if num >= 0 else entries[start:]
+        if withscores:
+            return [(member, score) for score, member in entries]
+        return [member for _, member in entries]
+
+    async def zremrangebyrank(self, name: str, start: int, end: int) -> int:
+        zset = self._zset(name)
+        if zset is None:
+            return 0
+        size = len(zset.entries)
+        start, end = start + size if start < 0 else start, end + size if end < 0 else end
+        if end < 0:
+            # Redis treats a range ending before the first rank as empty
+            return 0
+        doomed = zset.entries[max(start, 0) : end + 1]
+        for _, member in doomed:
+            zset.remove(member)
+        if not zset.scores:
+            await self.delete(name)
+        return len(doomed)
+
+    def pipeline(self, transaction: bool = True) -> "MemoryPipeline":
+        return MemoryPipeline(self)
+
+    async def publish(self, channel: str, message: Any) -> int:
+        subscribers = self._subscribers.get(channel, ())
+        data = _to_bytes(message)
+        for pubsub in subscribers:
+            pubsub._deliver(channel, data)
+        return len(subscribers)
+
+    def pubsub(self) -> "MemoryPubSub":
+        return MemoryPubSub(self)
+
+    async def aclose(self) -> None:
+        return None
+
+
+class MemoryPipeline:
+    """Stand-in for ``redis.asyncio.client.Pipeline``: queues commands, runs them in order."""
+
+    def __init__(self, client: MemoryRedis) -> None:
+        self._client = client
+        self._commands: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._client, name)
+
+        def queue(*args: Any, **kwargs: Any) -> "MemoryPipeline":
+            self._commands.append((method.__name__, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list[Any]:
+        commands, self._commands = self._commands, []
+        return [
+            await getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in commands
+        ]
+
+
+class MemoryPubSub:
+    """Stand-in for ``redis.asyncio.client.PubSub`` (channel subscriptions only)."""
+
+    def __init__(self, broker: MemoryRedis) -> None:
+        self._broker = broker
+        self._channels: set[str] = set()
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    @property
+    def subscribed(self) -> bool:
+        return bool(self._channels)
+
+    def _deliver(self, channel: str, data: bytes) -> None:
+        self._queue.put_nowait(
+            {"type": "message", "pattern": None, "channel": channel.encode(), "data": data}
+        )
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._channels.add(channel)
+            self._broker._subscribers.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or tuple(self._channels):
+            self._channels.discard(channel)
+            subscribers = self._broker._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(self)
+                if not subscribers:
+                    del self._broker._subscribers[channel]
+
+    async def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: Optional[float] = 0.0
+    ) -> Optional[dict[str, Any]]:
+        try:
+            if not timeout:
+                return self._queue.get_nowait()
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            return None
+
+    async def aclose(self) -> None:
+        await self.unsubscribe()
@@ -1,10 +1,18 @@
 """Security utilities for authentication."""
+import time
 from datetime import datetime, timedelta
 
 from jose import JWTError, jwt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
+# Verified token payloads, keyed by the raw token
+token_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+)
+
 
 def create_access_token(
     data: dict,
@@ -24,9 +32,20 @@ def create_access_token(
 
 
 def verify_token(token: str) -> dict | None:
-    """Verify JWT token and return payload."""
+    """Verify JWT token and return payload.
+
+    Valid payloads are cached until the earlier of the cache TTL and the
+    token's own expiry, so repeat requests skip the signature check.
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        return payload
     except JWTError:
         return None
+
+    exp = payload.get("exp")
+    token_cache.set(token, payload, None if exp is None else exp - time.time())
+    return payload
@@ -1,27 +1,157 @@
-"""Database connection and session management."""
-from typing import AsyncGenerator
+"""Database connection and session management.
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+Writes go to the primary. When ``DATABASE_REPLICA_URL`` is set,
+``ReplicaSessionLocal`` opens sessions on a read replica; which reads may
+use it is decided by ``app.services.read_routing``. Primary sessions record
+whether they wrote, so a user who just wrote can be kept on the primary.
 
-from app.core.config import settings
+Engines are created on first use, not at import: Alembic, Celery workers and
+scripts import this module for ``Base`` and the session factories without
+paying for the driver import and pool setup. ``engine`` and
+``replica_engine`` are still importable names; they resolve through
+``get_engine`` and ``get_replica_engine``. Pool and prepared-statement cache
+sizes for both engines come from ``Settings``.
+"""
+from typing import Any, Callable, Optional
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG if hasattr(settings, 'DEBUG') else False,
-    pool_pre_ping=True,
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
 )
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import Pool
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+def make_engine(url: str, poolclass: Optional[type[Pool]] = None) -> AsyncEngine:
+    """Create an engine with the pool settings from ``Settings``.
+
+    ``poolclass`` replaces the default queue pool (Celery tasks pass
+    ``NullPool``); the pool size, overflow and timeout settings then do not
+    apply.
+    """
+    url = make_url(url)
+    connect_args = {}
+    if url.get_driver_name() == "asyncpg":
+        # Both asyncpg's statement cache and SQLAlchemy's prepared statements
+        # must be off (0) behind PgBouncer in transaction mode
+        cache_size = settings.DATABASE_STATEMENT_CACHE_SIZE
+        url = url.update_query_dict({"prepared_statement_cache_size": str(cache_size)})
+        connect_args["statement_cache_size"] = cache_size
+
+    if poolclass is None:
+        pool_args: dict[str, Any] = {
+            "pool_size": settings.DATABASE_POOL_SIZE,
+            "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        }
+    else:
+        pool_args = {"poolclass": poolclass}
+
+    engine = create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        connect_args=connect_args,
+        **pool_args,
+    )
+    if settings.METRICS_ENABLED:
+        metrics.instrument_engine(engine)
+    return engine
+
+
+class PrimarySession(Session):
+    """Session on the primary; ``info["wrote"]`` is set once it writes."""
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _flushed(session: Session, flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _executed(state: Any) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+_engines: dict[str, AsyncEngine] = {}
+
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
+def get_engine() -> AsyncEngine:
+    """Return the primary engine, creating it on first use."""
+    if "primary" not in _engines:
+        _engines["primary"] = make_engine(settings.DATABASE_URL)
+    return _engines["primary"]
+
+
+def get_replica_engine() -> Optional[AsyncEngine]:
+    """Return the replica engine, or ``None`` when no replica is configured."""
+    if not settings.DATABASE_REPLICA_URL:
+        return None
+    if "replica" not in _engines:
+        _engines["replica"] = make_engine(settings.DATABASE_REPLICA_URL)
+    return _engines["replica"]
+
+
+def created_engines() -> dict[str, AsyncEngine]:
+    """Return the engines created so far, by role."""
+    return dict(_engines)
+
+
+def __getattr__(name: str) -> Any:
+    if name == "engine":
+        return get_engine()
+    if name == "replica_engine":
+        return get_replica_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazySessionmaker(async_sessionmaker):
+    """Session factory that binds to its engine when the first session opens."""
+
+    def __init__(self, engine_factory: Callable[[], Optional[AsyncEngine]], **kw: Any) -> None:
+        super().__init__(**kw)
+        self._engine_factory = engine_factory
+
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.kw["bind"] = self._engine_factory()
+        return super().__call__(**local_kw)
+
+
+AsyncSessionLocal = LazySessionmaker(
+    get_engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
     expire_on_commit=False,
 )
 
+ReplicaSessionLocal = (
+    LazySessionmaker(
+        get_replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        info={"replica": True},
+    )
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+
+
+class Base(DeclarativeBase):
+    """Declarative base for all models."""
+
+    pass
+
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Get database session."""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+def is_replica(session: AsyncSession) -> bool:
+    """Whether ``session`` reads from the replica (and may lag the primary)."""
+    return session.info.get("replica", False)
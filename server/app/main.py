@@ -1,37 +1,108 @@
 """
 Doggy Meetup Backend API
+
+``create_app`` builds the application. Routers and services are imported
+when it runs, not when this module is imported, and ``app`` is only built on
+first access, so ``uvicorn app.main:app`` and
+``uvicorn --factory app.main:create_app`` both work while tools that only
+need the factory stay cheap to import. Database engines and Redis clients
+are created on first use, so building the app does not connect anywhere.
 """
+from contextlib import asynccontextmanager
+from typing import Any
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
-from app.api.v1 import auth, dogs
 
-app = FastAPI(
-    title="Doggy Meetup API",
-    description="狗狗拼团 - 连接狗狗主人的社交平台",
-    version="1.0.0",
-)
 
-# CORS configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure properly in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.services.breed_catalogue import breed_catalogue
+    from app.services.chat_archive import chat_archiver
+    from app.services.chat_hub import hub
+    from app.services.chat_writer import chat_writer
+    from app.services.media_service import media_uploads
+
+    breed_catalogue.load()
+    chat_writer.start()
+    chat_archiver.start()
+    yield
+    await chat_archiver.stop()
+    await hub.close()
+    # Persist buffered chat messages before the worker exits
+    await chat_writer.stop()
+    media_uploads.pool.shutdown()
+
+
+def create_app() -> FastAPI:
+    """Build the API application."""
+    from app.api import health
+    from app.api.v1 import (
+        auth,
+        dogs,
+        groups,
+        locations,
+        media,
+        notifications,
+        posts,
+        sessions,
+        tags,
+        users,
+        websocket,
+    )
+    from app.core.metrics import MetricsMiddleware
+
+    app = FastAPI(
+        title="Doggy Meetup API",
+        description="狗狗拼团 - 连接狗狗主人的社交平台",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+
+    # CORS configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Configure properly in production
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Outermost, so that request latency includes every other middleware
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
 
-# Include routers
-app.include_router(auth.router, prefix="/api/v1")
-app.include_router(dogs.router, prefix="/api/v1")
+    # Include routers
+    app.include_router(auth.router, prefix="/api/v1")
+    app.include_router(dogs.router, prefix="/api/v1")
+    app.include_router(groups.router, prefix="/api/v1")
+    app.include_router(locations.router, prefix="/api/v1")
+    app.include_router(media.router, prefix="/api/v1")
+    app.include_router(notifications.router, prefix="/api/v1")
+    app.include_router(posts.router, prefix="/api/v1")
+    app.include_router(sessions.router, prefix="/api/v1")
+    app.include_router(tags.router, prefix="/api/v1")
+    app.include_router(users.router, prefix="/api/v1")
+    app.include_router(websocket.router, prefix="/api/v1")
+    app.include_router(health.router)
 
+    # Without S3, uploaded files and thumbnails are served from local disk
+    if not settings.AWS_BUCKET_NAME:
+        app.mount(
+            settings.MEDIA_URL,
+            StaticFiles(directory=settings.MEDIA_ROOT, check_dir=False),
+            name="media",
+        )
 
-@app.get("/")
-async def root():
-    return {"message": "Doggy Meetup API", "version": "1.0.0"}
+    return app
 
 
-@app.get("/health")
-async def health():
-    return {"status": "healthy"}
+def __getattr__(name: str) -> Any:
+    # ``app`` is built once, on first access, then cached as a module global
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
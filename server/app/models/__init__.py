@@ -2,9 +2,12 @@
 from app.models.user import User
 from app.models.dog import Dog, DogSize, DogGender
 from app.models.location import Location
-from app.models.session import Session, SessionStatus, session_participants
+from app.models.session import Session, SessionStatus, SquareCard, session_participants
 from app.models.chat import ChatGroup, ChatMessage, ChatMessageType
-from app.models.post import Post, Comment
+from app.models.post import Post, PostLike, Comment
+from app.models.device import DeviceToken
+from app.models.follow import Follow
+from app.models.tag import TagStat
 
 __all__ = [
     "User",
@@ -14,10 +17,15 @@ __all__ = [
     "Location",
     "Session",
     "SessionStatus",
+    "SquareCard",
     "session_participants",
     "ChatGroup",
     "ChatMessage",
     "ChatMessageType",
     "Post",
+    "PostLike",
     "Comment",
+    "DeviceToken",
+    "Follow",
+    "TagStat",
 ]
@@ -1,15 +1,16 @@
 """Chat models."""
+import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Text, Enum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from app.database import Base
 
 
-class ChatMessageType(str, Enum):
+class ChatMessageType(str, enum.Enum):
     """Chat message type enum."""
 
     text = "text"
@@ -27,10 +28,19 @@ class ChatGroup(Base):
     session_id = Column(UUID(as_uuid=True), ForeignKey("sessions.id"), nullable=False)
     name = Column(String(100), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Set once the group's messages have been moved to cold storage
+    archived_at = Column(DateTime, nullable=True)
 
     # Relationships
-    session = relationship("Session", back_populates="chat_group")
-    messages = relationship("ChatMessage", back_populates="group", cascade="all, delete-orphan")
+    session = relationship("Session", foreign_keys=[session_id])
+    # History is paged through ChatService.get_history; never load it wholesale
+    messages = relationship(
+        "ChatMessage",
+        back_populates="group",
+        cascade="all, delete-orphan",
+        lazy="write_only",
+        passive_deletes=True,
+    )
 
     def __repr__(self) -> str:
         return f"<ChatGroup {self.name}>"
@@ -40,13 +50,22 @@ class ChatMessage(Base):
     """Chat message model."""
 
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Keyset pagination of a group's history by (created_at, id)
+        Index("ix_chat_messages_group_created_id", "group_id", "created_at", "id"),
+        # Monthly partitions are created by app.services.chat_archive
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    group_id = Column(UUID(as_uuid=True), ForeignKey("chat_groups.id"), nullable=False)
+    group_id = Column(
+        UUID(as_uuid=True), ForeignKey("chat_groups.id", ondelete="CASCADE"), nullable=False
+    )
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
     message_type = Column(Enum(ChatMessageType), default=ChatMessageType.text)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Part of the key because the table is partitioned on it
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True)
 
     # Relationships
     group = relationship("ChatGroup", back_populates="messages")
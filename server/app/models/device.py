@@ -0,0 +1,25 @@
+"""Device token model."""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class DeviceToken(Base):
+    """Push notification token of one of a user's devices."""
+
+    __tablename__ = "device_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    token = Column(String(512), nullable=False, unique=True)
+    platform = Column(String(20), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DeviceToken {self.user_id}>"
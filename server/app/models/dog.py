@@ -1,4 +1,5 @@
 """Dog model."""
+import enum
 import uuid
 from datetime import datetime
 
@@ -9,7 +10,7 @@ from sqlalchemy.orm import relationship
 from app.database import Base
 
 
-class DogSize(str, Enum):
+class DogSize(str, enum.Enum):
     """Dog size enum."""
 
     small = "small"
@@ -18,7 +19,7 @@ class DogSize(str, Enum):
     giant = "giant"
 
 
-class DogGender(str, Enum):
+class DogGender(str, enum.Enum):
     """Dog gender enum."""
 
     male = "male"
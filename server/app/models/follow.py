@@ -0,0 +1,28 @@
+"""Follow model."""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class Follow(Base):
+    """A user following another user's posts."""
+
+    __tablename__ = "follows"
+    __table_args__ = (
+        # Followers of an author, for fan-out on write
+        Index("ix_follows_followee_id_follower_id", "followee_id", "follower_id"),
+    )
+
+    follower_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    followee_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Follow {self.follower_id} -> {self.followee_id}>"
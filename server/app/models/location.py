@@ -2,10 +2,11 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Float, Boolean, DateTime
+from sqlalchemy import Column, String, Float, Boolean, DateTime, Index, event
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 
+from app.core import geo
 from app.database import Base
 
 
@@ -13,12 +14,18 @@ class Location(Base):
     """Location model."""
 
     __tablename__ = "locations"
+    __table_args__ = (
+        # Filtering by amenity tags: tags @> ARRAY['有围栏', '有水源']
+        Index("ix_locations_tags", "tags", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
     address = Column(String(500), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    # "C" collation keeps geohash prefix ranges in byte order for the btree index
+    geohash = Column(String(12, collation="C"), nullable=False, index=True)
     is_dog_friendly = Column(Boolean, default=True)
     tags = Column(ARRAY(String), nullable=True, default=list)
     created_by = Column(UUID(as_uuid=True), nullable=True)
@@ -29,3 +36,10 @@ class Location(Base):
 
     def __repr__(self) -> str:
         return f"<Location {self.name}>"
+
+
+@event.listens_for(Location, "before_insert")
+@event.listens_for(Location, "before_update")
+def _sync_geohash(mapper, connection, target: Location) -> None:
+    """Keep the geohash cell in step with the coordinates."""
+    target.geohash = geo.encode(target.latitude, target.longitude)
@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 
@@ -13,6 +13,12 @@ class Post(Base):
     """Post model."""
 
     __tablename__ = "posts"
+    __table_args__ = (
+        # Recent posts by an author, for rebuilding timelines
+        Index("ix_posts_user_id_created_at", "user_id", "created_at"),
+        # Hashtag browsing: tags @> ARRAY['...']
+        Index("ix_posts_tags", "tags", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -20,6 +26,9 @@ class Post(Base):
     content = Column(Text, nullable=True)
     images = Column(ARRAY(String), nullable=True, default=list)
     tags = Column(ARRAY(String), nullable=True, default=list)
+    # Flushed in batches by PostCounters; may trail the likes/comments rows briefly
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
@@ -31,10 +40,31 @@ class Post(Base):
         return f"<Post {self.id}>"
 
 
+class PostLike(Base):
+    """A user liking a post."""
+
+    __tablename__ = "post_likes"
+
+    post_id = Column(
+        UUID(as_uuid=True), ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PostLike {self.user_id} -> {self.post_id}>"
+
+
 class Comment(Base):
     """Comment model."""
 
     __tablename__ = "comments"
+    __table_args__ = (
+        # Counting a post's comments when reconciling counters
+        Index("ix_comments_post_id", "post_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     post_id = Column(UUID(as_uuid=True), ForeignKey("posts.id"), nullable=False)
@@ -1,15 +1,28 @@
 """Session model."""
+import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, JSON, Table
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    Index,
+    String,
+    Integer,
+    DateTime,
+    ForeignKey,
+    Enum,
+    Float,
+    JSON,
+    Table,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 
 from app.database import Base
 
 
-class SessionStatus(str, Enum):
+class SessionStatus(str, enum.Enum):
     """Session status enum."""
 
     recruiting = "recruiting"
@@ -19,10 +32,25 @@ class SessionStatus(str, Enum):
     cancelled = "cancelled"
 
 
+# In an allowed_* requirement column, this value accepts everything
+ANY = "*"
+# Upper bound of Dog.age_months, and of age_max_months when age is not restricted
+MAX_AGE_MONTHS = 360
+
+
 class Session(Base):
     """Session model."""
 
     __tablename__ = "sessions"
+    __table_args__ = (
+        CheckConstraint("current_dogs >= 0 AND current_dogs <= max_dogs", name="ck_sessions_seats"),
+        # Range scans for time-driven status transitions
+        Index("ix_sessions_status_scheduled_at", "status", "scheduled_at"),
+        # Array overlap (&&) lookups for eligibility filtering
+        Index("ix_sessions_allowed_sizes", "allowed_sizes", postgresql_using="gin"),
+        Index("ix_sessions_allowed_breeds", "allowed_breeds", postgresql_using="gin"),
+        Index("ix_sessions_allowed_mbti", "allowed_mbti", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     creator_id = Column(UUID(as_uuid=True), nullable=False)
@@ -30,14 +58,34 @@ class Session(Base):
     title = Column(String(100), nullable=False)
     scheduled_at = Column(DateTime, nullable=False)
     max_dogs = Column(Integer, nullable=False)
+    # Seats taken; only changed by SessionService.join_session/leave_session
+    current_dogs = Column(Integer, nullable=False, default=0, server_default="0")
+    # As submitted, for display; filtering uses the typed columns below
     requirements = Column(JSON, nullable=True)
+    allowed_sizes = Column(
+        ARRAY(String(10)), nullable=False, default=lambda: [ANY], server_default="{*}"
+    )
+    age_min_months = Column(Integer, nullable=False, default=0, server_default="0")
+    age_max_months = Column(
+        Integer, nullable=False, default=MAX_AGE_MONTHS, server_default=str(MAX_AGE_MONTHS)
+    )
+    allowed_breeds = Column(
+        ARRAY(String(50)), nullable=False, default=lambda: [ANY], server_default="{*}"
+    )
+    allowed_mbti = Column(
+        ARRAY(String(4)), nullable=False, default=lambda: [ANY], server_default="{*}"
+    )
     status = Column(Enum(SessionStatus), default=SessionStatus.recruiting)
-    chat_group_id = Column(UUID(as_uuid=True), ForeignKey("chat_groups.id"), nullable=True)
+    chat_group_id = Column(
+        UUID(as_uuid=True), ForeignKey("chat_groups.id", use_alter=True), nullable=True
+    )
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Claimed by the reminder task so each session is reminded once
+    reminder_sent_at = Column(DateTime, nullable=True)
 
     # Relationships
     location = relationship("Location", back_populates="sessions")
-    chat_group = relationship("ChatGroup", back_populates="session", foreign_keys=[chat_group_id])
+    chat_group = relationship("ChatGroup", foreign_keys=[chat_group_id])
 
     def __repr__(self) -> str:
         return f"<Session {self.title}>"
@@ -51,3 +99,39 @@ session_participants = Table(
     Column("dog_id", UUID(as_uuid=True), ForeignKey("dogs.id"), primary_key=True),
     Column("joined_at", DateTime, default=datetime.utcnow, nullable=False),
 )
+
+
+class SquareCard(Base):
+    """A session as the square lists it, kept in step by ``SquareService``.
+
+    Only sessions still worth showing (recruiting, full or upcoming) have a
+    card. The rest is copied from the session, its location and the avatars
+    of its first participants, so a page reads one row per card.
+    """
+
+    __tablename__ = "square_cards"
+    __table_args__ = (
+        # Keyset pagination by start time
+        Index("ix_square_cards_scheduled_at", "scheduled_at", "session_id"),
+    )
+
+    session_id = Column(
+        UUID(as_uuid=True), ForeignKey("sessions.id", ondelete="CASCADE"), primary_key=True
+    )
+    title = Column(String(100), nullable=False)
+    scheduled_at = Column(DateTime, nullable=False)
+    status = Column(Enum(SessionStatus), nullable=False)
+    current_dogs = Column(Integer, nullable=False)
+    max_dogs = Column(Integer, nullable=False)
+    location_id = Column(UUID(as_uuid=True), nullable=False)
+    location_name = Column(String(100), nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    # Copied from the location, for nearest-first pages
+    geohash = Column(String(12, collation="C"), nullable=False, index=True)
+    # Of the first dogs to join, in joining order; None for a dog without one
+    avatars = Column(ARRAY(String(500)), nullable=False, default=list, server_default="{}")
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<SquareCard {self.title}>"
@@ -0,0 +1,21 @@
+"""Tag popularity model."""
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String
+
+from app.database import Base
+
+
+class TagStat(Base):
+    """How many posts or locations carry a tag, kept up to date on create."""
+
+    __tablename__ = "tag_stats"
+
+    kind = Column(String(10), primary_key=True)
+    tag = Column(String(30), primary_key=True)
+    use_count = Column(Integer, nullable=False, default=0)
+    # Watermark for refreshing the autocomplete index incrementally
+    last_used_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<TagStat {self.kind}:{self.tag} {self.use_count}>"
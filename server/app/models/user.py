@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, Integer, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -19,6 +19,8 @@ class User(Base):
     avatar = Column(String(500), nullable=True)
     phone = Column(String(20), nullable=True, unique=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Maintained by FollowService; decides between fan-out and pull for posts
+    follower_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     dogs = relationship("Dog", back_populates="user", cascade="all, delete-orphan")
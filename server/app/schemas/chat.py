@@ -0,0 +1,60 @@
+"""Chat schemas."""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.models.chat import ChatMessageType
+
+
+class ChatGroupResponse(BaseModel):
+    """Chat group response schema."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    session_id: UUID
+    name: str
+    created_at: datetime
+
+
+class ChatMessageCreate(BaseModel):
+    """Chat message create schema."""
+
+    content: str = Field(..., min_length=1, max_length=2000)
+    message_type: ChatMessageType = ChatMessageType.text
+
+
+class ChatMessageResponse(BaseModel):
+    """Chat message response schema."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    group_id: UUID
+    user_id: UUID
+    content: str
+    message_type: ChatMessageType
+    created_at: datetime
+
+
+class ChatHistoryMessage(BaseModel):
+    """Chat history item (the group is implied by the request)."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    user_id: UUID
+    content: str
+    message_type: ChatMessageType
+    created_at: datetime
+
+
+class ChatHistoryPage(BaseModel):
+    """One page of chat history, oldest first."""
+
+    messages: list[ChatHistoryMessage]
+    has_more: bool
+    before_cursor: Optional[str] = None
+    after_cursor: Optional[str] = None
@@ -1,8 +1,26 @@
 """Dog schemas."""
-from pydantic import BaseModel, Field
+from typing import Annotated, Any
+
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    StringConstraints,
+    ValidationInfo,
+    field_validator,
+)
 from uuid import UUID
+from app.core.breeds import canonical_breed
 from app.models.dog import DogSize, DogGender
 
+# Stored under the catalogue name, so breed filters compare by exact match
+Breed = Annotated[
+    str,
+    StringConstraints(strip_whitespace=True, min_length=1, max_length=50),
+    AfterValidator(canonical_breed),
+]
+
 
 class DogBase(BaseModel):
     """Dog base schema."""
@@ -18,23 +36,52 @@ class DogBase(BaseModel):
 class DogCreate(DogBase):
     """Dog create schema."""
 
-    pass
+    breed: Breed
 
 
 class DogResponse(DogBase):
     """Dog response schema."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     user_id: UUID
     mbti: str | None = None
 
 
+class DogBrief(BaseModel):
+    """What a post or session card shows of a dog."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    user_id: UUID
+    name: str
+    breed: str
+    avatar: str | None = None
+
+
 class DogUpdate(BaseModel):
     """Dog update schema."""
 
     name: str | None = Field(None, min_length=1, max_length=50)
-    breed: str | None = Field(None, min_length=1, max_length=50)
+    breed: Breed | None = None
     size: DogSize | None = None
     gender: DogGender | None = None
     age_months: int | None = Field(None, ge=0, le=360)
     avatar: str | None = None
+
+    @field_validator("name", "breed", "size", "gender", "age_months")
+    @classmethod
+    def check_not_null(cls, value: Any, info: ValidationInfo) -> Any:
+        # Omitted means unchanged; an explicit null would hit a NOT NULL column
+        if value is None:
+            raise ValueError(f"{info.field_name} must not be null")
+        return value
+
+
+class BreedSuggestion(BaseModel):
+    """A catalogue breed offered for a search box."""
+
+    name: str
+    en: str
@@ -0,0 +1,49 @@
+"""Location schemas."""
+from pydantic import BaseModel, ConfigDict, Field
+from uuid import UUID
+
+from app.schemas.tag import TagList
+
+
+class LocationBase(BaseModel):
+    """Location base schema."""
+
+    name: str = Field(..., min_length=1, max_length=100)
+    address: str = Field(..., min_length=1, max_length=500)
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    is_dog_friendly: bool = True
+    tags: list[str] = []
+
+
+class LocationCreate(LocationBase):
+    """Location create schema."""
+
+    tags: TagList = Field(default_factory=list, max_length=20)
+
+
+class LocationResponse(LocationBase):
+    """Location response schema."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    created_by: UUID | None = None
+
+
+class LocationBrief(BaseModel):
+    """What a session card shows of its location."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+    address: str
+    latitude: float
+    longitude: float
+
+
+class NearbyLocationResponse(LocationResponse):
+    """Location response with distance from the query point."""
+
+    distance_km: float
@@ -0,0 +1,52 @@
+"""Media upload schemas."""
+import enum
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+ImageContentType = Literal["image/jpeg", "image/png", "image/webp", "image/gif"]
+
+
+class MediaPurpose(str, enum.Enum):
+    """What an uploaded image is for; it names the storage folder."""
+
+    user_avatar = "user_avatar"
+    dog_avatar = "dog_avatar"
+    dog_image = "dog_image"
+    post_image = "post_image"
+
+
+class UploadRequest(BaseModel):
+    """Ask for a direct upload of one image."""
+
+    purpose: MediaPurpose
+    content_type: ImageContentType
+    size: int | None = Field(None, gt=0)
+
+
+class UploadTicket(BaseModel):
+    """Where to send the file: a form POST with ``fields`` or a PUT with ``headers``."""
+
+    key: str
+    url: str
+    method: Literal["POST", "PUT"]
+    fields: dict[str, str] = Field(default_factory=dict)
+    headers: dict[str, str] = Field(default_factory=dict)
+    max_bytes: int
+    expires_at: int
+
+
+class UploadComplete(BaseModel):
+    """Confirm a direct upload has finished."""
+
+    key: str = Field(..., min_length=1, max_length=200)
+
+
+class MediaResponse(BaseModel):
+    """A stored image, with its thumbnails by longest side in pixels."""
+
+    key: str
+    url: str
+    width: int
+    height: int
+    thumbnails: dict[int, str]
@@ -0,0 +1,11 @@
+"""Notification schemas."""
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class DeviceTokenRegister(BaseModel):
+    """Register a device for push notifications."""
+
+    token: str = Field(..., min_length=1, max_length=512)
+    platform: Optional[Literal["ios", "android", "web"]] = None
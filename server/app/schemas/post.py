@@ -0,0 +1,64 @@
+"""Post schemas."""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.dog import DogBrief
+from app.schemas.tag import TagList
+from app.schemas.user import UserBrief
+
+
+class PostCreate(BaseModel):
+    """Post create schema."""
+
+    dog_id: UUID
+    content: str | None = Field(None, max_length=2000)
+    images: list[str] = Field(default_factory=list, max_length=9)
+    tags: TagList = Field(default_factory=list, max_length=10)
+
+
+class PostResponse(BaseModel):
+    """Post response schema."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    user_id: UUID
+    dog_id: UUID
+    content: str | None = None
+    images: list[str] | None = None
+    tags: list[str] | None = None
+    like_count: int = 0
+    comment_count: int = 0
+    created_at: datetime
+    # Filled in by read routes through the request's loaders
+    author: UserBrief | None = None
+    author_dog: DogBrief | None = None
+
+
+class CommentCreate(BaseModel):
+    """Comment create schema."""
+
+    content: str = Field(..., min_length=1, max_length=500)
+
+
+class CommentResponse(BaseModel):
+    """Comment response schema."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    post_id: UUID
+    user_id: UUID
+    content: str
+    created_at: datetime
+
+
+class PostPage(BaseModel):
+    """One page of posts, newest first."""
+
+    posts: list[PostResponse]
+    has_more: bool
+    next_cursor: Optional[str] = None
@@ -0,0 +1,139 @@
+"""Session schemas."""
+import enum
+from datetime import datetime, timezone
+from typing import Annotated, Optional
+from uuid import UUID
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    StringConstraints,
+    field_validator,
+    model_validator,
+)
+
+from app.models.dog import DogSize
+from app.models.session import MAX_AGE_MONTHS, SessionStatus
+from app.schemas.dog import Breed, DogBrief
+from app.schemas.location import LocationBrief
+from app.schemas.user import UserBrief
+
+MBTI = Annotated[str, StringConstraints(to_upper=True, pattern=r"^[EIei][SNsn][TFtf][JPjp]$")]
+
+
+class SessionRequirements(BaseModel):
+    """Who may join a session; an empty or missing field accepts every dog."""
+
+    sizes: list[DogSize] = Field(default_factory=list, max_length=len(DogSize))
+    age_min_months: int | None = Field(None, ge=0, le=MAX_AGE_MONTHS)
+    age_max_months: int | None = Field(None, ge=0, le=MAX_AGE_MONTHS)
+    breeds: list[Breed] = Field(default_factory=list, max_length=20)
+    mbti: list[MBTI] = Field(default_factory=list, max_length=16)
+
+    @model_validator(mode="after")
+    def check_age_range(self) -> "SessionRequirements":
+        if (
+            self.age_min_months is not None
+            and self.age_max_months is not None
+            and self.age_min_months > self.age_max_months
+        ):
+            raise ValueError("age_min_months must not exceed age_max_months")
+        return self
+
+
+class SessionBase(BaseModel):
+    """Session base schema."""
+
+    title: str = Field(..., min_length=1, max_length=100)
+    location_id: UUID
+    scheduled_at: datetime
+    max_dogs: int = Field(..., ge=2, le=50)
+    requirements: SessionRequirements | None = None
+
+
+class SessionCreate(SessionBase):
+    """Session create schema."""
+
+    @field_validator("scheduled_at")
+    @classmethod
+    def to_naive_utc(cls, value: datetime) -> datetime:
+        # scheduled_at is a naive UTC column; an offset would fail the insert
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class SessionJoin(BaseModel):
+    """Join or leave a session with one of your dogs."""
+
+    dog_id: UUID
+
+
+class SessionResponse(SessionBase):
+    """Session response schema."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    creator_id: UUID
+    status: SessionStatus
+    current_dogs: int
+    chat_group_id: UUID | None = None
+    created_at: datetime
+
+
+class SessionCard(SessionResponse):
+    """A session with its creator, place and the dogs taking part."""
+
+    creator: UserBrief | None = None
+    place: LocationBrief | None = None
+    dogs: list[DogBrief] = Field(default_factory=list)
+
+
+class EligibleSession(SessionCard):
+    """A session together with the current user's dogs that may join it."""
+
+    eligible_dog_ids: list[UUID]
+
+
+class EligibleSessionPage(BaseModel):
+    """One page of sessions the current user's dogs qualify for."""
+
+    sessions: list[EligibleSession]
+    has_more: bool
+    next_cursor: Optional[str] = None
+
+
+class SquareSort(str, enum.Enum):
+    """Order of the square's session list."""
+
+    time = "time"
+    distance = "distance"
+
+
+class SquareCardResponse(BaseModel):
+    """A session as the square lists it."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    session_id: UUID
+    title: str
+    scheduled_at: datetime
+    status: SessionStatus
+    current_dogs: int
+    max_dogs: int
+    location_id: UUID
+    location_name: str
+    latitude: float
+    longitude: float
+    avatars: list[str | None]
+    distance_km: float | None = None
+
+
+class SquarePage(BaseModel):
+    """One page of the square, soonest or nearest first."""
+
+    cards: list[SquareCardResponse]
+    has_more: bool
+    next_cursor: Optional[str] = None
@@ -0,0 +1,39 @@
+"""Tag schemas."""
+import enum
+from typing import Annotated
+
+from pydantic import AfterValidator, BaseModel
+
+MAX_TAG_LENGTH = 30
+
+
+class TagKind(str, enum.Enum):
+    """What a tag is attached to."""
+
+    post = "post"
+    location = "location"
+
+
+def normalize_tag(value: str) -> str:
+    """Strip "#" and whitespace and casefold, so "#Corgi " and "corgi" are one tag."""
+    tag = value.strip().lstrip("#＃").strip().casefold()
+    if not tag:
+        raise ValueError("tag must not be empty")
+    if len(tag) > MAX_TAG_LENGTH:
+        raise ValueError(f"tag must be at most {MAX_TAG_LENGTH} characters")
+    return tag
+
+
+def _unique(tags: list[str]) -> list[str]:
+    return list(dict.fromkeys(tags))
+
+
+Tag = Annotated[str, AfterValidator(normalize_tag)]
+TagList = Annotated[list[Tag], AfterValidator(_unique)]
+
+
+class TagSuggestion(BaseModel):
+    """An autocomplete suggestion and how many posts or locations use it."""
+
+    tag: str
+    count: int
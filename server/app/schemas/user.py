@@ -1,5 +1,5 @@
 """User schemas."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from uuid import UUID
 
 
@@ -13,12 +13,32 @@ class UserBase(BaseModel):
 class UserResponse(UserBase):
     """User response schema."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     phone: str | None = None
 
 
+class UserBrief(BaseModel):
+    """What a post or session card shows of a user."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    nickname: str
+    avatar: str | None = None
+
+
 class UserUpdate(BaseModel):
     """User update schema."""
 
     nickname: str | None = Field(None, min_length=1, max_length=50)
     avatar: str | None = None
+
+    @field_validator("nickname")
+    @classmethod
+    def check_nickname(cls, value: str | None) -> str:
+        # Omitted means unchanged; an explicit null would hit the NOT NULL column
+        if value is None:
+            raise ValueError("nickname must not be null")
+        return value
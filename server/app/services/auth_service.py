@@ -2,11 +2,21 @@
 import uuid
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache, restore, snapshot
+from app.core.config import settings
 from app.core.security import create_access_token
 from app.models.user import User
+from app.schemas.user import UserUpdate
+
+# Column snapshots of recently authenticated users, keyed by str(user.id).
+# Per worker process: other workers only see an update once their entry expires.
+user_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
 
 
 class AuthService:
@@ -23,6 +33,50 @@ class AuthService:
         """Get user by ID."""
         return await db.get(User, user_id)
 
+    @staticmethod
+    async def get_user_by_id_cached(
+        db: AsyncSession, user_id: uuid.UUID | str
+    ) -> Optional[User]:
+        """Get user by ID, skipping the database when a fresh snapshot is cached."""
+        try:
+            user_id = uuid.UUID(str(user_id))
+        except ValueError:
+            return None
+
+        key = str(user_id)
+        data = user_cache.get(key)
+        if data is not None:
+            return await restore(db, User, data)
+
+        user = await AuthService.get_user_by_id(db, user_id)
+        if user is not None:
+            user_cache.set(key, snapshot(user))
+        return user
+
+    @staticmethod
+    async def update_user(
+        db: AsyncSession, user_id: uuid.UUID, data: UserUpdate
+    ) -> Optional[User]:
+        """Update user profile."""
+        user = await db.get(User, user_id)
+        if not user:
+            return None
+
+        update_data = data.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(user, field, value)
+
+        await db.commit()
+        await db.refresh(user)
+        # Drop again after commit in case a concurrent request re-cached the old row
+        AuthService.invalidate_user(user.id)
+        return user
+
+    @staticmethod
+    def invalidate_user(user_id: uuid.UUID | str) -> None:
+        """Drop a user's cached snapshot."""
+        user_cache.delete(str(user_id))
+
     @staticmethod
     async def create_user(
         db: AsyncSession, phone: str, nickname: str
@@ -59,3 +113,10 @@ class AuthService:
         # MVP: Just log the code
         print(f"[SMS] Verification code for {phone}: 1234")
         return True
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    """Keep the user cache honest for every ORM write path."""
+    AuthService.invalidate_user(target.id)
@@ -0,0 +1,124 @@
+"""Breed autocomplete over the breed catalogue.
+
+``BreedIndex`` is built once, at startup, from ``app.core.breeds``. Every
+breed contributes search keys: its Chinese name and aliases, the words of
+its English name, and the full pinyin and pinyin initials of each Chinese
+spelling. A query is folded the same way and also converted to pinyin
+character by character, so mixed input such as "jin毛" finds 金毛寻回犬.
+
+Keys are kept sorted for prefix matches by bisect, a trigram posting list
+catches typos ("labrodor"), and a substring pass over the few hundred keys
+catches infixes ("寻回"). Exact matches rank above prefix matches, which
+rank above fuzzy ones; pinyin read off Chinese input ranks below the
+characters actually typed, so "金" prefers 金毛 over 京巴.
+"""
+import bisect
+from collections import Counter, defaultdict
+from typing import NamedTuple, Optional, Sequence
+
+from app.core.breeds import BREEDS, Breed, fold, pinyin_initials, to_pinyin
+
+# A fuzzy match must share this share of the query's trigrams
+MIN_TRIGRAM_COVERAGE = 0.5
+
+_PREFIX_END = "\U0010ffff"
+
+
+class BreedMatch(NamedTuple):
+    breed: Breed
+    score: float
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class BreedIndex:
+    """Ranked breed suggestions for Chinese, pinyin and English input."""
+
+    def __init__(self, breeds: Sequence[Breed] = BREEDS) -> None:
+        self.breeds = list(breeds)
+        entries = set()
+        for position, breed in enumerate(self.breeds):
+            for text in (breed.name, *breed.aliases, *breed.en.split()):
+                for key in (fold(text), to_pinyin(text), pinyin_initials(text)):
+                    if key:
+                        entries.add((key, position))
+            entries.add((fold(breed.en), position))
+
+        ordered = sorted(entries)
+        self.keys = [key for key, _ in ordered]
+        self.owners = [position for _, position in ordered]
+        self.trigrams: dict[str, list[int]] = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            for trigram in _trigrams(key):
+                self.trigrams[trigram].append(key_id)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(self, query: str, limit: int = 10) -> list[BreedMatch]:
+        """Return up to ``limit`` breeds best matching ``query``, best first."""
+        folded = fold(query)
+        if not folded:
+            return [BreedMatch(breed, 0.0) for breed in self.breeds[:limit]]
+        variants = {folded: 1.0}
+        variants.setdefault(to_pinyin(folded), 0.9)
+
+        scores: dict[int, float] = {}
+
+        def offer(key_id: int, score: float) -> None:
+            owner = self.owners[key_id]
+            if score > scores.get(owner, 0.0):
+                scores[owner] = score
+
+        for variant, weight in variants.items():
+            start = bisect.bisect_left(self.keys, variant)
+            end = bisect.bisect_left(self.keys, variant + _PREFIX_END, start)
+            for key_id in range(start, end):
+                key = self.keys[key_id]
+                exact = key == variant
+                offer(key_id, weight * (1.0 if exact else 0.7 + 0.25 * len(variant) / len(key)))
+
+            query_trigrams = _trigrams(variant)
+            shared = Counter(
+                key_id
+                for trigram in query_trigrams
+                for key_id in self.trigrams.get(trigram, ())
+            )
+            for key_id, count in shared.items():
+                coverage = count / len(query_trigrams)
+                if coverage >= MIN_TRIGRAM_COVERAGE:
+                    offer(key_id, weight * 0.65 * coverage)
+
+            # Short infixes ("寻回") share no padded trigram with the key
+            for key_id, key in enumerate(self.keys):
+                if variant in key:
+                    offer(key_id, weight * (0.5 + 0.2 * len(variant) / len(key)))
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [BreedMatch(self.breeds[position], score) for position, score in ranked[:limit]]
+
+
+class BreedCatalogue:
+    """Holds the process-wide ``BreedIndex``, built on first use or at startup."""
+
+    def __init__(self) -> None:
+        self._index: Optional[BreedIndex] = None
+
+    def load(self) -> BreedIndex:
+        if self._index is None:
+            self._index = BreedIndex()
+        return self._index
+
+    def search(self, query: str, limit: int = 10) -> list[BreedMatch]:
+        return self.load().search(query, limit)
+
+    def stats(self) -> dict[str, int]:
+        """Return the catalogue and index sizes."""
+        index = self.load()
+        return {"breeds": len(index.breeds), "keys": len(index)}
+
+
+breed_catalogue = BreedCatalogue()
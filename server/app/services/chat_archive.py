@@ -0,0 +1,408 @@
+"""Chat message partition maintenance and cold storage.
+
+``chat_messages`` is range-partitioned by month of ``created_at``. A
+background ``ChatArchiver`` keeps the hot table small:
+
+* it creates the partitions for the coming months ahead of time, so inserts
+  never fall through to the default partition;
+* it moves the messages of groups whose session ended a while ago into
+  gzip-compressed JSON-lines files in cold storage and marks the group
+  archived;
+* it drops past monthly partitions once archiving has emptied them.
+
+Archived history is still readable: ``load_archived`` fetches and caches a
+group's archive so ``ChatService.get_history`` can merge it with any rows
+that are still hot.
+"""
+import asyncio
+import bisect
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import delete, select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.database import AsyncSessionLocal
+from app.models.chat import ChatGroup, ChatMessage
+from app.models.session import Session, SessionStatus
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "chat_messages"
+PARTITION_PATTERN = re.compile(r"^chat_messages_p(\d{4})_(\d{2})$")
+
+# Held by whichever worker is running maintenance
+LOCK_KEY = "chat:archive:lock"
+
+# Rows fetched per round-trip while streaming a group into its archive
+STREAM_BATCH_SIZE = 1000
+
+# Decoded archives are immutable, so cached copies only expire to free memory
+ARCHIVE_CACHE_TTL_SECONDS = 3600
+
+
+class ArchivedMessage(NamedTuple):
+    """A message read back from cold storage."""
+
+    id: UUID
+    user_id: UUID
+    content: str
+    message_type: str
+    created_at: datetime
+
+
+ARCHIVE_COLUMNS = tuple(getattr(ChatMessage, field) for field in ArchivedMessage._fields)
+
+
+def _sort_key(message: Any) -> tuple[datetime, UUID]:
+    return message.created_at, message.id
+
+
+class LocalColdStorage:
+    """Cold storage on the local filesystem, standing in for an object store."""
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an object, replacing any previous version atomically."""
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(partial, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(partial, path)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return an object's bytes, or None if it does not exist."""
+        try:
+            return (self.root / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str) -> None:
+        """Remove an object if it exists."""
+        (self.root / key).unlink(missing_ok=True)
+
+
+def archive_key(group_id: UUID) -> str:
+    """Return the cold-storage key of a group's archive."""
+    return f"chat/{group_id}.jsonl.gz"
+
+
+def month_start(value: datetime) -> datetime:
+    """Return midnight on the first day of ``value``'s month."""
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Shift a month start by a number of months."""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    """Return the name of the partition holding ``month``."""
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+
+def decode_archive(data: bytes) -> list[ArchivedMessage]:
+    """Parse an archive back into messages, oldest first."""
+    messages = [
+        ArchivedMessage(
+            id=UUID(item["id"]),
+            user_id=UUID(item["user_id"]),
+            content=item["content"],
+            message_type=item["message_type"],
+            created_at=datetime.fromisoformat(item["created_at"]),
+        )
+        for item in map(json.loads, gzip.decompress(data).splitlines())
+    ]
+    messages.sort(key=_sort_key)
+    return messages
+
+
+def _encode_line(message: Any) -> bytes:
+    message_type = message.message_type
+    item = {
+        "id": str(message.id),
+        "user_id": str(message.user_id),
+        "content": message.content,
+        "message_type": getattr(message_type, "value", message_type),
+        "created_at": message.created_at.isoformat(),
+    }
+    return json.dumps(item, ensure_ascii=False).encode() + b"\n"
+
+
+def page_archived(
+    archived: list[ArchivedMessage],
+    rows: list[Any],
+    has_more: bool,
+    cursor: Optional[tuple[datetime, UUID]],
+    direction: str,
+    limit: int,
+) -> tuple[list[Any], bool]:
+    """Merge a page of hot rows with the matching slice of a group's archive."""
+    if direction == "before":
+        end = bisect.bisect_left(archived, cursor, key=_sort_key) if cursor else len(archived)
+        candidates = archived[max(0, end - limit - 1) : end]
+    else:
+        start = bisect.bisect_right(archived, cursor, key=_sort_key) if cursor else 0
+        candidates = archived[start : start + limit + 1]
+
+    merged = sorted([*rows, *candidates], key=_sort_key)
+    has_more = has_more or len(merged) > limit
+    return (merged[-limit:] if direction == "before" else merged[:limit]), has_more
+
+
+class ChatArchiver:
+    """Background maintenance of chat partitions and cold storage."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        storage: Optional[LocalColdStorage] = None,
+        months_ahead: int = settings.CHAT_PARTITION_MONTHS_AHEAD,
+        archive_after_days: int = settings.CHAT_ARCHIVE_AFTER_DAYS,
+        batch_size: int = settings.CHAT_ARCHIVE_BATCH_SIZE,
+        interval: float = settings.CHAT_ARCHIVE_INTERVAL_SECONDS,
+        cache_size: int = settings.CHAT_ARCHIVE_CACHE_SIZE,
+    ) -> None:
+        self.session_factory = session_factory
+        self.storage = storage or LocalColdStorage(settings.CHAT_ARCHIVE_DIR)
+        self.months_ahead = months_ahead
+        self.archive_after = timedelta(days=archive_after_days)
+        self.batch_size = batch_size
+        self.interval = interval
+        self._cache = TTLCache(cache_size, ARCHIVE_CACHE_TTL_SECONDS)
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.failed_runs = 0
+        self.partitions_created = 0
+        self.partitions_dropped = 0
+        self.groups_archived = 0
+        self.messages_archived = 0
+
+    def start(self) -> None:
+        """Start the periodic maintenance loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the maintenance loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self.failed_runs += 1
+                logger.exception("Chat storage maintenance failed")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self, now: Optional[datetime] = None) -> bool:
+        """Run one maintenance pass; False if another worker holds the lock."""
+        now = now or datetime.utcnow()
+        token = uuid.uuid4().hex
+        if not await self._acquire(token):
+            return False
+        try:
+            await self.ensure_partitions(now)
+            await self.archive_ended_groups(now)
+            await self.drop_empty_partitions(now)
+            self.runs += 1
+        finally:
+            await self._release(token)
+        return True
+
+    async def _acquire(self, token: str) -> bool:
+        try:
+            return bool(
+                await get_redis().set(LOCK_KEY, token, nx=True, ex=max(60, int(self.interval)))
+            )
+        except (RedisError, OSError):
+            # Every step is idempotent, so running unlocked is only wasted work
+            logger.warning("Chat maintenance lock unavailable; running unlocked")
+            return True
+
+    async def _release(self, token: str) -> None:
+        try:
+            redis = get_redis()
+            if await redis.get(LOCK_KEY) == token.encode():
+                await redis.delete(LOCK_KEY)
+        except (RedisError, OSError):
+            pass
+
+    async def _partitions(self, db: AsyncSession) -> set[str]:
+        result = await db.scalars(
+            text(
+                "SELECT child.relname FROM pg_inherits"
+                " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+                " JOIN pg_class parent ON parent.oid = pg_inherits.inhparent"
+                " WHERE parent.relname = :parent"
+            ),
+            {"parent": PARENT_TABLE},
+        )
+        return set(result)
+
+    async def ensure_partitions(self, now: Optional[datetime] = None) -> list[str]:
+        """Create any missing partitions from this month to ``months_ahead``."""
+        first = month_start(now or datetime.utcnow())
+        created = []
+        async with self.session_factory() as db:
+            existing = await self._partitions(db)
+            for offset in range(self.months_ahead + 1):
+                month = add_months(first, offset)
+                name = partition_name(month)
+                if name in existing:
+                    continue
+                try:
+                    await db.execute(
+                        text(
+                            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE}'
+                            f" FOR VALUES FROM ('{month:%Y-%m-%d}')"
+                            f" TO ('{add_months(month, 1):%Y-%m-%d}')"
+                        )
+                    )
+                    await db.commit()
+                except Exception:
+                    # Usually rows for this month already sit in the default partition
+                    await db.rollback()
+                    logger.exception("Could not create chat partition %s", name)
+                    continue
+                created.append(name)
+        self.partitions_created += len(created)
+        return created
+
+    async def archive_ended_groups(self, now: Optional[datetime] = None) -> int:
+        """Archive one batch of groups whose session ended before the cutoff."""
+        cutoff = (now or datetime.utcnow()) - self.archive_after
+        async with self.session_factory() as db:
+            group_ids = list(
+                await db.scalars(
+                    select(ChatGroup.id)
+                    .join(Session, Session.id == ChatGroup.session_id)
+                    .where(
+                        Session.status == SessionStatus.ended,
+                        Session.scheduled_at < cutoff,
+                        ChatGroup.archived_at.is_(None),
+                    )
+                    .limit(self.batch_size)
+                )
+            )
+        for group_id in group_ids:
+            await self.archive_group(group_id)
+        return len(group_ids)
+
+    async def archive_group(self, group_id: UUID) -> int:
+        """Move a group's messages to cold storage; return how many were moved.
+
+        The archive is written before the hot rows are deleted, and only rows
+        up to the last archived key are deleted, so messages that arrive
+        meanwhile stay hot and nothing is lost if a step fails.
+        """
+        async with self.session_factory() as db:
+            stmt = (
+                select(*ARCHIVE_COLUMNS)
+                .where(ChatMessage.group_id == group_id)
+                .order_by(ChatMessage.created_at, ChatMessage.id)
+                .execution_options(yield_per=STREAM_BATCH_SIZE)
+            )
+            buffer = io.BytesIO()
+            count = 0
+            last_key = None
+            with gzip.GzipFile(fileobj=buffer, mode="wb") as archive:
+                async for row in await db.stream(stmt):
+                    archive.write(_encode_line(row))
+                    count += 1
+                    last_key = _sort_key(row)
+
+            if count:
+                await asyncio.to_thread(
+                    self.storage.put, archive_key(group_id), buffer.getvalue()
+                )
+                await db.execute(
+                    delete(ChatMessage).where(
+                        ChatMessage.group_id == group_id,
+                        tuple_(ChatMessage.created_at, ChatMessage.id) <= tuple_(*last_key),
+                    )
+                )
+            await db.execute(
+                update(ChatGroup)
+                .where(ChatGroup.id == group_id)
+                .values(archived_at=datetime.utcnow())
+            )
+            await db.commit()
+
+        self._cache.delete(group_id)
+        self.groups_archived += 1
+        self.messages_archived += count
+        return count
+
+    async def drop_empty_partitions(self, now: Optional[datetime] = None) -> list[str]:
+        """Drop monthly partitions before the current month that hold no rows."""
+        current = month_start(now or datetime.utcnow())
+        dropped = []
+        async with self.session_factory() as db:
+            for name in sorted(await self._partitions(db)):
+                match = PARTITION_PATTERN.match(name)
+                if match is None:
+                    continue
+                month = datetime(int(match.group(1)), int(match.group(2)), 1)
+                if month >= current:
+                    continue
+                if await db.scalar(text(f'SELECT EXISTS (SELECT 1 FROM "{name}")')):
+                    continue
+                await db.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+                await db.execute(text(f'DROP TABLE "{name}"'))
+                await db.commit()
+                dropped.append(name)
+        self.partitions_dropped += len(dropped)
+        return dropped
+
+    async def load_archived(self, group_id: UUID) -> list[ArchivedMessage]:
+        """Return a group's archived messages, oldest first."""
+        messages = self._cache.get(group_id)
+        if messages is None:
+            data = await asyncio.to_thread(self.storage.get, archive_key(group_id))
+            messages = await asyncio.to_thread(decode_archive, data) if data else []
+            self._cache.set(group_id, messages)
+        return messages
+
+    def stats(self) -> dict[str, Any]:
+        """Return maintenance counters for this worker."""
+        return {
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "partitions_created": self.partitions_created,
+            "partitions_dropped": self.partitions_dropped,
+            "groups_archived": self.groups_archived,
+            "messages_archived": self.messages_archived,
+            "archive_cache": self._cache.stats(),
+        }
+
+
+chat_archiver = ChatArchiver()
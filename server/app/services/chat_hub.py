@@ -0,0 +1,260 @@
+"""WebSocket chat hub with Redis pub/sub fan-out.
+
+Every worker process runs one ``ChatHub``. Events for a group are published
+to a Redis channel; each worker subscribes to the channels of the groups its
+own sockets have joined and fans received events out locally. Each socket
+has its own bounded outbound queue drained by a dedicated sender task, so a
+slow client never stalls the rest of its group: when its queue overflows or
+a send times out, that client is disconnected.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, Optional, Protocol
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "chat:group:"
+
+# WebSocket close code for clients that cannot keep up ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class OutboundSocket(Protocol):
+    """The part of ``fastapi.WebSocket`` the hub needs."""
+
+    async def send_text(self, data: str) -> None: ...
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None) -> None: ...
+
+
+class ClientConnection:
+    """One socket with its own bounded outbound queue and sender task."""
+
+    def __init__(
+        self,
+        hub: "ChatHub",
+        socket: OutboundSocket,
+        user_id: str,
+        queue_size: int,
+        send_timeout: float,
+    ) -> None:
+        self.socket = socket
+        self.user_id = user_id
+        self.groups: set[str] = set()
+        self.closed = False
+        self._hub = hub
+        self._send_timeout = send_timeout
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self._sender = asyncio.create_task(self._send_loop())
+
+    def offer(self, payload: str) -> bool:
+        """Queue a payload without blocking; False if the queue is full."""
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                payload = await self._queue.get()
+                # Drain whatever else is queued under one timeout to cut per-send overhead
+                async with asyncio.timeout(self._send_timeout):
+                    while True:
+                        await self.socket.send_text(payload)
+                        self._hub.delivered += 1
+                        try:
+                            payload = self._queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            break
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._hub._evict(self, SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            # Socket already gone; the receive loop will call disconnect()
+            self._hub._evict(self, None)
+
+    async def aclose(self, code: Optional[int]) -> None:
+        """Stop the sender and close the socket."""
+        self.closed = True
+        if self._sender is not asyncio.current_task():
+            self._sender.cancel()
+        if code is not None:
+            try:
+                await self.socket.close(code=code)
+            except Exception:
+                pass
+
+
+class ChatHub:
+    """Per-process registry of chat sockets, joined to other workers via pub/sub."""
+
+    def __init__(
+        self,
+        redis: Any = None,
+        queue_size: int = settings.CHAT_SEND_QUEUE_SIZE,
+        send_timeout: float = settings.CHAT_SEND_TIMEOUT_SECONDS,
+    ) -> None:
+        self._redis = redis
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self._groups: dict[str, set[ClientConnection]] = {}
+        self._users: dict[str, set[ClientConnection]] = {}
+        self._pubsub: Any = None
+        self._reader: Optional[asyncio.Task] = None
+        self._has_channels = asyncio.Event()
+        self._background: set[asyncio.Task] = set()
+        self.published = 0
+        self.delivered = 0
+        self.slow_consumers = 0
+
+    @property
+    def redis(self) -> Any:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    def connect(self, socket: OutboundSocket, user_id: str) -> ClientConnection:
+        """Register an accepted socket."""
+        connection = ClientConnection(self, socket, user_id, self.queue_size, self.send_timeout)
+        self._users.setdefault(user_id, set()).add(connection)
+        return connection
+
+    def is_connected(self, user_id: str) -> bool:
+        """Whether the user has an open socket on this worker."""
+        return bool(self._users.get(user_id))
+
+    async def join(self, connection: ClientConnection, group_id: str) -> None:
+        """Add a socket to a group, subscribing this worker if it is the first."""
+        members = self._groups.get(group_id)
+        if members is None:
+            members = self._groups[group_id] = set()
+            await self._subscribe(group_id)
+        members.add(connection)
+        connection.groups.add(group_id)
+
+    async def leave(self, connection: ClientConnection, group_id: str) -> None:
+        """Remove a socket from a group, unsubscribing if it was the last."""
+        connection.groups.discard(group_id)
+        members = self._groups.get(group_id)
+        if members is None:
+            return
+        members.discard(connection)
+        if not members:
+            del self._groups[group_id]
+            await self._unsubscribe(group_id)
+
+    async def disconnect(self, connection: ClientConnection, code: Optional[int] = None) -> None:
+        """Forget a socket, stop its sender and optionally close it with ``code``."""
+        for group_id in list(connection.groups):
+            await self.leave(connection, group_id)
+        sockets = self._users.get(connection.user_id)
+        if sockets is not None:
+            sockets.discard(connection)
+            if not sockets:
+                del self._users[connection.user_id]
+        await connection.aclose(code)
+
+    async def publish(self, group_id: str, event: dict) -> None:
+        """Send an event to every member of a group on every worker."""
+        await self.redis.publish(CHANNEL_PREFIX + group_id, json.dumps(event, default=str))
+        self.published += 1
+
+    def send_local(self, connection: ClientConnection, event: dict) -> None:
+        """Queue an event for a single local socket."""
+        if not connection.offer(json.dumps(event, default=str)):
+            self._evict(connection, SLOW_CONSUMER_CLOSE_CODE)
+
+    def _dispatch(self, group_id: str, payload: str) -> None:
+        """Fan a serialized event out to local members without awaiting sends."""
+        for connection in list(self._groups.get(group_id, ())):
+            if not connection.offer(payload):
+                self._evict(connection, SLOW_CONSUMER_CLOSE_CODE)
+
+    def _evict(self, connection: ClientConnection, code: Optional[int]) -> None:
+        if connection.closed:
+            return
+        if code == SLOW_CONSUMER_CLOSE_CODE:
+            self.slow_consumers += 1
+            logger.info("Disconnecting slow chat consumer %s", connection.user_id)
+        connection.closed = True
+        for group_id in list(connection.groups):
+            members = self._groups.get(group_id)
+            if members is not None:
+                members.discard(connection)
+        task = asyncio.create_task(self.disconnect(connection, code))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _subscribe(self, group_id: str) -> None:
+        if self._pubsub is None:
+            self._pubsub = self.redis.pubsub()
+        await self._pubsub.subscribe(CHANNEL_PREFIX + group_id)
+        self._has_channels.set()
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _unsubscribe(self, group_id: str) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(CHANNEL_PREFIX + group_id)
+        if not self._groups:
+            self._has_channels.clear()
+
+    async def _read_loop(self) -> None:
+        prefix_length = len(CHANNEL_PREFIX)
+        while True:
+            await self._has_channels.wait()
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except (RedisError, OSError):
+                logger.warning("Chat pub/sub read failed; retrying", exc_info=True)
+                await asyncio.sleep(1.0)
+                continue
+
+            if message is None or message.get("type") != "message":
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            data = message["data"]
+            self._dispatch(
+                channel[prefix_length:], data.decode() if isinstance(data, bytes) else data
+            )
+
+    async def close(self) -> None:
+        """Disconnect every socket and stop listening (worker shutdown)."""
+        connections = {conn for sockets in self._users.values() for conn in sockets}
+        for connection in connections:
+            await self.disconnect(connection, 1001)
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    def stats(self) -> dict[str, int]:
+        """Return fan-out counters for this worker."""
+        return {
+            "users": len(self._users),
+            "groups": len(self._groups),
+            "connections": sum(len(members) for members in self._groups.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "slow_consumers": self.slow_consumers,
+        }
+
+
+hub = ChatHub()
@@ -0,0 +1,104 @@
+"""Chat service."""
+from datetime import datetime
+from typing import Any, Literal, Optional
+from uuid import UUID
+
+from sqlalchemy import exists, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.chat import ChatGroup, ChatMessage, ChatMessageType
+from app.models.dog import Dog
+from app.models.session import Session, session_participants
+from app.services.chat_archive import chat_archiver, page_archived
+
+# Only what a history item needs; ``group_id`` is implied by the request
+HISTORY_COLUMNS = (
+    ChatMessage.id,
+    ChatMessage.user_id,
+    ChatMessage.content,
+    ChatMessage.message_type,
+    ChatMessage.created_at,
+)
+
+
+class ChatService:
+    """Chat service."""
+
+    @staticmethod
+    async def get_group(db: AsyncSession, group_id: UUID) -> Optional[ChatGroup]:
+        """Get chat group by ID."""
+        return await db.get(ChatGroup, group_id)
+
+    @staticmethod
+    async def is_member(db: AsyncSession, group_id: UUID, user_id: UUID) -> bool:
+        """Check if user is the session creator or owns a participating dog."""
+        owns_participant = exists().where(
+            session_participants.c.session_id == Session.id,
+            session_participants.c.dog_id == Dog.id,
+            Dog.user_id == user_id,
+        )
+        stmt = select(
+            exists()
+            .where(ChatGroup.id == group_id, Session.id == ChatGroup.session_id)
+            .where(or_(Session.creator_id == user_id, owns_participant))
+        )
+        return bool(await db.scalar(stmt))
+
+    @staticmethod
+    async def create_message(
+        db: AsyncSession,
+        group_id: UUID,
+        user_id: UUID,
+        content: str,
+        message_type: ChatMessageType = ChatMessageType.text,
+    ) -> ChatMessage:
+        """Persist a chat message."""
+        message = ChatMessage(
+            group_id=group_id,
+            user_id=user_id,
+            content=content,
+            message_type=message_type,
+        )
+        db.add(message)
+        await db.commit()
+        await db.refresh(message)
+        return message
+
+    @staticmethod
+    async def get_history(
+        db: AsyncSession,
+        group_id: UUID,
+        cursor: Optional[tuple[datetime, UUID]] = None,
+        direction: Literal["before", "after"] = "before",
+        limit: int = 50,
+    ) -> tuple[list[Any], bool]:
+        """Page through a group's history by ``(created_at, id)``.
+
+        ``before`` pages towards messages older than ``cursor`` (the latest page
+        when there is no cursor) and ``after`` towards newer ones. Returns rows oldest first and
+        whether more rows exist in the paging direction. Groups that have
+        been archived are served from cold storage merged with any hot rows.
+        """
+        key = tuple_(ChatMessage.created_at, ChatMessage.id)
+        stmt = select(*HISTORY_COLUMNS).where(ChatMessage.group_id == group_id)
+        if direction == "before":
+            if cursor is not None:
+                stmt = stmt.where(key < tuple_(*cursor))
+            stmt = stmt.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        else:
+            if cursor is not None:
+                stmt = stmt.where(key > tuple_(*cursor))
+            stmt = stmt.order_by(ChatMessage.created_at, ChatMessage.id)
+
+        # One extra row tells whether another page exists
+        rows = list((await db.execute(stmt.limit(limit + 1))).all())
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if direction == "before":
+            rows.reverse()
+
+        archived_at = await db.scalar(select(ChatGroup.archived_at).where(ChatGroup.id == group_id))
+        if archived_at is not None:
+            archived = await chat_archiver.load_archived(group_id)
+            rows, has_more = page_archived(archived, rows, has_more, cursor, direction, limit)
+        return rows, has_more
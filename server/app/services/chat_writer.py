@@ -0,0 +1,260 @@
+"""Write-behind persistence for chat messages.
+
+Messages are acknowledged and broadcast as soon as they are accepted, then
+written to ``chat_messages`` by a background flusher in multi-row INSERTs,
+triggered by batch size or by a timer. The buffer is FIFO and batches are
+only removed after a successful commit, so ordering within a group is kept
+and a failed flush is retried. ``stop()`` drains the buffer on graceful
+shutdown; what it still cannot write is dead-lettered.
+
+A batch the database rejects (a constraint violation or bad data) is split
+until the offending rows are found; those are dead-lettered and the rest
+written, so one bad row cannot hold back every message behind it. Any other
+failure is retried up to ``CHAT_WRITE_MAX_ATTEMPTS`` times before the batch
+is dead-lettered too, so senders are never blocked for good.
+
+Ordering is guaranteed per worker process: each message gets a
+``created_at`` strictly later than the previous one in its group.
+"""
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.chat import ChatMessage, ChatMessageType
+
+logger = logging.getLogger(__name__)
+
+# Flush-duration samples kept for percentile reporting
+METRIC_WINDOW = 1000
+
+# Longest pause after a failed flush before the flusher tries again
+RETRY_PAUSE_SECONDS = 5.0
+
+# Final flush retries on shutdown, and the pause between them, before the
+# messages still buffered are dead-lettered
+STOP_FLUSH_ATTEMPTS = 3
+STOP_RETRY_SECONDS = 1.0
+
+# Errors that reject rows rather than the connection; retrying cannot help
+REJECTED_ROW_ERRORS = (IntegrityError, DataError)
+
+
+class ChatMessageWriter:
+    """Buffers chat messages and persists them in batches."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        batch_size: int = settings.CHAT_WRITE_BATCH_SIZE,
+        flush_interval: float = settings.CHAT_WRITE_FLUSH_INTERVAL_SECONDS,
+        max_pending: int = settings.CHAT_WRITE_MAX_PENDING,
+        max_attempts: int = settings.CHAT_WRITE_MAX_ATTEMPTS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._attempts = 0
+        self._buffer: list[dict[str, Any]] = []
+        self._last_created: dict[UUID, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.rows_written = 0
+        self.dead_lettered = 0
+        # The most recent dead-lettered rows, for inspection and replay
+        self.dead_letters: deque[dict[str, Any]] = deque(maxlen=METRIC_WINDOW)
+        self._batch_sizes: deque[int] = deque(maxlen=METRIC_WINDOW)
+        self._flush_ms: deque[float] = deque(maxlen=METRIC_WINDOW)
+
+    def start(self) -> None:
+        """Start the background flusher."""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and persist everything still buffered."""
+        self._running = False
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        for _ in range(STOP_FLUSH_ATTEMPTS):
+            await self.flush()
+            if not self._buffer:
+                return
+            await asyncio.sleep(STOP_RETRY_SECONDS)
+        if self._buffer:
+            logger.error(
+                "Chat writer stopped with %d unpersisted messages; dead-lettering them",
+                len(self._buffer),
+            )
+            self._dead_letter(self._buffer)
+            self._buffer.clear()
+            self._has_space.set()
+
+    async def submit(
+        self,
+        group_id: UUID,
+        user_id: UUID,
+        content: str,
+        message_type: ChatMessageType = ChatMessageType.text,
+    ) -> dict[str, Any]:
+        """Accept a message for persistence and return its row values.
+
+        Waits only when the buffer is full, which pushes back on senders
+        while the database is unavailable.
+        """
+        self.start()
+        while len(self._buffer) >= self.max_pending:
+            self._has_space.clear()
+            self._wakeup.set()
+            await self._has_space.wait()
+
+        message = {
+            "id": uuid.uuid4(),
+            "group_id": group_id,
+            "user_id": user_id,
+            "content": content,
+            "message_type": message_type,
+            "created_at": self._next_timestamp(group_id),
+        }
+        self._buffer.append(message)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return message
+
+    def _next_timestamp(self, group_id: UUID) -> datetime:
+        created_at = datetime.utcnow()
+        last = self._last_created.get(group_id)
+        if last is not None and created_at <= last:
+            created_at = last + timedelta(microseconds=1)
+        self._last_created[group_id] = created_at
+        return created_at
+
+    async def _run(self) -> None:
+        while self._running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write buffered messages in order, one batch per transaction."""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[: self.batch_size]
+                start = time.perf_counter()
+                try:
+                    rejected = await self._write_isolating(batch)
+                except Exception:
+                    self.failed_flushes += 1
+                    self._attempts += 1
+                    if self._attempts < self.max_attempts:
+                        logger.exception("Chat message flush failed; will retry")
+                        if self._running:
+                            await asyncio.sleep(min(self.flush_interval * 2, RETRY_PAUSE_SECONDS))
+                        return
+                    logger.exception(
+                        "Chat message flush failed %d times; giving up on the batch",
+                        self._attempts,
+                    )
+                    rejected = batch
+
+                self._attempts = 0
+                self._dead_letter(rejected)
+                del self._buffer[: len(batch)]
+                self.flushes += 1
+                self.rows_written += len(batch) - len(rejected)
+                self._batch_sizes.append(len(batch))
+                self._flush_ms.append((time.perf_counter() - start) * 1000)
+                self._has_space.set()
+
+            # Timestamps only need to be monotonic while messages are buffered
+            self._last_created.clear()
+
+    async def _write_isolating(self, batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Write ``batch`` and return the rows the database rejected.
+
+        A rejected batch is split in halves until the bad rows are alone, so
+        a single bad row costs about 2 * log2(batch_size) extra statements.
+        """
+        try:
+            await self._write(batch)
+            return []
+        except REJECTED_ROW_ERRORS:
+            if len(batch) == 1:
+                return batch
+        middle = len(batch) // 2
+        return await self._write_isolating(batch[:middle]) + await self._write_isolating(
+            batch[middle:]
+        )
+
+    def _dead_letter(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        logger.error(
+            "Dead-lettered %d chat messages: %s",
+            len(rows),
+            ", ".join(f"{row['id']} (group {row['group_id']})" for row in rows),
+        )
+        self.dead_letters.extend(rows)
+        self.dead_lettered += len(rows)
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        # ON CONFLICT keeps a retry of a batch that did commit from failing
+        stmt = insert(ChatMessage).on_conflict_do_nothing(index_elements=["id", "created_at"])
+        async with self.session_factory() as db:
+            await db.execute(stmt, batch)
+            await db.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """Return flush latency and batch-size metrics."""
+        flush_ms = sorted(self._flush_ms)
+        return {
+            "pending": len(self._buffer),
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "rows_written": self.rows_written,
+            "dead_lettered": self.dead_lettered,
+            "batch_size_avg": round(statistics.fmean(self._batch_sizes), 1)
+            if self._batch_sizes
+            else 0,
+            "batch_size_max": max(self._batch_sizes, default=0),
+            "flush_ms_p50": _percentile(flush_ms, 0.50),
+            "flush_ms_p95": _percentile(flush_ms, 0.95),
+            "flush_ms_max": _percentile(flush_ms, 1.0),
+        }
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return round(sorted_values[index], 2)
+
+
+chat_writer = ChatMessageWriter()
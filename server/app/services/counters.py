@@ -0,0 +1,266 @@
+"""Like and comment counters for posts.
+
+Feeds show a like and a comment count on every post. Counting
+``post_likes`` and ``comments`` per render, or bumping a count column on
+every like, would put a hot row under every popular post. Instead:
+
+* a like, unlike or comment commits its row and then adds its delta to one
+  of ``shards`` Redis hashes picked at random, so increments of a hot post
+  spread over several keys;
+* a periodic flush takes each shard's hash out of the way with ``RENAME``,
+  sums the deltas and applies them to ``posts.like_count`` and
+  ``posts.comment_count`` in one ``UPDATE ... FROM (VALUES ...)`` per batch;
+* reads return the count column plus whatever is still pending, read from
+  all shards in a single pipeline.
+
+Deltas lost to a Redis outage, or applied twice when a worker dies between
+committing a flush and deleting the renamed hash, are corrected by
+``reconcile``, which recounts the rows.
+"""
+import logging
+import random
+import uuid
+from collections import defaultdict
+from typing import Any, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError, ResponseError
+from sqlalchemy import Integer, column, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.database import AsyncSessionLocal
+from app.models.post import Comment, Post, PostLike
+
+logger = logging.getLogger(__name__)
+
+PENDING_PREFIX = "counters:posts:pending:"
+FLUSHING_PREFIX = "counters:posts:flushing:"
+
+# Held by whichever worker is flushing or reconciling; a reconciliation
+# renews it before every batch, so it only lapses if that worker stalls
+LOCK_KEY = "counters:posts:lock"
+LOCK_SECONDS = 300
+
+LIKES = "like"
+COMMENTS = "comment"
+FIELDS = (LIKES, COMMENTS)
+
+
+class PostCounters:
+    """Sharded Redis counters flushed in batches to the posts table."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        redis: Any = None,
+        shards: int = settings.COUNTER_SHARDS,
+        batch_size: int = settings.COUNTER_RECONCILE_BATCH_SIZE,
+    ) -> None:
+        self.session_factory = session_factory
+        self._redis = redis
+        self.shards = shards
+        self.batch_size = batch_size
+
+        self.increments = 0
+        self.lost = 0
+
+    @property
+    def redis(self) -> Any:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    async def increment(self, post_id: UUID, field: str, delta: int = 1) -> None:
+        """Count a committed like, unlike or comment."""
+        shard = random.randrange(self.shards)
+        try:
+            await self.redis.hincrby(PENDING_PREFIX + str(shard), f"{post_id}:{field}", delta)
+            self.increments += 1
+        except (RedisError, OSError):
+            # The next reconciliation recounts the rows
+            self.lost += 1
+            logger.warning("Could not count %s %+d on post %s", field, delta, post_id)
+
+    async def pending(self, post_ids: list[UUID]) -> dict[UUID, dict[str, int]]:
+        """Return the deltas not yet flushed for ``post_ids``."""
+        if not post_ids:
+            return {}
+        keys = [f"{post_id}:{field}" for post_id in post_ids for field in FIELDS]
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for shard in range(self.shards):
+                pipe.hmget(PENDING_PREFIX + str(shard), keys)
+                pipe.hmget(FLUSHING_PREFIX + str(shard), keys)
+            results = await pipe.execute()
+        except (RedisError, OSError):
+            return {}
+
+        totals = [sum(int(value) for value in found if value) for found in zip(*results)]
+        deltas: dict[UUID, dict[str, int]] = {}
+        for position, post_id in enumerate(post_ids):
+            counts = dict(zip(FIELDS, totals[position * len(FIELDS) :]))
+            if any(counts.values()):
+                deltas[post_id] = counts
+        return deltas
+
+    async def counts(self, posts: list[Post]) -> dict[UUID, dict[str, int]]:
+        """Return the like and comment counts to show for loaded posts."""
+        deltas = await self.pending([post.id for post in posts])
+        counts = {}
+        for post in posts:
+            delta = deltas.get(post.id, {})
+            counts[post.id] = {
+                "like_count": max(0, post.like_count + delta.get(LIKES, 0)),
+                "comment_count": max(0, post.comment_count + delta.get(COMMENTS, 0)),
+            }
+        return counts
+
+    async def flush(self) -> Optional[int]:
+        """Apply pending deltas to the posts table; None if another worker holds the lock."""
+        token = uuid.uuid4().hex
+        if not await self._acquire(token):
+            return None
+        try:
+            return await self._flush()
+        finally:
+            await self._release(token)
+
+    async def _flush(self) -> int:
+        """Move every shard aside, apply the summed deltas, then drop the moved hashes."""
+        deltas: dict[str, dict[str, int]] = defaultdict(lambda: dict.fromkeys(FIELDS, 0))
+        moved = []
+        for shard in range(self.shards):
+            pending, flushing = PENDING_PREFIX + str(shard), FLUSHING_PREFIX + str(shard)
+            # A hash left behind by a failed flush is applied before taking new deltas
+            if not await self.redis.exists(flushing):
+                try:
+                    await self.redis.rename(pending, flushing)
+                except ResponseError:
+                    continue
+            moved.append(flushing)
+            for key, value in (await self.redis.hgetall(flushing)).items():
+                post_id, field = key.decode().rsplit(":", 1)
+                if field in FIELDS:
+                    deltas[post_id][field] += int(value)
+        if not moved:
+            return 0
+
+        rows = [
+            (UUID(post_id), counts[LIKES], counts[COMMENTS])
+            for post_id, counts in deltas.items()
+            if any(counts.values())
+        ]
+        async with self.session_factory() as db:
+            for start in range(0, len(rows), self.batch_size):
+                batch = values(
+                    column("id", PG_UUID(as_uuid=True)),
+                    column("likes", Integer),
+                    column("comments", Integer),
+                    name="deltas",
+                ).data(rows[start : start + self.batch_size])
+                await db.execute(
+                    update(Post)
+                    .where(Post.id == batch.c.id)
+                    .values(
+                        like_count=Post.like_count + batch.c.likes,
+                        comment_count=Post.comment_count + batch.c.comments,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+        await self.redis.delete(*moved)
+        return len(rows)
+
+    async def reconcile(self) -> Optional[int]:
+        """Recount every post's likes and comments; return how many had drifted.
+
+        Pending deltas are flushed first, under the same lock, so the recount
+        starts from columns that include everything counted so far. A delta
+        that lands between the flush and the recount of its post is applied
+        on top of the recount, until the next reconciliation.
+        """
+        token = uuid.uuid4().hex
+        if not await self._acquire(token):
+            return None
+        try:
+            try:
+                await self._flush()
+            except (RedisError, OSError):
+                logger.warning("Could not flush post counters; recounting anyway")
+            return await self._recount(token)
+        finally:
+            await self._release(token)
+
+    async def _recount(self, token: str) -> int:
+        likes = (
+            select(func.count())
+            .where(PostLike.post_id == Post.id)
+            .correlate(Post)
+            .scalar_subquery()
+        )
+        comments = (
+            select(func.count())
+            .where(Comment.post_id == Post.id)
+            .correlate(Post)
+            .scalar_subquery()
+        )
+        fixed = 0
+        last: Optional[UUID] = None
+        async with self.session_factory() as db:
+            while True:
+                if not await self._renew(token):
+                    # A flush may already be running; rewriting counts now could drop its deltas
+                    logger.warning("Lost the post counter lock; stopping the recount")
+                    return fixed
+                stmt = select(Post.id).order_by(Post.id).limit(self.batch_size)
+                if last is not None:
+                    stmt = stmt.where(Post.id > last)
+                ids = list(await db.scalars(stmt))
+                if not ids:
+                    return fixed
+                result = await db.execute(
+                    update(Post)
+                    .where(
+                        Post.id.in_(ids),
+                        or_(Post.like_count != likes, Post.comment_count != comments),
+                    )
+                    .values(like_count=likes, comment_count=comments)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                fixed += result.rowcount
+                last = ids[-1]
+
+    async def _acquire(self, token: str) -> bool:
+        try:
+            return bool(await self.redis.set(LOCK_KEY, token, nx=True, ex=LOCK_SECONDS))
+        except (RedisError, OSError):
+            # Flushing fails on its own without Redis; recounting alone is safe
+            return True
+
+    async def _renew(self, token: str) -> bool:
+        """Push back the lock's expiry; False if it has passed to another worker."""
+        try:
+            if await self.redis.get(LOCK_KEY) != token.encode():
+                return False
+            await self.redis.expire(LOCK_KEY, LOCK_SECONDS)
+        except (RedisError, OSError):
+            pass
+        return True
+
+    async def _release(self, token: str) -> None:
+        try:
+            if await self.redis.get(LOCK_KEY) == token.encode():
+                await self.redis.delete(LOCK_KEY)
+        except (RedisError, OSError):
+            pass
+
+    def stats(self) -> dict[str, int]:
+        """Return counter write statistics for this process."""
+        return {"increments": self.increments, "lost": self.lost}
+
+
+post_counters = PostCounters()
@@ -5,8 +5,35 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
+from app.core.cache import ReadThroughCache, load_snapshot, restore, snapshot
+from app.core.config import settings
+from app.database import is_replica
 from app.models.dog import Dog
 from app.schemas.dog import DogCreate, DogUpdate
+from app.services.ownership import WriteStatus, delete_owned, update_owned
+from app.services.square import SquareService
+
+# Dog profiles change rarely but are read on every session card, detail page
+# and chat header, so single dogs and per-user lists are cached in Redis.
+dog_cache = ReadThroughCache("dogs", ttl_seconds=settings.DOG_CACHE_TTL_SECONDS)
+
+
+def _dog_key(dog_id: UUID | str) -> str:
+    return dog_cache.key("id", dog_id)
+
+
+def _user_dogs_key(user_id: UUID | str) -> str:
+    return dog_cache.key("user", user_id)
+
+
+def _fill_ttl(db: AsyncSession) -> Optional[float]:
+    # A replica may still hold the row from before an invalidating write;
+    # what it returns is cached only for as long as a writer stays pinned
+    return settings.DATABASE_READ_YOUR_WRITES_SECONDS if is_replica(db) else None
+
+
+async def _restore_dog(db: AsyncSession, data: dict) -> Dog:
+    return await restore(db, Dog, load_snapshot(Dog, data))
 
 
 class DogService:
@@ -15,15 +42,30 @@ class DogService:
     @staticmethod
     async def get_user_dogs(db: AsyncSession, user_id: UUID) -> list[Dog]:
         """Get all dogs for a user."""
-        result = await db.execute(
-            select(Dog).where(Dog.user_id == user_id).order_by(Dog.created_at.desc())
-        )
-        return list(result.scalars().all())
+
+        async def load() -> list[dict]:
+            result = await db.execute(
+                select(Dog).where(Dog.user_id == user_id).order_by(Dog.created_at.desc())
+            )
+            return [snapshot(dog) for dog in result.scalars().all()]
+
+        data = await dog_cache.get_or_load(_user_dogs_key(user_id), load, _fill_ttl(db))
+        return [await _restore_dog(db, item) for item in data]
 
     @staticmethod
     async def get_dog_by_id(db: AsyncSession, dog_id: UUID) -> Optional[Dog]:
         """Get dog by ID."""
-        return await db.get(Dog, dog_id)
+        try:
+            dog_id = UUID(str(dog_id))
+        except ValueError:
+            return None
+
+        async def load() -> Optional[dict]:
+            dog = await db.get(Dog, dog_id)
+            return snapshot(dog) if dog else None
+
+        data = await dog_cache.get_or_load(_dog_key(dog_id), load, _fill_ttl(db))
+        return await _restore_dog(db, data) if data else None
 
     @staticmethod
     async def create_dog(
@@ -34,6 +76,7 @@ class DogService:
         db.add(dog)
         await db.commit()
         await db.refresh(dog)
+        await dog_cache.invalidate(_user_dogs_key(user_id))
         return dog
 
     @staticmethod
@@ -49,8 +92,12 @@ class DogService:
         for field, value in update_data.items():
             setattr(dog, field, value)
 
+        if "avatar" in update_data:
+            await db.flush()
+            await SquareService.refresh_dog(db, dog_id)
         await db.commit()
         await db.refresh(dog)
+        await dog_cache.invalidate(_dog_key(dog.id), _user_dogs_key(dog.user_id))
         return dog
 
     @staticmethod
@@ -62,8 +109,33 @@ class DogService:
 
         await db.delete(dog)
         await db.commit()
+        await dog_cache.invalidate(_dog_key(dog.id), _user_dogs_key(dog.user_id))
         return True
 
+    @staticmethod
+    async def update_owned_dog(
+        db: AsyncSession, dog_id: UUID, user_id: UUID, data: DogUpdate
+    ) -> tuple[WriteStatus, Optional[Dog]]:
+        """Update a dog owned by ``user_id`` in a single statement."""
+        outcome, dog = await update_owned(
+            db, Dog, dog_id, user_id, data.model_dump(exclude_unset=True)
+        )
+        if outcome is WriteStatus.ok:
+            if "avatar" in data.model_fields_set:
+                await SquareService.refresh_dog(db, dog_id)
+            await db.commit()
+            await dog_cache.invalidate(_dog_key(dog_id), _user_dogs_key(user_id))
+        return outcome, dog
+
+    @staticmethod
+    async def delete_owned_dog(db: AsyncSession, dog_id: UUID, user_id: UUID) -> WriteStatus:
+        """Delete a dog owned by ``user_id`` in a single statement."""
+        outcome = await delete_owned(db, Dog, dog_id, user_id)
+        if outcome is WriteStatus.ok:
+            await db.commit()
+            await dog_cache.invalidate(_dog_key(dog_id), _user_dogs_key(user_id))
+        return outcome
+
     @staticmethod
     async def check_ownership(db: AsyncSession, dog_id: UUID, user_id: UUID) -> bool:
         """Check if user owns the dog."""
@@ -0,0 +1,58 @@
+"""Follow service.
+
+``users.follower_count`` is kept in step with the ``follows`` rows in the
+same transaction; it is what ``Timelines`` reads to decide whether a new
+post is fanned out or left for followers to pull.
+"""
+from uuid import UUID
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.follow import Follow
+from app.models.user import User
+from app.services.timeline import timelines
+
+
+class FollowService:
+    """Follow service."""
+
+    @staticmethod
+    async def follow(db: AsyncSession, follower_id: UUID, followee_id: UUID) -> bool:
+        """Follow a user; return False if already following."""
+        stmt = (
+            insert(Follow)
+            .values(follower_id=follower_id, followee_id=followee_id)
+            .on_conflict_do_nothing(index_elements=[Follow.follower_id, Follow.followee_id])
+            .returning(Follow.followee_id)
+        )
+        if (await db.execute(stmt)).first() is None:
+            return False
+        await db.execute(
+            update(User)
+            .where(User.id == followee_id)
+            .values(follower_count=User.follower_count + 1)
+        )
+        await db.commit()
+        await timelines.invalidate(follower_id)
+        return True
+
+    @staticmethod
+    async def unfollow(db: AsyncSession, follower_id: UUID, followee_id: UUID) -> bool:
+        """Unfollow a user; return False if not following."""
+        stmt = (
+            delete(Follow)
+            .where(Follow.follower_id == follower_id, Follow.followee_id == followee_id)
+            .returning(Follow.followee_id)
+        )
+        if (await db.execute(stmt)).first() is None:
+            return False
+        await db.execute(
+            update(User)
+            .where(User.id == followee_id)
+            .values(follower_count=User.follower_count - 1)
+        )
+        await db.commit()
+        await timelines.invalidate(follower_id, drop_entries=True)
+        return True
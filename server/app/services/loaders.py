@@ -0,0 +1,144 @@
+"""Per-request batched loading of related rows.
+
+Post and session cards show rows the page rows only reference by id: the
+author and their dog, the creator, the location and the participating
+dogs. Following ``relationship()`` attributes row by row would issue one
+query per card and attribute, and lazy loading does not work on an
+``AsyncSession`` anyway. Routes load them through ``Loaders`` instead.
+
+A ``Loader`` collects the keys asked for during one event-loop iteration
+and resolves them with one ``WHERE ... IN (...)`` query; ``load_many`` over
+a page therefore costs one query per entity type, whatever the page size.
+Each key is fetched at most once per request: later loads of the same key
+return the cached result (the identity cache), including a miss.
+
+``Loaders`` is built per request on the request's session (see
+``app.api.deps.get_loaders``) and must not outlive it. An ``AsyncSession``
+runs one statement at a time, so the loaders of one request share a lock
+and take turns.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Generic, Hashable, Iterable, Mapping, TypeVar
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.dog import Dog
+from app.models.location import Location
+from app.models.session import session_participants
+from app.models.user import User
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class Loader(Generic[K, V]):
+    """Batches the ``load`` calls of one loop iteration into one ``batch`` call."""
+
+    def __init__(
+        self,
+        batch: Callable[[list[K]], Awaitable[Mapping[K, V]]],
+        lock: asyncio.Lock,
+        missing: Callable[[], Any] = lambda: None,
+    ) -> None:
+        self._batch = batch
+        self._lock = lock
+        self._missing = missing
+        self._results: dict[K, asyncio.Future] = {}
+        self._pending: list[K] = []
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+
+    def load(self, key: K) -> "asyncio.Future[V]":
+        """Return a future for ``key``'s value; keys without a row resolve to ``missing()``."""
+        future = self._results.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._results[key] = loop.create_future()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            self._pending.append(key)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V]:
+        """Load several keys; the values come back in the order of ``keys``."""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Cache a value loaded some other way, unless ``key`` is already known."""
+        if key not in self._results:
+            future = self._results[key] = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+
+    def _dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._resolve(keys))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, keys: list[K]) -> None:
+        try:
+            async with self._lock:
+                self.batches += 1
+                found = await self._batch(keys)
+        except Exception as exc:
+            # Forget the failed keys, so a later load retries them
+            for key in keys:
+                future = self._results.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for key in keys:
+            future = self._results[key]
+            if not future.done():
+                future.set_result(found[key] if key in found else self._missing())
+
+
+class Loaders:
+    """The loaders of one request, all reading through its session."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        lock = asyncio.Lock()
+        self.users: Loader[UUID, User | None] = Loader(self._users, lock)
+        self.dogs: Loader[UUID, Dog | None] = Loader(self._dogs, lock)
+        self.locations: Loader[UUID, Location | None] = Loader(self._locations, lock)
+        # Participating dogs by session id, in joining order
+        self.session_dogs: Loader[UUID, list[Dog]] = Loader(self._session_dogs, lock, list)
+
+    @property
+    def batches(self) -> int:
+        """Queries issued so far."""
+        return sum(
+            loader.batches
+            for loader in (self.users, self.dogs, self.locations, self.session_dogs)
+        )
+
+    async def _by_id(self, model: Any, ids: list[UUID]) -> dict[UUID, Any]:
+        result = await self.db.execute(select(model).where(model.id.in_(ids)))
+        return {row.id: row for row in result.scalars()}
+
+    async def _users(self, ids: list[UUID]) -> dict[UUID, User]:
+        return await self._by_id(User, ids)
+
+    async def _dogs(self, ids: list[UUID]) -> dict[UUID, Dog]:
+        return await self._by_id(Dog, ids)
+
+    async def _locations(self, ids: list[UUID]) -> dict[UUID, Location]:
+        return await self._by_id(Location, ids)
+
+    async def _session_dogs(self, session_ids: list[UUID]) -> dict[UUID, list[Dog]]:
+        result = await self.db.execute(
+            select(session_participants.c.session_id, Dog)
+            .join(Dog, Dog.id == session_participants.c.dog_id)
+            .where(session_participants.c.session_id.in_(session_ids))
+            .order_by(session_participants.c.joined_at, Dog.id)
+        )
+        dogs: dict[UUID, list[Dog]] = defaultdict(list)
+        for session_id, dog in result:
+            dogs[session_id].append(dog)
+            self.dogs.prime(dog.id, dog)
+        return dogs
@@ -0,0 +1,85 @@
+"""Location service."""
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import geo
+from app.models.location import Location
+from app.schemas.location import LocationCreate
+from app.schemas.tag import TagKind
+from app.services.tag_index import tag_autocomplete
+from app.services.tag_service import TagService
+
+# First search ring for nearest-neighbour queries; grows 4x per round
+NEARBY_INITIAL_RADIUS_KM = 1.0
+NEARBY_GROWTH_FACTOR = 4.0
+
+
+class LocationService:
+    """Location service."""
+
+    @staticmethod
+    async def create_location(
+        db: AsyncSession, data: LocationCreate, created_by: UUID | None = None
+    ) -> Location:
+        """Create new location."""
+        location = Location(**data.model_dump(), created_by=created_by)
+        db.add(location)
+        await TagService.record(db, TagKind.location, data.tags)
+        await db.commit()
+        await db.refresh(location)
+        tag_autocomplete.add(TagKind.location, data.tags)
+        return location
+
+    @staticmethod
+    async def get_nearby(
+        db: AsyncSession,
+        latitude: float,
+        longitude: float,
+        radius_km: float = 10.0,
+        limit: int = 20,
+        dog_friendly_only: bool = True,
+        tags: Sequence[str] = (),
+    ) -> list[tuple[Location, float]]:
+        """Get the ``limit`` nearest locations within ``radius_km``, closest first.
+
+        Each round scans a bounded set of geohash cells covering the current
+        search ring, then refines candidates by exact distance. The ring only
+        grows when it holds fewer than ``limit`` matches, so dense areas are
+        answered from a few small cells. ``tags`` keeps only locations that
+        carry all of them.
+        """
+        search_km = min(NEARBY_INITIAL_RADIUS_KM, radius_km)
+
+        while True:
+            cells = geo.covering_cells(latitude, longitude, search_km)
+            stmt = select(Location).where(
+                or_(
+                    *(
+                        and_(Location.geohash >= cell, Location.geohash < cell + geo.PREFIX_END)
+                        for cell in cells
+                    )
+                )
+            )
+            if dog_friendly_only:
+                stmt = stmt.where(Location.is_dog_friendly.is_(True))
+            if tags:
+                stmt = stmt.where(Location.tags.contains(list(tags)))
+
+            result = await db.execute(stmt)
+            matches = []
+            for location in result.scalars():
+                distance = geo.haversine_km(
+                    latitude, longitude, location.latitude, location.longitude
+                )
+                if distance <= search_km:
+                    matches.append((location, distance))
+
+            # Everything within search_km was scanned, so these are the true nearest
+            if len(matches) >= limit or search_km >= radius_km:
+                matches.sort(key=lambda match: match[1])
+                return matches[:limit]
+
+            search_km = min(search_km * NEARBY_GROWTH_FACTOR, radius_km)
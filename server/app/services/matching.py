@@ -0,0 +1,377 @@
+"""Dog-to-session compatibility matching.
+
+A session's requirements live in typed columns (``allowed_sizes``,
+``allowed_breeds``, ``allowed_mbti`` arrays, where ``"*"`` accepts
+everything, and an ``age_min_months``..``age_max_months`` range). They are
+checked in two ways that always agree:
+
+* ``eligible_clause`` builds a SQL filter of array-overlap (``&&``) and range
+  conditions, which the GIN indexes on the arrays can answer.
+* ``SessionIndex`` compiles the columns of all open sessions into NumPy
+  arrays: a 4-bit size mask, an age range, a 16-bit MBTI mask and the
+  accepted breeds as ``(breed code, session)`` pairs sorted by breed code.
+  Checking a dog against every session is then a handful of vectorized
+  comparisons, and the breed test is a ``searchsorted`` slice.
+
+A dog without an MBTI result only matches sessions that do not ask for one.
+NumPy is imported when the first index is built, not with this module.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, and_, false, or_, select
+
+from app.core.breeds import canonical_breed
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.dog import DogSize
+from app.models.session import ANY, MAX_AGE_MONTHS, Session, SessionStatus
+from app.schemas.session import SessionRequirements
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SIZES = tuple(DogSize)
+ALL_SIZES = (1 << len(SIZES)) - 1
+
+MBTI_TYPES = tuple(a + b + c + d for a in "EI" for b in "SN" for c in "TF" for d in "JP")
+MBTI_BITS = {mbti: 1 << index for index, mbti in enumerate(MBTI_TYPES)}
+ALL_MBTI = (1 << len(MBTI_TYPES)) - 1
+
+# Keys are the enum values; str-enum members hash and compare equal to them
+SIZE_INDEX = {size.value: index for index, size in enumerate(SIZES)}
+
+# Session columns the matcher reads, in SessionIndex row order
+MATCH_COLUMNS = (
+    Session.id,
+    Session.scheduled_at,
+    Session.allowed_sizes,
+    Session.age_min_months,
+    Session.age_max_months,
+    Session.allowed_breeds,
+    Session.allowed_mbti,
+)
+
+
+def normalize_breed(breed: str) -> str:
+    return canonical_breed(breed).casefold()
+
+
+def _size_index(value: Any) -> Optional[int]:
+    return SIZE_INDEX.get(value) if isinstance(value, str) else None
+
+
+def requirement_columns(requirements: Optional[SessionRequirements]) -> dict[str, Any]:
+    """Return the typed column values for a session's requirements."""
+    if requirements is None:
+        requirements = SessionRequirements()
+    age_min = requirements.age_min_months
+    age_max = requirements.age_max_months
+    return {
+        "allowed_sizes": sorted({size.value for size in requirements.sizes}) or [ANY],
+        "age_min_months": 0 if age_min is None else age_min,
+        "age_max_months": MAX_AGE_MONTHS if age_max is None else age_max,
+        "allowed_breeds": sorted({normalize_breed(breed) for breed in requirements.breeds})
+        or [ANY],
+        "allowed_mbti": sorted(set(requirements.mbti)) or [ANY],
+    }
+
+
+@dataclass(frozen=True)
+class CompiledRequirements:
+    """Requirements of one session in the form the index stores."""
+
+    size_mask: int = ALL_SIZES
+    age_min: int = 0
+    age_max: int = MAX_AGE_MONTHS
+    mbti_mask: int = ALL_MBTI
+    breeds: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_columns(
+        cls,
+        allowed_sizes: Sequence[str],
+        age_min_months: int,
+        age_max_months: int,
+        allowed_breeds: Sequence[str],
+        allowed_mbti: Sequence[str],
+    ) -> "CompiledRequirements":
+        size_mask = ALL_SIZES
+        if ANY not in allowed_sizes:
+            size_mask = sum(1 << SIZE_INDEX[size] for size in set(allowed_sizes))
+        mbti_mask = ALL_MBTI
+        if ANY not in allowed_mbti:
+            mbti_mask = sum(MBTI_BITS[mbti] for mbti in set(allowed_mbti))
+        breeds = frozenset() if ANY in allowed_breeds else frozenset(allowed_breeds)
+        return cls(size_mask, age_min_months, age_max_months, mbti_mask, breeds)
+
+    @classmethod
+    def of(cls, session: Session) -> "CompiledRequirements":
+        return cls.from_columns(
+            session.allowed_sizes,
+            session.age_min_months,
+            session.age_max_months,
+            session.allowed_breeds,
+            session.allowed_mbti,
+        )
+
+
+@dataclass(frozen=True)
+class DogProfile:
+    """The attributes of a dog that requirements look at."""
+
+    id: UUID
+    size: Any
+    breed: str
+    age_months: int
+    mbti: Optional[str] = None
+
+    @classmethod
+    def of(cls, dog: Any) -> "DogProfile":
+        return cls(dog.id, dog.size, dog.breed, dog.age_months, dog.mbti)
+
+
+def dog_matches(requirements: CompiledRequirements, dog: DogProfile) -> bool:
+    """Check one dog against one session without the index."""
+    size = _size_index(dog.size)
+    mbti = MBTI_BITS.get((dog.mbti or "").upper(), 0)
+    return (
+        size is not None
+        and bool(requirements.size_mask & (1 << size))
+        and requirements.age_min <= dog.age_months <= requirements.age_max
+        and (requirements.mbti_mask == ALL_MBTI or bool(requirements.mbti_mask & mbti))
+        and (not requirements.breeds or normalize_breed(dog.breed) in requirements.breeds)
+    )
+
+
+def eligible_clause(dogs: Sequence[DogProfile]) -> ColumnElement[bool]:
+    """SQL condition: at least one of ``dogs`` meets the session's requirements."""
+    conditions = []
+    for dog in dogs:
+        size = _size_index(dog.size)
+        if size is None:
+            continue
+        mbti = (dog.mbti or "").upper()
+        conditions.append(
+            and_(
+                Session.allowed_sizes.overlap([ANY, SIZES[size].value]),
+                Session.age_min_months <= dog.age_months,
+                Session.age_max_months >= dog.age_months,
+                Session.allowed_breeds.overlap([ANY, normalize_breed(dog.breed)]),
+                Session.allowed_mbti.overlap([ANY, mbti] if mbti in MBTI_BITS else [ANY]),
+            )
+        )
+    return or_(*conditions) if conditions else false()
+
+
+# Timestamps are naive UTC throughout the app
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _micros(value: datetime) -> int:
+    return (value.replace(tzinfo=None) - EPOCH) // MICROSECOND
+
+
+def _from_micros(value: int) -> datetime:
+    return EPOCH + value * MICROSECOND
+
+
+class SessionIndex:
+    """Compiled requirements of many sessions, ordered by ``(scheduled_at, id)``."""
+
+    def __init__(self, sessions: Iterable[Sequence[Any]]) -> None:
+        """Build from rows of ``MATCH_COLUMNS``."""
+        import numpy as np
+
+        rows = sorted(
+            ((_micros(row[1]), str(row[0]), row) for row in sessions),
+            key=lambda item: item[:2],
+        )
+        self.ids = [row[0] for _, _, row in rows]
+        self._keys = [key for _, key, _ in rows]
+        self.scheduled_at = np.array([micros for micros, _, _ in rows], np.int64)
+
+        # Most sessions share a few requirement combinations; compile each once
+        cache: dict[tuple, CompiledRequirements] = {}
+        compiled = []
+        for _, _, row in rows:
+            key = tuple(tuple(value) if isinstance(value, list) else value for value in row[2:])
+            if key not in cache:
+                cache[key] = CompiledRequirements.from_columns(*row[2:])
+            compiled.append(cache[key])
+        self.size_mask = np.array([item.size_mask for item in compiled], np.uint8)
+        self.age_min = np.array([item.age_min for item in compiled], np.int32)
+        self.age_max = np.array([item.age_max for item in compiled], np.int32)
+        self.mbti_mask = np.array([item.mbti_mask for item in compiled], np.uint16)
+        self.breed_filtered = np.array([bool(item.breeds) for item in compiled], bool)
+
+        self._breed_codes: dict[str, int] = {}
+        entries = [
+            (self._breed_codes.setdefault(breed, len(self._breed_codes)), position)
+            for position, item in enumerate(compiled)
+            for breed in item.breeds
+        ]
+        entries.sort()
+        pairs = np.array(entries, np.int32).reshape(-1, 2)
+        self._breed_entry_codes = np.ascontiguousarray(pairs[:, 0])
+        self._breed_entry_sessions = np.ascontiguousarray(pairs[:, 1])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def eligibility(self, dogs: Sequence[DogProfile], start: int = 0) -> "np.ndarray":
+        """Return a ``(dogs, sessions[start:])`` boolean matrix of who may join what."""
+        import numpy as np
+
+        result = np.zeros((len(dogs), len(self) - start), bool)
+        size_mask = self.size_mask[start:]
+        age_min = self.age_min[start:]
+        age_max = self.age_max[start:]
+        mbti_mask = self.mbti_mask[start:]
+        no_breed_filter = ~self.breed_filtered[start:]
+
+        for row, dog in enumerate(dogs):
+            size = _size_index(dog.size)
+            if size is None:
+                continue
+            mbti = MBTI_BITS.get((dog.mbti or "").upper(), 0)
+            out = result[row]
+            out[:] = (size_mask & (1 << size)) != 0
+            out &= age_min <= dog.age_months
+            out &= age_max >= dog.age_months
+            out &= (mbti_mask == ALL_MBTI) | ((mbti_mask & mbti) != 0)
+            out &= no_breed_filter | self._accepts_breed(dog.breed, start)
+        return result
+
+    def _accepts_breed(self, breed: str, start: int) -> "np.ndarray":
+        import numpy as np
+
+        accepted = np.zeros(len(self) - start, bool)
+        code = self._breed_codes.get(normalize_breed(breed))
+        if code is not None:
+            low, high = np.searchsorted(self._breed_entry_codes, [code, code + 1])
+            positions = self._breed_entry_sessions[low:high]
+            accepted[positions[positions >= start] - start] = True
+        return accepted
+
+    def position_after(self, scheduled_at: datetime, session_id: UUID) -> int:
+        """Return the first position strictly after the ``(scheduled_at, id)`` key."""
+        import numpy as np
+
+        micros = _micros(scheduled_at)
+        position = int(np.searchsorted(self.scheduled_at, micros, side="left"))
+        key = str(session_id)
+        while (
+            position < len(self)
+            and self.scheduled_at[position] == micros
+            and self._keys[position] <= key
+        ):
+            position += 1
+        return position
+
+    def match(
+        self,
+        dogs: Sequence[DogProfile],
+        now: datetime,
+        after: Optional[tuple[datetime, UUID]] = None,
+        limit: int = 20,
+    ) -> tuple[list[tuple[UUID, list[UUID]]], Optional[tuple[datetime, UUID]]]:
+        """Return up to ``limit`` upcoming sessions any of ``dogs`` may join.
+
+        Each session comes with the ids of the dogs that qualify. The second
+        value is the ``(scheduled_at, id)`` key to continue from, or ``None``
+        on the last page.
+        """
+        import numpy as np
+
+        start = int(np.searchsorted(self.scheduled_at, _micros(now), side="right"))
+        if after is not None:
+            start = max(start, self.position_after(*after))
+        if not dogs or start >= len(self):
+            return [], None
+
+        eligible = self.eligibility(dogs, start)
+        hits = np.flatnonzero(eligible.any(axis=0))[: limit + 1]
+        matches = [
+            (self.ids[start + hit], [dog.id for dog, ok in zip(dogs, eligible[:, hit]) if ok])
+            for hit in hits[:limit]
+        ]
+        if len(hits) <= limit:
+            return matches, None
+        last = start + int(hits[limit - 1])
+        return matches, (_from_micros(int(self.scheduled_at[last])), self.ids[last])
+
+
+class SessionMatcher:
+    """Keeps a ``SessionIndex`` of recruiting sessions, rebuilt when stale.
+
+    Rebuilding is one query over recruiting sessions, compiled in a worker
+    thread, so newly created sessions show up a little over
+    ``refresh_seconds`` later. Callers re-check the status of the sessions
+    they show, and fall back to ``eligible_clause`` while no index exists.
+    """
+
+    def __init__(self, refresh_seconds: float = settings.MATCHING_REFRESH_SECONDS) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._index: Optional[SessionIndex] = None
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._built_at > self.refresh_seconds
+
+    def index(self) -> Optional[SessionIndex]:
+        """Return the current index, or ``None`` before the first build.
+
+        A missing or stale index is rebuilt in the background; callers never
+        wait for it.
+        """
+        if self._stale() and not self._lock.locked():
+            self._refresh = asyncio.create_task(self._rebuild())
+        return self._index
+
+    async def _rebuild(self) -> None:
+        async with self._lock:
+            if not self._stale():
+                return
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        select(*MATCH_COLUMNS).where(
+                            Session.status == SessionStatus.recruiting,
+                            Session.scheduled_at > datetime.utcnow(),
+                        )
+                    )
+                    rows = result.all()
+                # Compiling 100k sessions takes about a second; keep it off the event loop
+                self._index = await asyncio.to_thread(SessionIndex, rows)
+            except Exception:
+                logger.exception("Could not rebuild the session matching index")
+            else:
+                self.builds += 1
+                self.build_seconds = time.perf_counter() - start
+            # After a failure, callers use SQL until the next attempt
+            self._built_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        """Return the index size and how long the last rebuild took."""
+        return {
+            "sessions": len(self._index) if self._index is not None else 0,
+            "builds": self.builds,
+            "last_build_ms": round(self.build_seconds * 1000, 1),
+        }
+
+
+session_matcher = SessionMatcher()
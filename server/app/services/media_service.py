@@ -0,0 +1,172 @@
+"""Image uploads: direct-upload tickets, streamed uploads and thumbnails.
+
+Avatars and post images are plain URL columns; this module is how files get
+behind those URLs without passing through the API where possible:
+
+1. ``ticket`` signs a direct upload of one file to a fresh key,
+   ``{purpose}/{user_id}/{random}.{ext}``, so the key itself records who
+   may confirm it;
+2. the client sends the file straight to storage;
+3. ``complete`` checks the stored size, renders the thumbnails on the
+   process pool, stores them next to the original as
+   ``{key stem}_{size}.webp`` and returns every URL.
+
+Clients that cannot upload directly send the body to the API instead;
+``receive`` streams it to storage chunk by chunk and then completes it.
+"""
+import asyncio
+import re
+import uuid
+from typing import Any, AsyncIterable, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.schemas.media import MediaPurpose, MediaResponse, UploadTicket
+from app.services.media_storage import MediaStorage, UploadTooLarge, get_media_storage
+from app.services.thumbnails import (
+    THUMBNAIL_CONTENT_TYPE,
+    InvalidImage,
+    ThumbnailPool,
+    thumbnail_pool,
+)
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+KEY_PATTERN = re.compile(
+    r"^(?P<purpose>[a-z_]+)/(?P<user_id>[0-9a-f-]{36})/[0-9a-f]{32}\.(?:jpg|png|webp|gif)$"
+)
+
+
+class MediaNotFound(LookupError):
+    """Nothing was uploaded to the key being confirmed."""
+
+
+def thumbnail_key(key: str, size: int) -> str:
+    """Return the key of one thumbnail of an uploaded image."""
+    return f"{key.rsplit('.', 1)[0]}_{size}.webp"
+
+
+class MediaUploads:
+    """Signs direct uploads, streams proxied ones and renders thumbnails."""
+
+    def __init__(
+        self,
+        storage: Optional[MediaStorage] = None,
+        pool: ThumbnailPool = thumbnail_pool,
+        max_bytes: int = settings.MEDIA_MAX_BYTES,
+        expires_in: int = settings.MEDIA_UPLOAD_EXPIRES_SECONDS,
+    ) -> None:
+        self._storage = storage
+        self.pool = pool
+        self.max_bytes = max_bytes
+        self.expires_in = expires_in
+
+        self.tickets = 0
+        self.streamed = 0
+        self.bytes_streamed = 0
+        self.completed = 0
+
+    @property
+    def storage(self) -> MediaStorage:
+        if self._storage is None:
+            self._storage = get_media_storage()
+        return self._storage
+
+    def new_key(self, user_id: UUID, purpose: MediaPurpose, content_type: str) -> str:
+        return f"{purpose.value}/{user_id}/{uuid.uuid4().hex}{EXTENSIONS[content_type]}"
+
+    def owns(self, user_id: UUID, key: str) -> bool:
+        """Whether ``key`` is an upload key issued to ``user_id``."""
+        match = KEY_PATTERN.match(key)
+        return (
+            match is not None
+            and match["user_id"] == str(user_id)
+            and match["purpose"] in MediaPurpose.__members__
+        )
+
+    def ticket(self, user_id: UUID, purpose: MediaPurpose, content_type: str) -> UploadTicket:
+        """Sign a direct upload of one image to a new key."""
+        key = self.new_key(user_id, purpose, content_type)
+        upload = self.storage.presign_upload(key, content_type, self.max_bytes, self.expires_in)
+        self.tickets += 1
+        return UploadTicket(
+            key=key,
+            url=upload.url,
+            method=upload.method,
+            fields=upload.fields,
+            headers=upload.headers,
+            max_bytes=self.max_bytes,
+            expires_at=upload.expires_at,
+        )
+
+    async def receive(
+        self,
+        user_id: UUID,
+        purpose: MediaPurpose,
+        content_type: str,
+        chunks: AsyncIterable[bytes],
+    ) -> MediaResponse:
+        """Stream an upload sent through the API to storage, then complete it."""
+        key = self.new_key(user_id, purpose, content_type)
+        written = await self.storage.write(key, chunks, content_type, self.max_bytes)
+        self.streamed += 1
+        self.bytes_streamed += written
+        return await self.complete(key)
+
+    async def complete(self, key: str) -> MediaResponse:
+        """Render and store the thumbnails of an uploaded image.
+
+        Raises ``MediaNotFound``, ``UploadTooLarge`` or ``InvalidImage``; the
+        latter two also delete the upload. ``ThumbnailsUnavailable`` keeps it,
+        so the client can confirm it again.
+        """
+        storage = self.storage
+        size = await storage.size(key)
+        if size is None:
+            raise MediaNotFound(key)
+        if size > self.max_bytes:
+            await storage.delete(key)
+            raise UploadTooLarge(key)
+        data = await storage.get(key)
+        if data is None:
+            raise MediaNotFound(key)
+        try:
+            rendered = await self.pool.render(data)
+        except InvalidImage:
+            await storage.delete(key)
+            raise
+
+        await asyncio.gather(
+            *(
+                storage.put(thumbnail_key(key, side), image, THUMBNAIL_CONTENT_TYPE)
+                for side, image in rendered.images.items()
+            )
+        )
+        self.completed += 1
+        return MediaResponse(
+            key=key,
+            url=storage.url(key),
+            width=rendered.width,
+            height=rendered.height,
+            thumbnails={
+                side: storage.url(thumbnail_key(key, side)) for side in sorted(rendered.images)
+            },
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return upload counters and thumbnail pool state for this process."""
+        return {
+            "tickets": self.tickets,
+            "streamed": self.streamed,
+            "bytes_streamed": self.bytes_streamed,
+            "completed": self.completed,
+            "thumbnails": self.pool.stats(),
+        }
+
+
+media_uploads = MediaUploads()
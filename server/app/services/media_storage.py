@@ -0,0 +1,315 @@
+"""Object storage for uploaded media.
+
+Clients upload straight to storage: the API signs an upload for one key and
+content type, the client sends the bytes there, and the API only sees the
+file again to make thumbnails. Both backends also accept a stream of chunks
+for uploads that do pass through the API, writing each chunk out as it
+arrives instead of holding the whole file.
+
+* ``S3MediaStorage`` issues S3 presigned POSTs, whose policy pins the
+  content type and size limit, and streams server-side uploads as multipart
+  uploads of ``S3_PART_SIZE`` parts. ``boto3`` is imported lazily.
+* ``LocalMediaStorage`` keeps files under ``MEDIA_ROOT``. Its "presigned"
+  URL is an HMAC-signed ``PUT`` to the API's own upload route, so clients
+  and tests follow the same flow without S3.
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterable, Optional, Protocol
+
+from app.core.config import settings
+
+# S3 rejects multipart parts smaller than this, except the last one
+S3_PART_SIZE = 5 * 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """An upload stream went past the size limit."""
+
+
+@dataclass(frozen=True)
+class PresignedUpload:
+    """Where and how a client sends one file."""
+
+    url: str
+    method: str
+    expires_at: int
+    fields: dict[str, str] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class MediaStorage(Protocol):
+    """A place uploads and thumbnails are kept and served from."""
+
+    def presign_upload(
+        self, key: str, content_type: str, max_bytes: int, expires_in: int
+    ) -> PresignedUpload: ...
+
+    async def write(
+        self, key: str, chunks: AsyncIterable[bytes], content_type: str, max_bytes: int
+    ) -> int: ...
+
+    async def put(self, key: str, data: bytes, content_type: str) -> None: ...
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def size(self, key: str) -> Optional[int]: ...
+
+    async def delete(self, key: str) -> None: ...
+
+    def url(self, key: str) -> str: ...
+
+
+class LocalMediaStorage:
+    """Media on the local filesystem, standing in for S3."""
+
+    def __init__(
+        self,
+        root: str = settings.MEDIA_ROOT,
+        base_url: str = settings.MEDIA_URL,
+        secret: str = settings.SECRET_KEY,
+        upload_url: str = f"{settings.API_V1_PREFIX}/media/uploads",
+    ) -> None:
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self.upload_url = upload_url.rstrip("/")
+        self._secret = secret.encode()
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"invalid media key: {key!r}")
+        return path
+
+    def _signature(self, key: str, content_type: str, max_bytes: int, expires_at: int) -> str:
+        message = f"{key}\n{content_type}\n{max_bytes}\n{expires_at}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def presign_upload(
+        self, key: str, content_type: str, max_bytes: int, expires_in: int
+    ) -> PresignedUpload:
+        expires_at = int(time.time()) + expires_in
+        signature = self._signature(key, content_type, max_bytes, expires_at)
+        return PresignedUpload(
+            url=(
+                f"{self.upload_url}/{key}"
+                f"?max_bytes={max_bytes}&expires={expires_at}&signature={signature}"
+            ),
+            method="PUT",
+            expires_at=expires_at,
+            headers={"Content-Type": content_type},
+        )
+
+    def verify_upload(
+        self, key: str, content_type: str, max_bytes: int, expires_at: int, signature: str
+    ) -> bool:
+        """Check a signed upload URL's parameters and expiry."""
+        expected = self._signature(key, content_type, max_bytes, expires_at)
+        return expires_at >= time.time() and hmac.compare_digest(expected, signature)
+
+    async def write(
+        self, key: str, chunks: AsyncIterable[bytes], content_type: str, max_bytes: int
+    ) -> int:
+        """Stream chunks to a temporary file, then move it into place."""
+        path = self._path(key)
+        await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        fh = await asyncio.to_thread(open, partial, "wb")
+        written = 0
+        try:
+            async for chunk in chunks:
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge(key)
+                await asyncio.to_thread(fh.write, chunk)
+            await asyncio.to_thread(fh.close)
+            await asyncio.to_thread(os.replace, partial, path)
+        except BaseException:
+            await asyncio.to_thread(fh.close)
+            partial.unlink(missing_ok=True)
+            raise
+        return written
+
+    async def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+
+        def save() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            partial = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            partial.write_bytes(data)
+            os.replace(partial, path)
+
+        await asyncio.to_thread(save)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await asyncio.to_thread(self._path(key).read_bytes)
+        except FileNotFoundError:
+            return None
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            return (await asyncio.to_thread(self._path(key).stat)).st_size
+        except FileNotFoundError:
+            return None
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3MediaStorage:
+    """Media in an S3 bucket, through ``boto3`` (imported lazily)."""
+
+    def __init__(
+        self,
+        bucket: str = settings.AWS_BUCKET_NAME,
+        region: str = settings.AWS_REGION,
+        access_key_id: str = settings.AWS_ACCESS_KEY_ID,
+        secret_access_key: str = settings.AWS_SECRET_ACCESS_KEY,
+    ) -> None:
+        import boto3
+
+        self.bucket = bucket
+        self.region = region
+        self._client = boto3.client(
+            "s3",
+            region_name=region,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+        )
+
+    def presign_upload(
+        self, key: str, content_type: str, max_bytes: int, expires_in: int
+    ) -> PresignedUpload:
+        post = self._client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[{"Content-Type": content_type}, ["content-length-range", 1, max_bytes]],
+            ExpiresIn=expires_in,
+        )
+        return PresignedUpload(
+            url=post["url"],
+            method="POST",
+            expires_at=int(time.time()) + expires_in,
+            fields=post["fields"],
+        )
+
+    async def write(
+        self, key: str, chunks: AsyncIterable[bytes], content_type: str, max_bytes: int
+    ) -> int:
+        """Upload a stream as a multipart upload, holding at most one part in memory."""
+        client = self._client
+        part = bytearray()
+        parts: list[dict[str, Any]] = []
+        upload_id: Optional[str] = None
+        written = 0
+        try:
+            async for chunk in chunks:
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge(key)
+                part += chunk
+                if len(part) < S3_PART_SIZE:
+                    continue
+                if upload_id is None:
+                    created = await asyncio.to_thread(
+                        client.create_multipart_upload,
+                        Bucket=self.bucket,
+                        Key=key,
+                        ContentType=content_type,
+                    )
+                    upload_id = created["UploadId"]
+                parts.append(await self._upload_part(key, upload_id, len(parts) + 1, part))
+                part = bytearray()
+
+            if upload_id is None:
+                # Smaller than one part: a plain PUT is one request instead of three
+                await self.put(key, bytes(part), content_type)
+                return written
+            if part:
+                parts.append(await self._upload_part(key, upload_id, len(parts) + 1, part))
+            await asyncio.to_thread(
+                client.complete_multipart_upload,
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            if upload_id is not None:
+                await asyncio.to_thread(
+                    client.abort_multipart_upload,
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                )
+            raise
+        return written
+
+    async def _upload_part(
+        self, key: str, upload_id: str, number: int, data: bytearray
+    ) -> dict[str, Any]:
+        response = await asyncio.to_thread(
+            self._client.upload_part,
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=bytes(data),
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    async def put(self, key: str, data: bytes, content_type: str) -> None:
+        await asyncio.to_thread(
+            self._client.put_object,
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        def read() -> Optional[bytes]:
+            try:
+                response = self._client.get_object(Bucket=self.bucket, Key=key)
+            except self._client.exceptions.NoSuchKey:
+                return None
+            return response["Body"].read()
+
+        return await asyncio.to_thread(read)
+
+    async def size(self, key: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = await asyncio.to_thread(
+                self._client.head_object, Bucket=self.bucket, Key=key
+            )
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return response["ContentLength"]
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._client.delete_object, Bucket=self.bucket, Key=key)
+
+    def url(self, key: str) -> str:
+        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
+
+
+def get_media_storage() -> MediaStorage:
+    """Return the configured storage; local disk when no S3 bucket is set."""
+    if settings.AWS_BUCKET_NAME:
+        return S3MediaStorage()
+    return LocalMediaStorage()
@@ -0,0 +1,196 @@
+"""Session notifications.
+
+Recipients are resolved for many sessions at once: one query maps sessions
+to the distinct owners of their dogs (plus the creator), so a user with
+several dogs in a session is notified once, and one query fetches all of
+their device tokens. The resulting deliveries go to ``PushDispatcher`` in
+provider-sized batches, and tokens the provider rejects are deleted.
+
+Reminders are claimed with a single ``UPDATE ... RETURNING`` that stamps
+``reminder_sent_at``, so overlapping reminder runs never remind twice.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import delete, select, union, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.device import DeviceToken
+from app.models.dog import Dog
+from app.models.session import Session, SessionStatus, session_participants
+from app.services.chat_hub import hub
+from app.services.presence import presence
+from app.services.push import Delivery, DispatchReport, PushDispatcher, PushMessage
+
+logger = logging.getLogger(__name__)
+
+# Sessions that still get a reminder before they start
+REMINDABLE_STATUSES = (SessionStatus.recruiting, SessionStatus.full, SessionStatus.upcoming)
+
+push_dispatcher = PushDispatcher()
+
+
+class NotificationService:
+    """Notification service."""
+
+    @staticmethod
+    async def register_token(
+        db: AsyncSession, user_id: UUID, token: str, platform: Optional[str]
+    ) -> None:
+        """Store a device token; a token seen again moves to its latest user."""
+        stmt = insert(DeviceToken).values(user_id=user_id, token=token, platform=platform)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["token"],
+            set_={
+                "user_id": stmt.excluded.user_id,
+                "platform": stmt.excluded.platform,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    @staticmethod
+    async def session_recipients(
+        db: AsyncSession, session_ids: Iterable[UUID]
+    ) -> dict[UUID, set[UUID]]:
+        """Map each session to the distinct users taking part in it."""
+        session_ids = list(session_ids)
+        if not session_ids:
+            return {}
+        owners = (
+            select(session_participants.c.session_id, Dog.user_id)
+            .join(Dog, Dog.id == session_participants.c.dog_id)
+            .where(session_participants.c.session_id.in_(session_ids))
+        )
+        creators = select(Session.id, Session.creator_id).where(Session.id.in_(session_ids))
+        recipients: dict[UUID, set[UUID]] = defaultdict(set)
+        # UNION (not UNION ALL) drops users with several dogs in a session
+        for session_id, user_id in await db.execute(union(owners, creators)):
+            recipients[session_id].add(user_id)
+        return recipients
+
+    @staticmethod
+    async def device_tokens(db: AsyncSession, user_ids: Iterable[UUID]) -> dict[UUID, list[str]]:
+        """Return the device tokens of each user."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        tokens: dict[UUID, list[str]] = defaultdict(list)
+        result = await db.execute(
+            select(DeviceToken.user_id, DeviceToken.token).where(DeviceToken.user_id.in_(user_ids))
+        )
+        for user_id, token in result:
+            tokens[user_id].append(token)
+        return tokens
+
+    @staticmethod
+    async def notify_sessions(
+        db: AsyncSession,
+        messages: dict[UUID, PushMessage],
+        offline_only: bool = False,
+        dispatcher: Optional[PushDispatcher] = None,
+    ) -> DispatchReport:
+        """Push each session's message to its participants' devices.
+
+        With ``offline_only`` users that currently hold an open socket are
+        skipped; they get the event over the socket instead.
+        """
+        dispatcher = dispatcher or push_dispatcher
+        recipients = await NotificationService.session_recipients(db, messages)
+        if offline_only:
+            online = await presence.online(set().union(*recipients.values()))
+            recipients = {
+                session_id: users - online for session_id, users in recipients.items()
+            }
+        tokens = await NotificationService.device_tokens(db, set().union(*recipients.values()))
+
+        deliveries = []
+        for session_id, users in recipients.items():
+            message = messages[session_id]
+            session_tokens = {token for user_id in users for token in tokens.get(user_id, ())}
+            deliveries.extend(Delivery(token, message) for token in session_tokens)
+
+        report = await dispatcher.dispatch(deliveries)
+        if report.invalid_tokens:
+            await db.execute(
+                delete(DeviceToken).where(DeviceToken.token.in_(report.invalid_tokens))
+            )
+            await db.commit()
+        return report
+
+    @staticmethod
+    async def send_due_reminders(
+        db: AsyncSession,
+        now: Optional[datetime] = None,
+        dispatcher: Optional[PushDispatcher] = None,
+    ) -> int:
+        """Remind everyone in sessions starting soon; return sessions reminded."""
+        now = now or datetime.utcnow()
+        claim = (
+            update(Session)
+            .where(
+                Session.status.in_(REMINDABLE_STATUSES),
+                Session.scheduled_at > now,
+                Session.scheduled_at <= now + timedelta(minutes=settings.SESSION_REMINDER_MINUTES),
+                Session.reminder_sent_at.is_(None),
+            )
+            .values(reminder_sent_at=now)
+            .returning(Session.id, Session.title, Session.scheduled_at)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = (await db.execute(claim)).all()
+        await db.commit()
+        if not claimed:
+            return 0
+
+        messages = {}
+        for session_id, title, scheduled_at in claimed:
+            minutes = max(1, round((scheduled_at - now).total_seconds() / 60))
+            messages[session_id] = PushMessage(
+                title="🔔 聚会即将开始",
+                body=f"「{title}」将在 {minutes} 分钟后开始",
+                data={"type": "session_reminder", "session_id": str(session_id)},
+            )
+        report = await NotificationService.notify_sessions(db, messages, dispatcher=dispatcher)
+        logger.info(
+            "Reminded %d sessions: %d pushes sent, %d failed in %.2fs",
+            len(claimed),
+            report.sent,
+            report.failed,
+            report.seconds,
+        )
+        return len(claimed)
+
+    @staticmethod
+    async def notify_session_started(
+        session_id: UUID, title: str, chat_group_id: Optional[UUID]
+    ) -> None:
+        """Tell participants that a session started early.
+
+        Members in the session's chat get the event over their socket, and
+        only offline participants get a push. Runs as a background task
+        after the response, so it opens its own database session.
+        """
+        if chat_group_id is not None:
+            try:
+                await hub.publish(
+                    str(chat_group_id),
+                    {"type": "session_started", "session_id": str(session_id)},
+                )
+            except (RedisError, OSError):
+                logger.warning("Could not announce the start of session %s", session_id)
+        message = PushMessage(
+            title="🐕 聚会已开始",
+            body=f"「{title}」提前开始了，快来集合吧",
+            data={"type": "session_started", "session_id": str(session_id)},
+        )
+        async with AsyncSessionLocal() as db:
+            await NotificationService.notify_sessions(db, {session_id: message}, offline_only=True)
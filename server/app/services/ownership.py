@@ -0,0 +1,109 @@
+"""Ownership-scoped writes.
+
+Updates and deletes of user-owned rows (dogs, sessions, posts, ...) are done
+in a single PostgreSQL statement: a CTE reads the row's owner while a
+data-modifying CTE applies the change only when the owner matches. The outer
+join of the two tells apart "no such row" from "someone else's row" without
+an extra round-trip.
+"""
+import enum
+from typing import Any, Optional, TypeVar
+from uuid import UUID
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.util import identity_key
+
+ModelT = TypeVar("ModelT")
+
+
+class WriteStatus(str, enum.Enum):
+    """Outcome of an ownership-scoped write."""
+
+    ok = "ok"
+    not_found = "not_found"
+    forbidden = "forbidden"
+
+
+def _status(row: Any) -> WriteStatus:
+    if row is None:
+        return WriteStatus.not_found
+    if row[1] is None:
+        return WriteStatus.forbidden
+    return WriteStatus.ok
+
+
+async def update_owned(
+    db: AsyncSession,
+    model: type[ModelT],
+    row_id: UUID,
+    owner_id: UUID,
+    values: dict[str, Any],
+    owner_column: str = "user_id",
+) -> tuple[WriteStatus, Optional[ModelT]]:
+    """Update a row only if ``owner_id`` owns it; return the status and updated row.
+
+    The caller is responsible for committing.
+    """
+    table = model.__table__
+    pk = table.c.id
+    owner = table.c[owner_column]
+
+    if not values:
+        # Nothing to change: a plain read still answers found/owned in one query
+        row = await db.get(model, row_id)
+        if row is None:
+            return WriteStatus.not_found, None
+        if getattr(row, owner_column) != owner_id:
+            return WriteStatus.forbidden, None
+        return WriteStatus.ok, row
+
+    target = select(pk, owner).where(pk == row_id).cte("target")
+    changed = (
+        update(table)
+        .where(pk == row_id, owner == owner_id)
+        .values(**values)
+        .returning(*table.c)
+        .cte("changed")
+    )
+    changed_row = aliased(model, changed)
+    stmt = (
+        select(target.c[owner_column], changed_row)
+        .select_from(target.outerjoin(changed, changed.c.id == target.c.id))
+        .execution_options(populate_existing=True)
+    )
+
+    row = (await db.execute(stmt)).first()
+    outcome = _status(row)
+    return outcome, row[1] if outcome is WriteStatus.ok else None
+
+
+async def delete_owned(
+    db: AsyncSession,
+    model: type,
+    row_id: UUID,
+    owner_id: UUID,
+    owner_column: str = "user_id",
+) -> WriteStatus:
+    """Delete a row only if ``owner_id`` owns it.
+
+    The caller is responsible for committing.
+    """
+    table = model.__table__
+    pk = table.c.id
+    owner = table.c[owner_column]
+
+    target = select(pk, owner).where(pk == row_id).cte("target")
+    removed = delete(table).where(pk == row_id, owner == owner_id).returning(pk).cte("removed")
+    stmt = select(target.c[owner_column], removed.c.id).select_from(
+        target.outerjoin(removed, removed.c.id == target.c.id)
+    )
+
+    outcome = _status((await db.execute(stmt)).first())
+    if outcome is WriteStatus.ok:
+        # Drop any stale copy the session already holds
+        instance = db.identity_map.get(identity_key(model, row_id))
+        if instance is not None:
+            db.expunge(instance)
+    return outcome
@@ -0,0 +1,84 @@
+"""Post service."""
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.post import Comment, Post, PostLike
+from app.schemas.post import CommentCreate, PostCreate
+from app.schemas.tag import TagKind
+from app.services.counters import COMMENTS, LIKES, post_counters
+from app.services.tag_index import tag_autocomplete
+from app.services.tag_service import TagService
+
+
+class PostService:
+    """Post service."""
+
+    @staticmethod
+    async def create_post(db: AsyncSession, user_id: UUID, data: PostCreate) -> Post:
+        """Create new post; the caller fans it out to followers' timelines."""
+        post = Post(**data.model_dump(), user_id=user_id)
+        db.add(post)
+        await TagService.record(db, TagKind.post, data.tags)
+        await db.commit()
+        await db.refresh(post)
+        tag_autocomplete.add(TagKind.post, data.tags)
+        return post
+
+    @staticmethod
+    async def get_post(db: AsyncSession, post_id: UUID) -> Optional[Post]:
+        """Get post by ID."""
+        return await db.get(Post, post_id)
+
+    @staticmethod
+    async def get_posts(db: AsyncSession, post_ids: list[UUID]) -> list[Post]:
+        """Load posts in one query, in the order given, skipping deleted ones."""
+        if not post_ids:
+            return []
+        result = await db.execute(select(Post).where(Post.id.in_(post_ids)))
+        posts = {post.id: post for post in result.scalars().all()}
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+    @staticmethod
+    async def like_post(db: AsyncSession, post_id: UUID, user_id: UUID) -> bool:
+        """Like a post; return False if already liked."""
+        stmt = (
+            insert(PostLike)
+            .values(post_id=post_id, user_id=user_id)
+            .on_conflict_do_nothing(index_elements=[PostLike.post_id, PostLike.user_id])
+            .returning(PostLike.post_id)
+        )
+        if (await db.execute(stmt)).first() is None:
+            return False
+        await db.commit()
+        await post_counters.increment(post_id, LIKES)
+        return True
+
+    @staticmethod
+    async def unlike_post(db: AsyncSession, post_id: UUID, user_id: UUID) -> bool:
+        """Remove a like; return False if not liked."""
+        stmt = (
+            delete(PostLike)
+            .where(PostLike.post_id == post_id, PostLike.user_id == user_id)
+            .returning(PostLike.post_id)
+        )
+        if (await db.execute(stmt)).first() is None:
+            return False
+        await db.commit()
+        await post_counters.increment(post_id, LIKES, -1)
+        return True
+
+    @staticmethod
+    async def add_comment(
+        db: AsyncSession, post_id: UUID, user_id: UUID, data: CommentCreate
+    ) -> Comment:
+        """Comment on a post."""
+        comment = Comment(post_id=post_id, user_id=user_id, content=data.content)
+        db.add(comment)
+        await db.commit()
+        await db.refresh(comment)
+        await post_counters.increment(post_id, COMMENTS)
+        return comment
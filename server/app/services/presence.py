@@ -0,0 +1,79 @@
+"""Online presence of WebSocket users across workers.
+
+Each user has a sorted set of the workers holding a socket for them, scored
+by when that worker's claim expires. A worker refreshes its claim on connect
+and on every ping, and removes it when the user's last socket on that worker
+closes. A user is online while any claim is unexpired, so closing a socket
+on one worker leaves the user online through their sockets on the others,
+and a crashed worker's claims lapse after one TTL.
+"""
+import logging
+import time
+import uuid
+from typing import Any, Iterable
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "presence:workers:"
+
+
+class Presence:
+    """Tracks which users currently hold an open socket."""
+
+    def __init__(self, redis: Any = None, ttl_seconds: int = settings.PRESENCE_TTL_SECONDS):
+        self._redis = redis
+        self.ttl_seconds = ttl_seconds
+        # Identifies this worker's claims
+        self.worker_id = uuid.uuid4().hex
+
+    @property
+    def redis(self) -> Any:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    async def mark_online(self, user_id: UUID) -> None:
+        """Record (or refresh) that the user is connected to this worker."""
+        key = KEY_PREFIX + str(user_id)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zadd(key, {self.worker_id: time.time() + self.ttl_seconds})
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+        except (RedisError, OSError):
+            logger.warning("Could not update presence of %s", user_id)
+
+    async def mark_offline(self, user_id: UUID) -> None:
+        """Record that the user has no open socket on this worker."""
+        try:
+            await self.redis.zrem(KEY_PREFIX + str(user_id), self.worker_id)
+        except (RedisError, OSError):
+            logger.warning("Could not update presence of %s", user_id)
+
+    async def online(self, user_ids: Iterable[UUID]) -> set[UUID]:
+        """Return the subset of ``user_ids`` that is online.
+
+        When presence is unavailable nobody counts as online, so callers
+        err on the side of sending a push.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        now = time.time()
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.zrangebyscore(KEY_PREFIX + str(user_id), now, "+inf", start=0, num=1)
+            claims = await pipe.execute()
+        except (RedisError, OSError):
+            return set()
+        return {user_id for user_id, live in zip(user_ids, claims) if live}
+
+
+presence = Presence()
@@ -0,0 +1,281 @@
+"""Push delivery in provider-sized batches.
+
+``PushDispatcher`` takes a flat list of (device token, message) deliveries,
+cuts it into batches no larger than the provider accepts per call (500 for
+FCM), and sends a few batches concurrently. Deliveries that fail with a
+transient error are retried with exponential backoff and jitter, and only
+those deliveries are resent. Tokens the provider reports as unregistered
+are returned so the caller can prune them.
+
+``FirebasePushProvider`` is used when ``FIREBASE_SERVICE_ACCOUNT_KEY`` is
+set. ``FakePushProvider`` only records deliveries locally; it is what tests
+and benchmarks use, and development setups opt into it with
+``PUSH_FAKE_PROVIDER``. With neither, pushes are dropped with a warning.
+"""
+import asyncio
+import enum
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional, Protocol
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# FCM's limit for one send_each / multicast call
+FCM_MAX_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class PushMessage:
+    """Notification content; ``data`` values must be strings for FCM."""
+
+    title: str
+    body: str
+    data: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Delivery:
+    """One message to one device."""
+
+    token: str
+    message: PushMessage
+
+
+class DeliveryStatus(str, enum.Enum):
+    """Per-delivery outcome reported by a provider."""
+
+    sent = "sent"
+    retry = "retry"
+    invalid = "invalid"
+
+
+class PushProvider(Protocol):
+    """A push backend that sends a batch of deliveries in one call."""
+
+    max_batch_size: int
+
+    async def send_batch(self, deliveries: list[Delivery]) -> list[DeliveryStatus]: ...
+
+
+class FakePushProvider:
+    """In-process provider that records deliveries instead of sending them.
+
+    ``latency`` simulates the round-trip of one batch call, ``failure_rate``
+    the share of deliveries that fail transiently, and ``invalid_tokens``
+    the devices the provider no longer knows. ``sent`` keeps the last
+    ``keep`` deliveries (all of them if ``None``); ``delivered`` counts them.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = FCM_MAX_BATCH_SIZE,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        invalid_tokens: Optional[set[str]] = None,
+        seed: Optional[int] = None,
+        keep: Optional[int] = 1000,
+    ) -> None:
+        self.max_batch_size = max_batch_size
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.invalid_tokens = invalid_tokens or set()
+        self.sent: deque[Delivery] = deque(maxlen=keep)
+        self.delivered = 0
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    async def send_batch(self, deliveries: list[Delivery]) -> list[DeliveryStatus]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        results = []
+        for delivery in deliveries:
+            if delivery.token in self.invalid_tokens:
+                results.append(DeliveryStatus.invalid)
+            elif self._rng.random() < self.failure_rate:
+                results.append(DeliveryStatus.retry)
+            else:
+                self.sent.append(delivery)
+                self.delivered += 1
+                results.append(DeliveryStatus.sent)
+        return results
+
+
+class FirebasePushProvider:
+    """Firebase Cloud Messaging through ``firebase_admin`` (imported lazily)."""
+
+    max_batch_size = FCM_MAX_BATCH_SIZE
+
+    def __init__(self, service_account_key: str) -> None:
+        import firebase_admin
+        from firebase_admin import credentials, messaging
+
+        self._messaging = messaging
+        try:
+            self._app = firebase_admin.get_app()
+        except ValueError:
+            self._app = firebase_admin.initialize_app(
+                credentials.Certificate(service_account_key)
+            )
+
+    async def send_batch(self, deliveries: list[Delivery]) -> list[DeliveryStatus]:
+        messaging = self._messaging
+        messages = [
+            messaging.Message(
+                notification=messaging.Notification(
+                    title=delivery.message.title, body=delivery.message.body
+                ),
+                data=delivery.message.data,
+                token=delivery.token,
+            )
+            for delivery in deliveries
+        ]
+        # The SDK call is blocking; it fans the batch out over HTTP/2 itself
+        response = await asyncio.to_thread(messaging.send_each, messages, app=self._app)
+        return [self._status(result) for result in response.responses]
+
+    def _status(self, result: Any) -> DeliveryStatus:
+        if result.success:
+            return DeliveryStatus.sent
+        if isinstance(
+            result.exception,
+            (self._messaging.UnregisteredError, self._messaging.SenderIdMismatchError),
+        ):
+            return DeliveryStatus.invalid
+        return DeliveryStatus.retry
+
+
+@dataclass
+class DispatchReport:
+    """Outcome of one dispatch."""
+
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    batches: int = 0
+    invalid_tokens: set[str] = field(default_factory=set)
+    seconds: float = 0.0
+
+
+class PushDispatcher:
+    """Sends deliveries in provider-sized batches with retry and backoff."""
+
+    def __init__(
+        self,
+        provider: Optional[PushProvider] = None,
+        batch_size: int = settings.PUSH_BATCH_SIZE,
+        concurrency: int = settings.PUSH_CONCURRENCY,
+        max_attempts: int = settings.PUSH_MAX_ATTEMPTS,
+        retry_base_seconds: float = settings.PUSH_RETRY_BASE_SECONDS,
+    ) -> None:
+        self._provider = provider
+        self._resolved = provider is not None
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self._rng = random.Random()
+
+        self.dispatches = 0
+        self.sent = 0
+        self.failed = 0
+        self.invalid = 0
+        self.retries = 0
+        self.batches = 0
+        self.last_rate = 0.0
+
+    @property
+    def provider(self) -> Optional[PushProvider]:
+        if not self._resolved:
+            self._provider = get_push_provider()
+            self._resolved = True
+        return self._provider
+
+    async def dispatch(self, deliveries: list[Delivery]) -> DispatchReport:
+        """Send every delivery, retrying transient failures."""
+        report = DispatchReport()
+        if not deliveries:
+            return report
+        if self.provider is None:
+            logger.warning("Push is not configured; dropped %d deliveries", len(deliveries))
+            report.failed = len(deliveries)
+            self.failed += report.failed
+            return report
+        size = min(self.batch_size, self.provider.max_batch_size)
+        batches = [deliveries[i : i + size] for i in range(0, len(deliveries), size)]
+        slots = asyncio.Semaphore(self.concurrency)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(self._send(batch, slots, report) for batch in batches))
+        report.seconds = time.perf_counter() - start
+
+        self.dispatches += 1
+        self.sent += report.sent
+        self.failed += report.failed
+        self.invalid += len(report.invalid_tokens)
+        self.retries += report.retries
+        self.batches += report.batches
+        if report.seconds > 0:
+            self.last_rate = report.sent / report.seconds
+        return report
+
+    async def _send(
+        self, batch: list[Delivery], slots: asyncio.Semaphore, report: DispatchReport
+    ) -> None:
+        pending = batch
+        for attempt in range(1, self.max_attempts + 1):
+            async with slots:
+                report.batches += 1
+                try:
+                    results = await self.provider.send_batch(pending)
+                except Exception:
+                    logger.warning("Push batch of %d failed", len(pending), exc_info=True)
+                    results = [DeliveryStatus.retry] * len(pending)
+
+            retry = []
+            for delivery, result in zip(pending, results):
+                if result is DeliveryStatus.sent:
+                    report.sent += 1
+                elif result is DeliveryStatus.invalid:
+                    report.invalid_tokens.add(delivery.token)
+                else:
+                    retry.append(delivery)
+            if not retry:
+                return
+            if attempt == self.max_attempts:
+                break
+            report.retries += len(retry)
+            pending = retry
+            # Full jitter keeps retries from many batches from lining up
+            backoff = self.retry_base_seconds * 2 ** (attempt - 1)
+            await asyncio.sleep(self._rng.uniform(0, backoff))
+
+        report.failed += len(retry)
+        logger.warning("Giving up on %d push deliveries", len(retry))
+
+    def stats(self) -> dict[str, Any]:
+        """Return delivery counters and the throughput of the last dispatch."""
+        return {
+            "dispatches": self.dispatches,
+            "batches": self.batches,
+            "sent": self.sent,
+            "failed": self.failed,
+            "invalid_tokens": self.invalid,
+            "retries": self.retries,
+            "last_rate_per_second": round(self.last_rate, 1),
+        }
+
+
+def get_push_provider() -> Optional[PushProvider]:
+    """Return the configured provider, or ``None`` when push is not set up."""
+    if settings.FIREBASE_SERVICE_ACCOUNT_KEY:
+        return FirebasePushProvider(settings.FIREBASE_SERVICE_ACCOUNT_KEY)
+    if settings.PUSH_FAKE_PROVIDER:
+        return FakePushProvider()
+    logger.warning("FIREBASE_SERVICE_ACCOUNT_KEY is not set; push notifications are disabled")
+    return None
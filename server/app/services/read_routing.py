@@ -0,0 +1,127 @@
+"""Routing of read-only sessions between the primary and a read replica.
+
+When ``DATABASE_REPLICA_URL`` is set, read-only sessions from
+``read_router`` go to the replica, except:
+
+* for a user who wrote recently, who stays on the primary for
+  ``DATABASE_READ_YOUR_WRITES_SECONDS``, so replication lag never hides
+  their own changes from them;
+* while the replica is unreachable, when they fall back to the primary.
+
+The request dependencies in ``app.api.deps`` pin a user after a request
+whose primary session wrote.
+"""
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.database import AsyncSessionLocal, ReplicaSessionLocal, created_engines
+
+logger = logging.getLogger(__name__)
+
+
+class ReadRouter:
+    """Chooses the database for read-only sessions.
+
+    Pins are kept in this process and in Redis, so every worker honours
+    them. If Redis fails, the user is treated as pinned and reads from the
+    primary.
+    """
+
+    def __init__(
+        self,
+        replica: Optional[async_sessionmaker[AsyncSession]] = ReplicaSessionLocal,
+        primary: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        sticky_seconds: float = settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+        retry_seconds: float = settings.DATABASE_REPLICA_RETRY_SECONDS,
+        redis: Any = None,
+    ) -> None:
+        self.replica = replica
+        self.primary = primary
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._redis = redis
+        self._pins = TTLCache(maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl_seconds=sticky_seconds)
+        self._replica_down_until = 0.0
+
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.pinned_reads = 0
+        self.fallbacks = 0
+
+    @property
+    def redis(self) -> Any:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    def _key(self, user_id: str) -> str:
+        return f"db:pin:{user_id}"
+
+    async def pin(self, user_id: str) -> None:
+        """Send ``user_id``'s reads to the primary for the next ``sticky_seconds``."""
+        if self.replica is None:
+            return
+        self._pins.set(user_id, True)
+        try:
+            await self.redis.set(self._key(user_id), "1", ex=math.ceil(self.sticky_seconds))
+        except (RedisError, OSError):
+            logger.warning("Could not share the primary pin of user %s", user_id, exc_info=True)
+
+    async def is_pinned(self, user_id: str) -> bool:
+        if self._pins.get(user_id):
+            return True
+        try:
+            return bool(await self.redis.exists(self._key(user_id)))
+        except (RedisError, OSError):
+            return True
+
+    async def open(self, user_id: Optional[str] = None) -> AsyncSession:
+        """Open a read-only session, on the replica when that is safe."""
+        if self.replica is None or time.monotonic() < self._replica_down_until:
+            self.primary_reads += 1
+            return self.primary()
+        if user_id is not None and await self.is_pinned(user_id):
+            self.pinned_reads += 1
+            return self.primary()
+
+        session = self.replica()
+        try:
+            # Check a connection out now, so an unreachable replica is caught here
+            await session.connection()
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+            await session.close()
+            logger.warning(
+                "Replica unavailable; reading from the primary for %.0f s",
+                self.retry_seconds,
+                exc_info=True,
+            )
+            self._replica_down_until = time.monotonic() + self.retry_seconds
+            self.fallbacks += 1
+            return self.primary()
+        self.replica_reads += 1
+        return session
+
+    def stats(self) -> dict[str, Any]:
+        """Return routing counters and connection pool state for this process."""
+        return {
+            "replica_configured": self.replica is not None,
+            "replica_down": time.monotonic() < self._replica_down_until,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "pinned_reads": self.pinned_reads,
+            "fallbacks": self.fallbacks,
+            "pools": {role: engine.pool.status() for role, engine in created_engines().items()},
+        }
+
+
+read_router = ReadRouter()
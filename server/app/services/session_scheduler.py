@@ -0,0 +1,249 @@
+"""Time-driven session status transitions.
+
+A session moves ``recruiting``/``full`` -> ``upcoming`` when recruitment
+closes shortly before its start, and ``upcoming`` -> ``ended`` once it is
+over. Rather than checking each row on every request, sessions sit in a
+Redis sorted set used as a delay queue, scored by the time of their next
+transition. Each scheduler tick (a Celery beat task) pops only the entries
+that are due and moves them with one set-based ``UPDATE`` per transition
+and batch. It publishes one event per batch and re-queues each session at
+its next deadline.
+
+The queue is an accelerator, not the source of truth: a periodic sweep
+applies any overdue transitions straight from the ``(status, scheduled_at)``
+index and refills the queue for sessions due soon, so a lost Redis key only
+delays a transition until the next sweep.
+"""
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.database import AsyncSessionLocal
+from app.models.session import Session, SessionStatus
+from app.services.square import SquareService
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "sessions:due"
+EVENTS_CHANNEL = "sessions:transitions"
+
+
+@dataclass(frozen=True)
+class Transition:
+    """A status change that fires at ``scheduled_at + offset``."""
+
+    name: str
+    sources: tuple[SessionStatus, ...]
+    target: SessionStatus
+    offset: timedelta
+
+    def due_at(self, scheduled_at: datetime) -> datetime:
+        return scheduled_at + self.offset
+
+
+# Applied in order, so a session that is overdue for both moves through both
+TRANSITIONS = (
+    Transition(
+        "close",
+        (SessionStatus.recruiting, SessionStatus.full),
+        SessionStatus.upcoming,
+        -timedelta(minutes=settings.SESSION_LOCK_BEFORE_MINUTES),
+    ),
+    Transition(
+        "end",
+        (SessionStatus.upcoming,),
+        SessionStatus.ended,
+        timedelta(minutes=settings.SESSION_DURATION_MINUTES),
+    ),
+)
+
+
+def next_due(status: SessionStatus, scheduled_at: datetime) -> Optional[datetime]:
+    """Return when a session in ``status`` next changes state, if ever."""
+    for transition in TRANSITIONS:
+        if status in transition.sources:
+            return transition.due_at(scheduled_at)
+    return None
+
+
+def _score(value: datetime) -> float:
+    # Timestamps are naive UTC throughout the app
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class SessionScheduler:
+    """Moves sessions through their time-driven states in bulk."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        redis: Any = None,
+        batch_size: int = settings.SESSION_TRANSITION_BATCH_SIZE,
+    ) -> None:
+        self.session_factory = session_factory
+        self._redis = redis
+        self.batch_size = batch_size
+        self.transitioned = 0
+        self.batches = 0
+
+    @property
+    def redis(self) -> Any:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    async def schedule(
+        self, session_id: UUID, status: SessionStatus, scheduled_at: datetime
+    ) -> None:
+        """Queue a session for its next transition (or drop it if it has none)."""
+        due = next_due(status, scheduled_at)
+        try:
+            if due is None:
+                await self.redis.zrem(QUEUE_KEY, str(session_id))
+            else:
+                await self.redis.zadd(QUEUE_KEY, {str(session_id): _score(due)})
+        except (RedisError, OSError):
+            # The next sweep queues it from the database
+            logger.warning("Could not queue session %s for its next transition", session_id)
+
+    async def advance(self, now: Optional[datetime] = None) -> int:
+        """Apply every due transition in the delay queue; return rows changed."""
+        now = now or datetime.utcnow()
+        total = 0
+        while True:
+            members = await self.redis.zrangebyscore(
+                QUEUE_KEY, "-inf", _score(now), start=0, num=self.batch_size
+            )
+            if not members:
+                break
+            session_ids = [UUID(member.decode()) for member in members]
+            changed = await self._apply_all(now, session_ids)
+            await self._requeue(session_ids)
+            total += changed
+            # Entries whose rows were locked elsewhere stay due for the next tick
+            if len(members) < self.batch_size or not changed:
+                break
+        return total
+
+    async def sweep(
+        self, now: Optional[datetime] = None, horizon: Optional[timedelta] = None
+    ) -> int:
+        """Apply overdue transitions from the index and refill the queue.
+
+        Sessions due within ``horizon`` are (re)queued, so the queue recovers
+        from lost entries before they become overdue.
+        """
+        now = now or datetime.utcnow()
+        horizon = horizon or timedelta(seconds=2 * settings.SESSION_SWEEP_INTERVAL_SECONDS)
+        changed = await self._apply_all(now, None)
+
+        mapping = {}
+        async with self.session_factory() as db:
+            for transition in TRANSITIONS:
+                result = await db.execute(
+                    select(Session.id, Session.scheduled_at).where(
+                        Session.status.in_(transition.sources),
+                        Session.scheduled_at <= now + horizon - transition.offset,
+                    )
+                )
+                for session_id, scheduled_at in result:
+                    mapping[str(session_id)] = _score(transition.due_at(scheduled_at))
+        if mapping:
+            await self.redis.zadd(QUEUE_KEY, mapping)
+        return changed
+
+    async def _apply_all(self, now: datetime, session_ids: Optional[list[UUID]]) -> int:
+        total = 0
+        for transition in TRANSITIONS:
+            while True:
+                changed = await self._apply(transition, now, session_ids)
+                if changed:
+                    total += len(changed)
+                    await self._publish(transition, changed, now)
+                if len(changed) < self.batch_size:
+                    break
+        return total
+
+    async def _apply(
+        self, transition: Transition, now: datetime, session_ids: Optional[list[UUID]]
+    ) -> list[UUID]:
+        """Move one batch of due sessions with a single UPDATE."""
+        due = (
+            select(Session.id)
+            .where(
+                Session.status.in_(transition.sources),
+                Session.scheduled_at <= now - transition.offset,
+            )
+            .order_by(Session.scheduled_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if session_ids is not None:
+            due = due.where(Session.id.in_(session_ids))
+        stmt = (
+            update(Session)
+            .where(Session.id.in_(due.scalar_subquery()))
+            .values(status=transition.target)
+            .returning(Session.id)
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session_factory() as db:
+            changed = list(await db.scalars(stmt))
+            if changed:
+                await SquareService.set_status(db, changed, transition.target)
+            await db.commit()
+        return changed
+
+    async def _requeue(self, session_ids: list[UUID]) -> None:
+        """Re-score popped sessions at their next deadline, or drop them."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Session.id, Session.status, Session.scheduled_at).where(
+                    Session.id.in_(session_ids)
+                )
+            )
+            upcoming = {}
+            for session_id, status, scheduled_at in result:
+                due = next_due(status, scheduled_at)
+                if due is not None:
+                    upcoming[str(session_id)] = _score(due)
+        finished = [member for member in map(str, session_ids) if member not in upcoming]
+        if upcoming:
+            await self.redis.zadd(QUEUE_KEY, upcoming)
+        if finished:
+            await self.redis.zrem(QUEUE_KEY, *finished)
+
+    async def _publish(
+        self, transition: Transition, session_ids: list[UUID], now: datetime
+    ) -> None:
+        self.batches += 1
+        self.transitioned += len(session_ids)
+        event = {
+            "type": "session_status_changed",
+            "transition": transition.name,
+            "status": transition.target.value,
+            "session_ids": [str(session_id) for session_id in session_ids],
+            "at": now.isoformat(),
+        }
+        try:
+            await self.redis.publish(EVENTS_CHANNEL, json.dumps(event))
+        except (RedisError, OSError):
+            logger.warning(
+                "Could not publish %s event for %d sessions", transition.name, len(session_ids)
+            )
+
+    def stats(self) -> dict[str, int]:
+        """Return transition counters for this process."""
+        return {"transitioned": self.transitioned, "batches": self.batches}
+
+
+session_scheduler = SessionScheduler()
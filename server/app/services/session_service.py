@@ -0,0 +1,321 @@
+"""Session service.
+
+Seats are accounted for with the ``sessions.current_dogs`` counter rather
+than by counting ``session_participants``. Joining and leaving first run a
+conditional ``UPDATE`` of the session row, which claims or frees a seat and
+flips ``recruiting``/``full`` in the same statement, and then write the
+participant row in the same transaction. The row lock taken by that
+``UPDATE`` serializes every seat change of one session, so concurrent joins
+can never take more than ``max_dogs`` seats and the counter always matches
+the participant rows.
+"""
+import enum
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import (
+    and_,
+    case,
+    delete,
+    exists,
+    insert,
+    select,
+    tuple_,
+    type_coerce,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.dog import Dog
+from app.models.session import Session, SessionStatus, session_participants
+from app.schemas.session import SessionCreate
+from app.services.matching import (
+    CompiledRequirements,
+    DogProfile,
+    dog_matches,
+    eligible_clause,
+    requirement_columns,
+    session_matcher,
+)
+from app.services.session_scheduler import session_scheduler
+from app.services.square import SquareService
+
+
+class SeatStatus(str, enum.Enum):
+    """Outcome of a join or leave."""
+
+    ok = "ok"
+    not_found = "not_found"
+    closed = "closed"
+    full = "full"
+    already_joined = "already_joined"
+    not_joined = "not_joined"
+
+
+# Sessions a dog may still leave
+LEAVABLE_STATUSES = (SessionStatus.recruiting, SessionStatus.full, SessionStatus.upcoming)
+
+
+def _status(value: SessionStatus):
+    return type_coerce(value, Session.status.type)
+
+
+def _is_participant(session_id: UUID, dog_id: UUID):
+    return exists().where(
+        session_participants.c.session_id == session_id,
+        session_participants.c.dog_id == dog_id,
+    )
+
+
+class SessionService:
+    """Session service."""
+
+    @staticmethod
+    async def get_session(db: AsyncSession, session_id: UUID) -> Optional[Session]:
+        """Get session by ID."""
+        return await db.get(Session, session_id)
+
+    @staticmethod
+    async def create_session(
+        db: AsyncSession, creator_id: UUID, data: SessionCreate
+    ) -> Optional[Session]:
+        """Create a new session; None if its location does not exist."""
+        requirements = data.requirements
+        session = Session(
+            creator_id=creator_id,
+            current_dogs=0,
+            **data.model_dump(exclude={"requirements"}),
+            requirements=requirements.model_dump(mode="json") if requirements else None,
+            **requirement_columns(requirements),
+        )
+        db.add(session)
+        try:
+            await db.flush()
+        except IntegrityError:
+            # The location_id foreign key: the location is unknown
+            await db.rollback()
+            return None
+        await SquareService.add(db, session.id)
+        await db.commit()
+        await db.refresh(session)
+        await session_scheduler.schedule(session.id, session.status, session.scheduled_at)
+        return session
+
+    @staticmethod
+    async def list_eligible(
+        db: AsyncSession,
+        dogs: list[Dog],
+        after: Optional[tuple[datetime, UUID]] = None,
+        limit: int = 20,
+    ) -> tuple[list[tuple[Session, list[UUID]]], Optional[tuple[datetime, UUID]]]:
+        """Upcoming recruiting sessions that at least one of ``dogs`` may join.
+
+        Returns each session with the ids of the qualifying dogs, soonest
+        first, and the ``(scheduled_at, id)`` key of the next page, if any.
+        Pages come from the in-memory index when it is built, and from an
+        indexed SQL filter otherwise.
+        """
+        profiles = [DogProfile.of(dog) for dog in dogs]
+        now = datetime.utcnow()
+        index = session_matcher.index()
+        if index is None:
+            return await SessionService._list_eligible_sql(db, profiles, now, after, limit)
+
+        matches, next_after = index.match(profiles, now, after, limit)
+        if not matches:
+            return [], next_after
+        # The index may be a few seconds old; drop sessions that closed since
+        result = await db.execute(
+            select(Session).where(
+                Session.id.in_([session_id for session_id, _ in matches]),
+                Session.status == SessionStatus.recruiting,
+            )
+        )
+        sessions = {session.id: session for session in result.scalars()}
+        return [
+            (sessions[session_id], dog_ids)
+            for session_id, dog_ids in matches
+            if session_id in sessions
+        ], next_after
+
+    @staticmethod
+    async def _list_eligible_sql(
+        db: AsyncSession,
+        profiles: list[DogProfile],
+        now: datetime,
+        after: Optional[tuple[datetime, UUID]],
+        limit: int,
+    ) -> tuple[list[tuple[Session, list[UUID]]], Optional[tuple[datetime, UUID]]]:
+        stmt = (
+            select(Session)
+            .where(
+                Session.status == SessionStatus.recruiting,
+                Session.scheduled_at > now,
+                eligible_clause(profiles),
+            )
+            .order_by(Session.scheduled_at, Session.id)
+            .limit(limit + 1)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Session.scheduled_at, Session.id) > tuple_(*after))
+        sessions = list((await db.execute(stmt)).scalars())
+        page = []
+        for session in sessions[:limit]:
+            requirements = CompiledRequirements.of(session)
+            page.append(
+                (session, [dog.id for dog in profiles if dog_matches(requirements, dog)])
+            )
+        if len(sessions) <= limit:
+            return page, None
+        last = sessions[limit - 1]
+        return page, (last.scheduled_at, last.id)
+
+    @staticmethod
+    async def join_session(
+        db: AsyncSession, session_id: UUID, dog_id: UUID
+    ) -> tuple[SeatStatus, Optional[Session]]:
+        """Take a seat for ``dog_id``; the session turns ``full`` with the last seat.
+
+        The caller must have checked that the dog belongs to the current user.
+        """
+        claim = (
+            update(Session)
+            .where(
+                Session.id == session_id,
+                Session.status == SessionStatus.recruiting,
+                Session.current_dogs < Session.max_dogs,
+            )
+            .values(
+                current_dogs=Session.current_dogs + 1,
+                status=case(
+                    (Session.current_dogs + 1 >= Session.max_dogs, _status(SessionStatus.full)),
+                    else_=Session.status,
+                ),
+            )
+            .returning(Session)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        session = (await db.execute(claim)).scalar_one_or_none()
+        if session is None:
+            await db.rollback()
+            return await SessionService._join_failure(db, session_id, dog_id), None
+
+        try:
+            await db.execute(
+                insert(session_participants).values(
+                    session_id=session_id, dog_id=dog_id, joined_at=datetime.utcnow()
+                )
+            )
+        except IntegrityError:
+            # Already a participant: rolling back also gives the seat back
+            await db.rollback()
+            return SeatStatus.already_joined, None
+
+        await SquareService.sync(db, [session_id])
+        await db.commit()
+        return SeatStatus.ok, session
+
+    @staticmethod
+    async def _join_failure(db: AsyncSession, session_id: UUID, dog_id: UUID) -> SeatStatus:
+        """Explain why no seat could be claimed (only runs on the failure path)."""
+        row = (
+            await db.execute(
+                select(Session.status, _is_participant(session_id, dog_id)).where(
+                    Session.id == session_id
+                )
+            )
+        ).first()
+        if row is None:
+            return SeatStatus.not_found
+        status, joined = row
+        if joined:
+            return SeatStatus.already_joined
+        # A recruiting session here had its last seat taken when the claim
+        # ran; a seat may have been freed since, but this attempt lost
+        if status in (SessionStatus.recruiting, SessionStatus.full):
+            return SeatStatus.full
+        return SeatStatus.closed
+
+    @staticmethod
+    async def start_session(
+        db: AsyncSession, session_id: UUID, creator_id: UUID
+    ) -> Optional[Session]:
+        """Start a session ahead of schedule; ``None`` if it already started or ended.
+
+        Recruitment closes and the session is rescheduled to now, so it ends
+        one session duration later and no reminder goes out for it.
+        """
+        now = datetime.utcnow()
+        start = (
+            update(Session)
+            .where(
+                Session.id == session_id,
+                Session.creator_id == creator_id,
+                Session.status.in_(LEAVABLE_STATUSES),
+                Session.scheduled_at > now,
+            )
+            .values(status=SessionStatus.upcoming, scheduled_at=now, reminder_sent_at=now)
+            .returning(Session)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        session = (await db.execute(start)).scalar_one_or_none()
+        if session is None:
+            await db.rollback()
+            return None
+        await SquareService.sync(db, [session_id])
+        await db.commit()
+        await session_scheduler.schedule(session.id, session.status, session.scheduled_at)
+        return session
+
+    @staticmethod
+    async def leave_session(
+        db: AsyncSession, session_id: UUID, dog_id: UUID
+    ) -> tuple[SeatStatus, Optional[Session]]:
+        """Give up ``dog_id``'s seat; a ``full`` session goes back to ``recruiting``.
+
+        The caller must have checked that the dog belongs to the current user.
+        """
+        # Lock the session row before touching participants, in the same
+        # order as join_session, so a join and a leave cannot deadlock
+        release = (
+            update(Session)
+            .where(
+                Session.id == session_id,
+                Session.status.in_(LEAVABLE_STATUSES),
+                _is_participant(session_id, dog_id),
+            )
+            .values(
+                current_dogs=Session.current_dogs - 1,
+                status=case(
+                    (Session.status == SessionStatus.full, _status(SessionStatus.recruiting)),
+                    else_=Session.status,
+                ),
+            )
+            .returning(Session)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        session = (await db.execute(release)).scalar_one_or_none()
+        if session is not None:
+            removed = await db.execute(
+                delete(session_participants).where(
+                    and_(
+                        session_participants.c.session_id == session_id,
+                        session_participants.c.dog_id == dog_id,
+                    )
+                )
+            )
+            if removed.rowcount == 1:
+                await SquareService.sync(db, [session_id])
+                await db.commit()
+                return SeatStatus.ok, session
+
+        # Not a participant (or a concurrent leave got there first)
+        await db.rollback()
+        status = await db.scalar(select(Session.status).where(Session.id == session_id))
+        if status is None:
+            return SeatStatus.not_found, None
+        if status not in LEAVABLE_STATUSES:
+            return SeatStatus.closed, None
+        return SeatStatus.not_joined, None
@@ -0,0 +1,219 @@
+"""The square: every open session as a card, read from a projection.
+
+A card shows a session's title, time, location name, seats, status and an
+avatar wall of its first participants. Assembling that from ``sessions``,
+``locations``, ``session_participants`` and ``dogs`` on every scroll is a
+four-way join with an aggregate per row. ``square_cards`` keeps the
+finished card instead, one row per listed session, so a page is one
+index range read.
+
+Cards are updated in the transaction of the write that changes them:
+``add`` when a session is created, ``sync`` after a join, leave or early
+start, ``set_status`` for the scheduler's bulk transitions and
+``refresh_dog`` when a participant's avatar changes. A session that ends
+or is cancelled loses its card. Pages are keyset-paginated by start time,
+or by distance using the geohash ring search of ``LocationService``.
+"""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import and_, delete, false, func, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import geo
+from app.core.config import settings
+from app.models.dog import Dog
+from app.models.location import Location
+from app.models.session import Session, SessionStatus, SquareCard, session_participants
+from app.services.location_service import NEARBY_GROWTH_FACTOR, NEARBY_INITIAL_RADIUS_KM
+
+# Sessions that have a card
+LISTED_STATUSES = (SessionStatus.recruiting, SessionStatus.full, SessionStatus.upcoming)
+
+
+def avatar_wall(session_id):
+    """``ARRAY(SELECT ...)`` of the avatars of a session's first participants."""
+    return func.array(
+        select(Dog.avatar)
+        .join(session_participants, session_participants.c.dog_id == Dog.id)
+        .where(session_participants.c.session_id == session_id)
+        .order_by(session_participants.c.joined_at, session_participants.c.dog_id)
+        .limit(settings.SQUARE_AVATAR_WALL_SIZE)
+        .scalar_subquery()
+    )
+
+
+class SquareService:
+    """Maintains and reads the square's session cards."""
+
+    @staticmethod
+    async def add(db: AsyncSession, session_id: UUID) -> None:
+        """Create the card of a new session; the session row must be flushed."""
+        await db.execute(
+            insert(SquareCard).from_select(
+                [
+                    "session_id",
+                    "title",
+                    "scheduled_at",
+                    "status",
+                    "current_dogs",
+                    "max_dogs",
+                    "location_id",
+                    "location_name",
+                    "latitude",
+                    "longitude",
+                    "geohash",
+                    "avatars",
+                    "updated_at",
+                ],
+                select(
+                    Session.id,
+                    Session.title,
+                    Session.scheduled_at,
+                    Session.status,
+                    Session.current_dogs,
+                    Session.max_dogs,
+                    Location.id,
+                    Location.name,
+                    Location.latitude,
+                    Location.longitude,
+                    Location.geohash,
+                    avatar_wall(Session.id),
+                    func.timezone("utc", func.now()),
+                )
+                .join(Location, Location.id == Session.location_id)
+                .where(Session.id == session_id, Session.status.in_(LISTED_STATUSES)),
+            )
+        )
+
+    @staticmethod
+    async def sync(db: AsyncSession, session_ids: list[UUID]) -> None:
+        """Copy the current seats, status, time and avatar wall onto the cards."""
+        await db.execute(
+            update(SquareCard)
+            .where(SquareCard.session_id == Session.id, SquareCard.session_id.in_(session_ids))
+            .values(
+                title=Session.title,
+                scheduled_at=Session.scheduled_at,
+                status=Session.status,
+                current_dogs=Session.current_dogs,
+                max_dogs=Session.max_dogs,
+                avatars=avatar_wall(SquareCard.session_id),
+                updated_at=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            delete(SquareCard)
+            .where(
+                SquareCard.session_id.in_(session_ids),
+                SquareCard.status.notin_(LISTED_STATUSES),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def set_status(
+        db: AsyncSession, session_ids: list[UUID], status: SessionStatus
+    ) -> None:
+        """Apply a bulk status change; sessions that stop being listed lose their card."""
+        if status in LISTED_STATUSES:
+            stmt = (
+                update(SquareCard)
+                .where(SquareCard.session_id.in_(session_ids))
+                .values(status=status, updated_at=datetime.utcnow())
+            )
+        else:
+            stmt = delete(SquareCard).where(SquareCard.session_id.in_(session_ids))
+        await db.execute(stmt.execution_options(synchronize_session=False))
+
+    @staticmethod
+    async def refresh_dog(db: AsyncSession, dog_id: UUID) -> None:
+        """Rebuild the avatar walls of the listed sessions ``dog_id`` takes part in."""
+        await db.execute(
+            update(SquareCard)
+            .where(
+                SquareCard.session_id.in_(
+                    select(session_participants.c.session_id).where(
+                        session_participants.c.dog_id == dog_id
+                    )
+                )
+            )
+            .values(avatars=avatar_wall(SquareCard.session_id), updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def by_time(
+        db: AsyncSession, after: Optional[tuple[datetime, UUID]] = None, limit: int = 20
+    ) -> tuple[list[SquareCard], Optional[tuple[datetime, UUID]]]:
+        """Cards soonest first, with the ``(scheduled_at, session_id)`` key of the next page."""
+        stmt = (
+            select(SquareCard)
+            .order_by(SquareCard.scheduled_at, SquareCard.session_id)
+            .limit(limit + 1)
+        )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(SquareCard.scheduled_at, SquareCard.session_id) > tuple_(*after)
+            )
+        cards = list((await db.execute(stmt)).scalars())
+        if len(cards) <= limit:
+            return cards, None
+        last = cards[limit - 1]
+        return cards[:limit], (last.scheduled_at, last.session_id)
+
+    @staticmethod
+    async def nearby(
+        db: AsyncSession,
+        latitude: float,
+        longitude: float,
+        radius_km: float = 10.0,
+        after: Optional[tuple[float, UUID]] = None,
+        limit: int = 20,
+    ) -> tuple[list[tuple[SquareCard, float]], Optional[tuple[float, UUID]]]:
+        """Cards within ``radius_km``, nearest first, with their distances.
+
+        ``after`` is the ``(distance_km, session_id)`` key of the last card
+        seen. Like ``LocationService.get_nearby``, each round scans the
+        geohash cells covering the search ring and only grows the ring while
+        it holds too few cards past ``after``. Later pages cover only the ring
+        past the cursor's distance, since cells wholly inside it hold only
+        cards already seen.
+        """
+        # Never start below the initial ring, whatever distance the cursor claims
+        start = after[0] if after is not None and after[0] > 0 else 0.0
+        search_km = min(start + NEARBY_INITIAL_RADIUS_KM, radius_km)
+
+        while True:
+            cells = geo.covering_cells(latitude, longitude, search_km, inner_km=start)
+            stmt = select(SquareCard).where(
+                or_(
+                    false(),
+                    *(
+                        and_(
+                            SquareCard.geohash >= cell,
+                            SquareCard.geohash < cell + geo.PREFIX_END,
+                        )
+                        for cell in cells
+                    )
+                )
+            )
+            matches = []
+            for card in (await db.execute(stmt)).scalars():
+                distance = geo.haversine_km(latitude, longitude, card.latitude, card.longitude)
+                if distance <= search_km and (
+                    after is None or (distance, card.session_id) > after
+                ):
+                    matches.append((card, distance))
+
+            # Everything within search_km was scanned, so these are the true nearest
+            if len(matches) > limit or search_km >= radius_km:
+                matches.sort(key=lambda match: (match[1], match[0].session_id))
+                if len(matches) <= limit:
+                    return matches, None
+                card, distance = matches[limit - 1]
+                return matches[:limit], (distance, card.session_id)
+
+            search_km = min(search_km * NEARBY_GROWTH_FACTOR, radius_km)
@@ -0,0 +1,193 @@
+"""In-memory tag autocomplete.
+
+``TagIndex`` keeps, for every prefix of every tag up to ``max_prefix``
+characters (including the empty prefix), the ``top_k`` most used tags that
+start with it. A suggestion is then a dictionary lookup, and a count change
+only re-sorts the short lists of that tag's own prefixes. Longer prefixes,
+which match few tags, are answered by a bisect range scan over the sorted
+tags.
+
+``TagAutocomplete`` holds one index per ``TagKind``. It is built from
+``tag_stats`` on first use, bumped locally when this worker creates a post
+or location, and refreshed in the background from the rows whose
+``last_used_at`` moved since the last refresh, so tags used through other
+workers show up within ``refresh_seconds``.
+"""
+import asyncio
+import bisect
+import heapq
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.tag import TagStat
+from app.schemas.tag import TagKind
+
+logger = logging.getLogger(__name__)
+
+# Prefixes up to this length have precomputed suggestions
+MAX_PREFIX_LENGTH = 8
+
+# Re-read rows this far behind the watermark, for writers with skewed clocks
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+# Sorts after any character a tag can contain
+_PREFIX_END = "\U0010ffff"
+
+
+class TagIndex:
+    """Prefix suggestions for one kind of tag, most used first."""
+
+    def __init__(
+        self,
+        counts: dict[str, int],
+        top_k: int = settings.TAG_SUGGEST_LIMIT,
+        max_prefix: int = MAX_PREFIX_LENGTH,
+    ) -> None:
+        self.top_k = top_k
+        self.max_prefix = max_prefix
+        self.counts = dict(counts)
+        self.tags = sorted(self.counts)
+
+        # Visiting tags most used first fills each prefix's list already in order
+        self.top: dict[str, list[str]] = defaultdict(list)
+        for tag in sorted(self.tags, key=self._rank):
+            for prefix in self._prefixes(tag):
+                top = self.top[prefix]
+                if len(top) < top_k:
+                    top.append(tag)
+        self.top = dict(self.top)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def _rank(self, tag: str) -> tuple[int, str]:
+        return -self.counts[tag], tag
+
+    def _prefixes(self, tag: str) -> Iterable[str]:
+        return (tag[:length] for length in range(min(len(tag), self.max_prefix) + 1))
+
+    def _scan(self, prefix: str, limit: int) -> list[str]:
+        start = bisect.bisect_left(self.tags, prefix)
+        end = bisect.bisect_left(self.tags, prefix + _PREFIX_END, start)
+        return heapq.nsmallest(limit, self.tags[start:end], key=self._rank)
+
+    def set(self, tag: str, count: int) -> None:
+        """Set a tag's use count, adding the tag if it is new."""
+        old = self.counts.get(tag)
+        if old == count:
+            return
+        if old is None:
+            bisect.insort(self.tags, tag)
+        self.counts[tag] = count
+        for prefix in self._prefixes(tag):
+            top = self.top.setdefault(prefix, [])
+            if tag in top:
+                if old is not None and count < old and len(top) == self.top_k:
+                    # The tag may have dropped below one that is not listed
+                    self.top[prefix] = self._scan(prefix, self.top_k)
+                else:
+                    top.sort(key=self._rank)
+            elif len(top) < self.top_k or self._rank(tag) < self._rank(top[-1]):
+                top.append(tag)
+                top.sort(key=self._rank)
+                del top[self.top_k :]
+
+    def add(self, tag: str, delta: int = 1) -> None:
+        self.set(tag, self.counts.get(tag, 0) + delta)
+
+    def suggest(self, prefix: str, limit: Optional[int] = None) -> list[tuple[str, int]]:
+        """Return up to ``limit`` tags starting with ``prefix`` and their counts."""
+        limit = min(limit or self.top_k, self.top_k)
+        if len(prefix) <= self.max_prefix:
+            tags = self.top.get(prefix, [])[:limit]
+        else:
+            tags = self._scan(prefix, limit)
+        return [(tag, self.counts[tag]) for tag in tags]
+
+
+class TagAutocomplete:
+    """Keeps a ``TagIndex`` per kind, refreshed incrementally from ``tag_stats``."""
+
+    def __init__(self, refresh_seconds: float = settings.TAG_REFRESH_SECONDS) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._indexes: dict[TagKind, TagIndex] = {}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.rows_applied = 0
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._refreshed_at > self.refresh_seconds
+
+    def index(self, kind: TagKind) -> Optional[TagIndex]:
+        """Return the index for ``kind``, or ``None`` before the first build.
+
+        A stale index is refreshed in the background; callers never wait.
+        """
+        if self._stale() and not self._lock.locked():
+            self._refresh = asyncio.create_task(self.refresh())
+        return self._indexes.get(kind)
+
+    def add(self, kind: TagKind, tags: Iterable[str]) -> None:
+        """Count tags this worker just stored, ahead of the next refresh."""
+        index = self._indexes.get(kind)
+        if index is not None:
+            for tag in tags:
+                index.add(tag)
+
+    async def refresh(self) -> None:
+        """Build the indexes, or apply the ``tag_stats`` rows changed since last time."""
+        async with self._lock:
+            if not self._stale():
+                return
+            try:
+                async with AsyncSessionLocal() as db:
+                    stmt = select(
+                        TagStat.kind, TagStat.tag, TagStat.use_count, TagStat.last_used_at
+                    )
+                    if self._watermark is not None:
+                        since = self._watermark - REFRESH_OVERLAP
+                        stmt = stmt.where(TagStat.last_used_at >= since)
+                    rows = (await db.execute(stmt)).all()
+                if self._watermark is None:
+                    # Precomputing every prefix of every tag is CPU-bound
+                    self._indexes = await asyncio.to_thread(self._build, rows)
+                else:
+                    for kind, tag, use_count, _ in rows:
+                        self._indexes[TagKind(kind)].set(tag, use_count)
+                self._watermark = max(
+                    [row[3] for row in rows] + [self._watermark or datetime(1970, 1, 1)]
+                )
+                self.rows_applied += len(rows)
+            except Exception:
+                logger.exception("Could not refresh the tag autocomplete index")
+            else:
+                self.refreshes += 1
+            self._refreshed_at = time.monotonic()
+
+    @staticmethod
+    def _build(rows: list[Any]) -> dict[TagKind, TagIndex]:
+        counts: dict[TagKind, dict[str, int]] = {kind: {} for kind in TagKind}
+        for kind, tag, use_count, _ in rows:
+            counts[TagKind(kind)][tag] = use_count
+        return {kind: TagIndex(tag_counts) for kind, tag_counts in counts.items()}
+
+    def stats(self) -> dict[str, Any]:
+        """Return index sizes and refresh counters."""
+        return {
+            "tags": {kind.value: len(index) for kind, index in self._indexes.items()},
+            "refreshes": self.refreshes,
+            "rows_applied": self.rows_applied,
+        }
+
+
+tag_autocomplete = TagAutocomplete()
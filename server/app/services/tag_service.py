@@ -0,0 +1,84 @@
+"""Tag service.
+
+``posts.tags`` and ``locations.tags`` are GIN-indexed, so "posts tagged X"
+and "locations with all of these tags" are array containment (``@>``)
+lookups. ``tag_stats`` counts how often each tag was used and is upserted in
+the transaction that stores the tagged row; autocomplete reads it through
+the in-memory ``tag_autocomplete`` index.
+"""
+from datetime import datetime
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.post import Post
+from app.models.tag import TagStat
+from app.schemas.tag import TagKind
+from app.services.tag_index import tag_autocomplete
+
+
+class TagService:
+    """Tag service."""
+
+    @staticmethod
+    async def record(db: AsyncSession, kind: TagKind, tags: Iterable[str]) -> None:
+        """Count a use of each tag; the caller commits."""
+        # Sorted, so concurrent writers lock shared tag rows in the same order
+        tags = sorted(set(tags))
+        if not tags:
+            return
+        now = datetime.utcnow()
+        stmt = insert(TagStat).values(
+            [{"kind": kind.value, "tag": tag, "use_count": 1, "last_used_at": now} for tag in tags]
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TagStat.kind, TagStat.tag],
+                set_={
+                    "use_count": TagStat.use_count + stmt.excluded.use_count,
+                    "last_used_at": stmt.excluded.last_used_at,
+                },
+            )
+        )
+
+    @staticmethod
+    async def suggest(
+        db: AsyncSession, kind: TagKind, prefix: str, limit: int
+    ) -> list[tuple[str, int]]:
+        """Return the most used tags starting with ``prefix``."""
+        index = tag_autocomplete.index(kind)
+        if index is not None:
+            return index.suggest(prefix, limit)
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        result = await db.execute(
+            select(TagStat.tag, TagStat.use_count)
+            .where(TagStat.kind == kind.value, TagStat.tag.like(escaped + "%", escape="\\"))
+            .order_by(TagStat.use_count.desc(), TagStat.tag)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result]
+
+    @staticmethod
+    async def get_tagged_posts(
+        db: AsyncSession,
+        tag: str,
+        before: Optional[tuple[datetime, UUID]] = None,
+        limit: int = 20,
+    ) -> tuple[list[Post], Optional[tuple[datetime, UUID]]]:
+        """Return one page of posts carrying ``tag``, newest first, and the next cursor."""
+        stmt = (
+            select(Post)
+            .where(Post.tags.contains([tag]))
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit + 1)
+        )
+        if before is not None:
+            stmt = stmt.where(tuple_(Post.created_at, Post.id) < tuple_(*before))
+        posts = list((await db.execute(stmt)).scalars().all())
+        if len(posts) <= limit:
+            return posts, None
+        posts = posts[:limit]
+        return posts, (posts[-1].created_at, posts[-1].id)
@@ -0,0 +1,152 @@
+"""Thumbnail rendering in a process pool.
+
+Decoding and resampling a phone photo takes tens of milliseconds of pure
+CPU, which would stall every other request on the event loop and cannot
+run in parallel on threads. ``ThumbnailPool`` sends each image to a pool of
+worker processes instead. Workers are started with ``spawn``, so they do
+not inherit the server's event loop, sockets or threads, and only import
+this module and Pillow.
+
+``render_thumbnails`` decodes once, asks JPEG decoders for a reduced-size
+decode (``Image.draft``) where that is enough for the largest thumbnail,
+and scales each smaller size from the previous one.
+
+A worker that dies mid-render (killed for memory, say) breaks the whole
+executor; the pool then starts a fresh one and tries the image once more.
+"""
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, NamedTuple, Optional, Sequence
+
+from app.core.config import settings
+
+# Decompression-bomb guard: images with more pixels are rejected from their
+# header, before decoding. Pillow only warns below twice its own limit, so
+# render_thumbnails checks the size itself
+MAX_IMAGE_PIXELS = 50_000_000
+
+# Formats accepted for upload; other decoders Pillow ships are never reached
+IMAGE_FORMATS = ("JPEG", "PNG", "WEBP", "GIF")
+
+THUMBNAIL_CONTENT_TYPE = "image/webp"
+THUMBNAIL_QUALITY = 80
+
+
+class InvalidImage(ValueError):
+    """The uploaded bytes are not an image the server can read."""
+
+
+class ThumbnailsUnavailable(RuntimeError):
+    """The worker processes kept dying; the image may be fine."""
+
+
+class Thumbnails(NamedTuple):
+    width: int
+    height: int
+    # Longest-side size -> encoded thumbnail
+    images: dict[int, bytes]
+
+
+def render_thumbnails(data: bytes, sizes: Sequence[int]) -> Thumbnails:
+    """Decode an image and encode a thumbnail no larger than each of ``sizes``."""
+    # Only pool workers decode images; the API process never imports Pillow
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        with Image.open(io.BytesIO(data), formats=IMAGE_FORMATS) as source:
+            width, height = source.size
+            if width * height > MAX_IMAGE_PIXELS:
+                raise InvalidImage(f"{width}x{height} is over {MAX_IMAGE_PIXELS} pixels")
+            largest = max(sizes)
+            source.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(source).convert("RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise InvalidImage(str(exc)) from None
+
+    images = {}
+    for size in sorted(sizes, reverse=True):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+        images[size] = out.getvalue()
+    return Thumbnails(width, height, images)
+
+
+class ThumbnailPool:
+    """Renders thumbnails on worker processes, started on first use."""
+
+    def __init__(
+        self,
+        workers: int = settings.MEDIA_THUMBNAIL_WORKERS,
+        sizes: Sequence[int] = tuple(settings.MEDIA_THUMBNAIL_SIZES),
+    ) -> None:
+        self.workers = workers
+        self.sizes = tuple(sizes)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.rendered = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Drop a broken executor, unless a concurrent render already replaced it."""
+        if self._executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.restarts += 1
+
+    async def render(self, data: bytes, sizes: Optional[Sequence[int]] = None) -> Thumbnails:
+        """Render thumbnails of ``data``.
+
+        Raises ``InvalidImage`` for unreadable input, and ``ThumbnailsUnavailable``
+        if the workers die on two fresh pools in a row.
+        """
+        loop = asyncio.get_running_loop()
+        sizes = tuple(sizes or self.sizes)
+        self.in_flight += 1
+        try:
+            for _ in range(2):
+                pool = self._pool()
+                try:
+                    thumbnails = await loop.run_in_executor(pool, render_thumbnails, data, sizes)
+                    break
+                except BrokenProcessPool:
+                    self._restart(pool)
+            else:
+                raise ThumbnailsUnavailable("thumbnail workers exited while rendering")
+        except InvalidImage:
+            self.rejected += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.rendered += 1
+        return thumbnails
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool size and render counters for this process."""
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "in_flight": self.in_flight,
+            "rendered": self.rendered,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
+
+
+thumbnail_pool = ThumbnailPool()
@@ -0,0 +1,310 @@
+"""Home timelines for the post feed.
+
+Every user's home timeline is a capped Redis sorted set of post ids scored
+by creation time. Creating a post fans its id out to the timelines of the
+author's followers in pipelined batches, so reading a feed page is one
+range read rather than a join of ``posts`` against ``follows``.
+
+Authors with more than ``fanout_limit`` followers are not fanned out;
+their posts only go to the author's own capped sorted set, and followers
+merge those in at read time (pull on read). Which followees to pull is
+cached per reader next to the timeline.
+
+Timelines are a cache. A reader whose timeline metadata has expired gets
+it rebuilt from the database, merged with whatever fan-out already wrote,
+and when Redis is unavailable pages are read from the database directly.
+"""
+import heapq
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.database import AsyncSessionLocal
+from app.models.follow import Follow
+from app.models.post import Post
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+HOME_PREFIX = "timeline:home:"
+META_PREFIX = "timeline:meta:"
+AUTHOR_PREFIX = "timeline:author:"
+
+# (score, post id) pairs, newest first
+Entry = tuple[float, str]
+
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _score(created_at: datetime) -> float:
+    # Microseconds since the epoch stay exact in a double until the year 2255
+    return float((created_at.replace(tzinfo=None) - EPOCH) // MICROSECOND)
+
+
+def _bound(before: Optional[int]) -> str:
+    return f"({before}" if before is not None else "+inf"
+
+
+class Timelines:
+    """Fan-out-on-write home timelines with pull-on-read for large authors."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        redis: Any = None,
+        max_length: int = settings.TIMELINE_MAX_LENGTH,
+        fanout_limit: int = settings.TIMELINE_FANOUT_LIMIT,
+        batch_size: int = settings.TIMELINE_FANOUT_BATCH_SIZE,
+        ttl_seconds: int = settings.TIMELINE_TTL_SECONDS,
+        rebuild_seconds: int = settings.TIMELINE_REBUILD_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self._redis = redis
+        self.max_length = max_length
+        self.fanout_limit = fanout_limit
+        self.batch_size = batch_size
+        self.ttl_seconds = ttl_seconds
+        self.rebuild_seconds = rebuild_seconds
+
+        self.fanouts = 0
+        self.pushed = 0
+        self.reads = 0
+        self.rebuilds = 0
+        self.fallbacks = 0
+
+    @property
+    def redis(self) -> Any:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    async def publish(self, post_id: UUID, author_id: UUID, created_at: datetime) -> int:
+        """Add a new post to its author's and followers' timelines.
+
+        Returns how many follower timelines were written; authors above the
+        fan-out limit are pulled by their followers instead.
+        """
+        score = _score(created_at)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            self._push(pipe, AUTHOR_PREFIX + str(author_id), {str(post_id): score})
+            self._push(pipe, HOME_PREFIX + str(author_id), {str(post_id): score})
+            await pipe.execute()
+
+            async with self.session_factory() as db:
+                followers = await db.scalar(
+                    select(User.follower_count).where(User.id == author_id)
+                )
+                if not followers or followers > self.fanout_limit:
+                    return 0
+                pushed = await self._fan_out(db, author_id, {str(post_id): score})
+        except (RedisError, OSError):
+            # Timelines missing the post are rebuilt once their metadata expires
+            logger.warning("Could not fan out post %s", post_id)
+            return 0
+        self.fanouts += 1
+        self.pushed += pushed
+        return pushed
+
+    async def _fan_out(self, db: AsyncSession, author_id: UUID, entries: dict[str, float]) -> int:
+        """Push ``entries`` to every follower's timeline, one pipeline per batch."""
+        pushed = 0
+        last: Optional[UUID] = None
+        while True:
+            stmt = (
+                select(Follow.follower_id)
+                .where(Follow.followee_id == author_id)
+                .order_by(Follow.follower_id)
+                .limit(self.batch_size)
+            )
+            if last is not None:
+                stmt = stmt.where(Follow.follower_id > last)
+            followers = list(await db.scalars(stmt))
+            if not followers:
+                return pushed
+            pipe = self.redis.pipeline(transaction=False)
+            for follower_id in followers:
+                self._push(pipe, HOME_PREFIX + str(follower_id), entries)
+            await pipe.execute()
+            pushed += len(followers)
+            if len(followers) < self.batch_size:
+                return pushed
+            last = followers[-1]
+
+    def _push(self, pipe: Any, key: str, entries: dict[str, float]) -> None:
+        pipe.zadd(key, entries)
+        pipe.zremrangebyrank(key, 0, -self.max_length - 1)
+        pipe.expire(key, self.ttl_seconds)
+
+    async def invalidate(self, user_id: UUID, drop_entries: bool = False) -> None:
+        """Rebuild a user's timeline on their next read.
+
+        After a follow the rebuild merges the new author's posts in; after an
+        unfollow ``drop_entries`` discards the cached posts as well.
+        """
+        keys = [META_PREFIX + str(user_id)]
+        if drop_entries:
+            keys.append(HOME_PREFIX + str(user_id))
+        try:
+            await self.redis.delete(*keys)
+        except (RedisError, OSError):
+            logger.warning("Could not invalidate the timeline of %s", user_id)
+
+    async def page(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        before: Optional[int] = None,
+        limit: int = 20,
+    ) -> tuple[list[UUID], Optional[int]]:
+        """Return post ids of one feed page, newest first, and the next cursor."""
+        self.reads += 1
+        try:
+            entries = await self._read(db, user_id, before, limit + 1)
+        except (RedisError, OSError):
+            self.fallbacks += 1
+            logger.warning("Timeline unavailable, reading feed of %s from the database", user_id)
+            entries = await self._read_database(db, user_id, before, limit + 1)
+        page = entries[:limit]
+        next_before = int(page[-1][0]) if len(entries) > limit else None
+        return [UUID(post_id) for _, post_id in page], next_before
+
+    async def _read(
+        self, db: AsyncSession, user_id: UUID, before: Optional[int], count: int
+    ) -> list[Entry]:
+        home = HOME_PREFIX + str(user_id)
+        high = _bound(before)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(META_PREFIX + str(user_id))
+        self._range(pipe, home, high, count)
+        pipe.expire(home, self.ttl_seconds)
+        meta, rows, size, _ = await pipe.execute()
+        if meta is None:
+            pull = await self._rebuild(db, user_id)
+            pipe = self.redis.pipeline(transaction=False)
+            rows, size = await self._range(pipe, home, high, count).execute()
+        else:
+            pull = json.loads(meta)
+
+        streams = [(rows, size)]
+        if pull:
+            streams.extend(await self._read_authors(db, pull, before, count))
+        if any(len(rows) < count and size >= self.max_length for rows, size in streams):
+            # The page runs past the oldest post a capped set still holds
+            return await self._read_database(db, user_id, before, count)
+        return self._merge(
+            [[(score, _text(member)) for member, score in rows] for rows, _ in streams], count
+        )
+
+    def _range(self, pipe: Any, key: str, high: str, count: int) -> Any:
+        """Queue a page read and the size of the set it comes from."""
+        pipe.zrevrangebyscore(key, high, "-inf", start=0, num=count, withscores=True)
+        return pipe.zcard(key)
+
+    async def _read_authors(
+        self, db: AsyncSession, author_ids: list[str], before: Optional[int], count: int
+    ) -> list[tuple[list, int]]:
+        """Read the recent posts of pulled authors, loading any that expired."""
+        high = _bound(before)
+        pipe = self.redis.pipeline(transaction=False)
+        for author_id in author_ids:
+            self._range(pipe, AUTHOR_PREFIX + author_id, high, count)
+        results = await pipe.execute()
+
+        streams = []
+        for author_id, rows, size in zip(author_ids, results[::2], results[1::2]):
+            if not size:
+                loaded = await self._load_author(db, UUID(author_id))
+                rows = [row for row in loaded if before is None or row[1] < before][:count]
+                size = len(loaded)
+            streams.append((rows, size))
+        return streams
+
+    async def _load_author(self, db: AsyncSession, author_id: UUID) -> list[tuple[str, float]]:
+        result = await db.execute(
+            select(Post.id, Post.created_at)
+            .where(Post.user_id == author_id)
+            .order_by(Post.created_at.desc())
+            .limit(self.max_length)
+        )
+        entries = {str(post_id): _score(created_at) for post_id, created_at in result}
+        if entries:
+            pipe = self.redis.pipeline(transaction=False)
+            self._push(pipe, AUTHOR_PREFIX + str(author_id), entries)
+            await pipe.execute()
+        return list(entries.items())
+
+    async def _rebuild(self, db: AsyncSession, user_id: UUID) -> list[str]:
+        """Refill a home timeline from the database; return the authors to pull."""
+        self.rebuilds += 1
+        pull = [
+            str(author_id)
+            for author_id in await db.scalars(
+                select(Follow.followee_id)
+                .join(User, User.id == Follow.followee_id)
+                .where(Follow.follower_id == user_id, User.follower_count > self.fanout_limit)
+            )
+        ]
+        entries = await self._read_database(db, user_id, None, self.max_length)
+        pipe = self.redis.pipeline(transaction=False)
+        if entries:
+            # Merged with, not replacing, entries fan-out wrote meanwhile
+            self._push(pipe, HOME_PREFIX + str(user_id), {post: score for score, post in entries})
+        pipe.set(META_PREFIX + str(user_id), json.dumps(pull), ex=self.rebuild_seconds)
+        await pipe.execute()
+        return pull
+
+    async def _read_database(
+        self, db: AsyncSession, user_id: UUID, before: Optional[int], count: int
+    ) -> list[Entry]:
+        """The feed query the timelines replace: posts by followees and the user."""
+        followees = select(Follow.followee_id).where(Follow.follower_id == user_id)
+        stmt = (
+            select(Post.id, Post.created_at)
+            .where(or_(Post.user_id == user_id, Post.user_id.in_(followees)))
+            .order_by(Post.created_at.desc())
+            .limit(count)
+        )
+        if before is not None:
+            stmt = stmt.where(Post.created_at < EPOCH + before * MICROSECOND)
+        result = await db.execute(stmt)
+        return [(_score(created_at), str(post_id)) for post_id, created_at in result]
+
+    @staticmethod
+    def _merge(streams: list[list[Entry]], count: int) -> list[Entry]:
+        merged: list[Entry] = []
+        seen = set()
+        for entry in heapq.merge(*streams, reverse=True):
+            if entry[1] not in seen:
+                seen.add(entry[1])
+                merged.append(entry)
+                if len(merged) == count:
+                    break
+        return merged
+
+    def stats(self) -> dict[str, int]:
+        """Return fan-out and read counters for this process."""
+        return {
+            "fanouts": self.fanouts,
+            "timelines_written": self.pushed,
+            "reads": self.reads,
+            "rebuilds": self.rebuilds,
+            "database_fallbacks": self.fallbacks,
+        }
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+timelines = Timelines()
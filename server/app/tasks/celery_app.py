@@ -0,0 +1,82 @@
+"""Celery application.
+
+Run a worker with the beat scheduler embedded (one small process is enough)::
+
+    celery -A app.tasks.celery_app worker -B -l info
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+from celery import Celery
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.redis import create_redis
+from app.database import make_engine
+
+T = TypeVar("T")
+
+celery_app = Celery(
+    "doggy_meetup",
+    broker=settings.REDIS_URL,
+    include=[
+        "app.tasks.session_tasks",
+        "app.tasks.notification_tasks",
+        "app.tasks.counter_tasks",
+    ],
+)
+
+celery_app.conf.update(
+    task_ignore_result=True,
+    task_time_limit=max(60, int(settings.SESSION_SWEEP_INTERVAL_SECONDS)),
+    beat_schedule={
+        "advance-sessions": {
+            "task": "app.tasks.session_tasks.advance_sessions",
+            "schedule": settings.SESSION_SCHEDULER_TICK_SECONDS,
+            # Ticks are idempotent; a stale one is dropped rather than queued up
+            "options": {"expires": settings.SESSION_SCHEDULER_TICK_SECONDS},
+        },
+        "sweep-sessions": {
+            "task": "app.tasks.session_tasks.sweep_sessions",
+            "schedule": settings.SESSION_SWEEP_INTERVAL_SECONDS,
+        },
+        "send-session-reminders": {
+            "task": "app.tasks.notification_tasks.send_session_reminders",
+            "schedule": 60.0,
+            "options": {"expires": 60.0},
+        },
+        "flush-post-counters": {
+            "task": "app.tasks.counter_tasks.flush_post_counters",
+            "schedule": settings.COUNTER_FLUSH_SECONDS,
+            "options": {"expires": settings.COUNTER_FLUSH_SECONDS},
+        },
+        "reconcile-post-counters": {
+            "task": "app.tasks.counter_tasks.reconcile_post_counters",
+            "schedule": settings.COUNTER_RECONCILE_SECONDS,
+        },
+    },
+)
+
+
+def run_async(
+    body: Callable[[async_sessionmaker[AsyncSession], Any], Awaitable[T]],
+) -> T:
+    """Run an async task body on a fresh event loop.
+
+    Each run gets its own unpooled engine and Redis client, because pooled
+    connections are bound to the event loop that created them. The engine
+    otherwise has the app's settings: statement cache size and metrics.
+    """
+
+    async def main() -> T:
+        engine = make_engine(settings.DATABASE_URL, poolclass=NullPool)
+        redis = create_redis()
+        try:
+            factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            return await body(factory, redis)
+        finally:
+            await redis.aclose()
+            await engine.dispose()
+
+    return asyncio.run(main())
@@ -0,0 +1,18 @@
+"""Post counter tasks."""
+from typing import Optional
+
+from app.core.config import settings
+from app.services.counters import PostCounters
+from app.tasks.celery_app import celery_app, run_async
+
+
+@celery_app.task
+def flush_post_counters() -> Optional[int]:
+    """Apply pending like and comment deltas to the posts table."""
+    return run_async(lambda factory, redis: PostCounters(factory, redis).flush())
+
+
+@celery_app.task(time_limit=int(settings.COUNTER_RECONCILE_SECONDS))
+def reconcile_post_counters() -> Optional[int]:
+    """Recount likes and comments and fix posts whose counts drifted."""
+    return run_async(lambda factory, redis: PostCounters(factory, redis).reconcile())
@@ -0,0 +1,14 @@
+"""Notification tasks."""
+from app.services.notification_service import NotificationService
+from app.tasks.celery_app import celery_app, run_async
+
+
+async def _send_reminders(factory, redis) -> int:
+    async with factory() as db:
+        return await NotificationService.send_due_reminders(db)
+
+
+@celery_app.task
+def send_session_reminders() -> int:
+    """Push a reminder for every session starting within the reminder window."""
+    return run_async(_send_reminders)
@@ -0,0 +1,15 @@
+"""Session lifecycle tasks."""
+from app.services.session_scheduler import SessionScheduler
+from app.tasks.celery_app import celery_app, run_async
+
+
+@celery_app.task
+def advance_sessions() -> int:
+    """Apply the transitions that are due in the delay queue."""
+    return run_async(lambda factory, redis: SessionScheduler(factory, redis).advance())
+
+
+@celery_app.task
+def sweep_sessions() -> int:
+    """Catch up on overdue sessions from the database and refill the queue."""
+    return run_async(lambda factory, redis: SessionScheduler(factory, redis).sweep())
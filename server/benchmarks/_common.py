@@ -0,0 +1,94 @@
+"""Helpers shared by the benchmark scripts.
+
+Latency summaries, the command-line and environment setup that points a
+script at a throwaway database, and seeding of users in batched inserts.
+Nothing here imports ``app`` at module level: scripts configure the app
+through the environment, which has to happen before its settings are read.
+"""
+import argparse
+import math
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Iterator, Sequence
+
+# Rows per multi-row INSERT while seeding
+SEED_BATCH_SIZE = 5_000
+
+
+def percentile(samples: Sequence[float], share: float) -> float:
+    """Nearest-rank percentile: the smallest sample with ``share`` of them at or below it."""
+    if not samples:
+        raise ValueError("no samples")
+    ordered = sorted(samples)
+    rank = math.ceil(share * len(ordered))
+    return ordered[min(len(ordered), max(1, rank)) - 1]
+
+
+def trimmed_mean(samples: Sequence[float], cut: float = 0.1) -> float:
+    """Mean of the samples left after dropping ``cut`` of them at each end."""
+    if not samples:
+        raise ValueError("no samples")
+    ordered = sorted(samples)
+    drop = min(int(len(ordered) * cut), (len(ordered) - 1) // 2)
+    kept = ordered[drop : len(ordered) - drop]
+    return sum(kept) / len(kept)
+
+
+def summarize(samples: Sequence[float], digits: int = 2) -> str:
+    """``p50=… p95=… p99=… max=…`` for a list of latencies."""
+    return " ".join(
+        f"{name}={percentile(samples, share):.{digits}f}"
+        for name, share in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+    )
+
+
+def make_parser(doc: str, database: bool = False) -> argparse.ArgumentParser:
+    """Argument parser described by the first line of a script's docstring."""
+    parser = argparse.ArgumentParser(description=doc.splitlines()[0])
+    if database:
+        parser.add_argument("--database-url", required=True)
+    return parser
+
+
+def configure_app(database_url: str, redis_url: str = "memory://", **settings: Any) -> None:
+    """Point the app's settings at the benchmark database and Redis.
+
+    Must run before the first ``app`` import; extra keyword arguments set
+    further settings by name.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["REDIS_URL"] = redis_url
+    for name, value in settings.items():
+        os.environ[name] = str(value)
+
+
+async def reset_schema(engine: Any) -> None:
+    """Drop and recreate every table on ``engine``."""
+    from app.database import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def batched(rows: list, size: int = SEED_BATCH_SIZE) -> Iterator[list]:
+    """Consecutive slices of at most ``size`` rows."""
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+async def insert_rows(db: Any, table: Any, rows: list[dict]) -> None:
+    """Insert ``rows`` into ``table`` with one multi-row INSERT per batch."""
+    from sqlalchemy import insert
+
+    for batch in batched(rows):
+        await db.execute(insert(table), batch)
+
+
+def user_rows(count: int, now: datetime, start: int = 0) -> list[dict]:
+    """Rows for ``count`` users with distinct phone numbers from index ``start``."""
+    return [
+        {"id": uuid.uuid4(), "nickname": f"用户{i}", "phone": f"1{i:010d}", "created_at": now}
+        for i in range(start, start + count)
+    ]
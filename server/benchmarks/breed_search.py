@@ -0,0 +1,113 @@
+"""Benchmark breed autocomplete from the in-memory catalogue index.
+
+Generates ``--queries`` inputs the way people type breeds: prefixes of
+Chinese names and aliases, of their pinyin and pinyin initials, of English
+names, pinyin mixed with characters ("jin毛") and English words with one
+typo. It times ``BreedIndex.search`` against a scan that only matches
+substrings of the Chinese and English spellings, reports how often the
+intended breed is in the top five for each, and checks that every
+catalogue spelling normalizes to its breed. No database is needed.
+
+Usage (from ``server/``)::
+
+    python -m benchmarks.breed_search --queries 20000
+"""
+import argparse
+import random
+import sys
+import time
+
+from app.core.breeds import BREEDS, Breed, canonical_breed, fold, pinyin_initials, to_pinyin
+from app.services.breed_catalogue import BreedIndex
+from benchmarks._common import make_parser, summarize
+
+LATIN = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _typo(rng: random.Random, word: str) -> str:
+    position = rng.randrange(len(word))
+    return word[:position] + rng.choice(LATIN) + word[position + 1 :]
+
+
+def _query(rng: random.Random, breed: Breed) -> str:
+    text = rng.choice((breed.name, *breed.aliases))
+    kind = rng.randrange(5)
+    if kind == 0:
+        return text[: rng.randint(1, len(text))]
+    if kind == 1:
+        pinyin = to_pinyin(text)
+        return pinyin[: rng.randint(2, len(pinyin))]
+    if kind == 2:
+        return pinyin_initials(text) or text
+    if kind == 3:
+        # Pinyin for the first character, then the rest as typed
+        return to_pinyin(text[0]) + text[1:]
+    word = rng.choice(breed.en.split())
+    return _typo(rng, word.lower()) if len(word) > 4 else word.lower()
+
+
+def _scan(query: str, limit: int) -> list[Breed]:
+    folded = fold(query)
+    return [
+        breed
+        for breed in BREEDS
+        if any(folded in fold(text) for text in (breed.name, breed.en, *breed.aliases))
+    ][:limit]
+
+
+def run(args: argparse.Namespace) -> bool:
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    index = BreedIndex()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Popular breeds are searched more often
+    weights = [1 / (rank + 1) for rank in range(len(BREEDS))]
+    wanted = rng.choices(BREEDS, weights=weights, k=args.queries)
+    queries = [_query(rng, breed) for breed in wanted]
+
+    index_ms, index_hits = [], 0
+    for breed, query in zip(wanted, queries):
+        start = time.perf_counter()
+        matches = index.search(query, args.limit)
+        index_ms.append((time.perf_counter() - start) * 1000)
+        index_hits += breed in [match.breed for match in matches[:5]]
+
+    scan_ms, scan_hits = [], 0
+    for breed, query in zip(wanted, queries):
+        start = time.perf_counter()
+        found = _scan(query, args.limit)
+        scan_ms.append((time.perf_counter() - start) * 1000)
+        scan_hits += breed in found[:5]
+
+    spellings = [
+        (spelling, breed.name)
+        for breed in BREEDS
+        for text in (breed.name, breed.en, *breed.aliases)
+        for spelling in (text, text.upper(), f" {text} ", to_pinyin(text))
+    ]
+    mismatches = sum(canonical_breed(spelling) != name for spelling, name in spellings)
+
+    index_rate = index_hits / args.queries
+    print(f"breeds={len(BREEDS)} keys={len(index)} build={build_ms:.1f} ms")
+    print(f"index search ms: {summarize(index_ms, 4)}  top-5 hit rate {index_rate:.1%}")
+    print(
+        f"substring scan ms: {summarize(scan_ms, 4)}"
+        f"  top-5 hit rate {scan_hits / args.queries:.1%}"
+    )
+    print(f"checked {len(spellings)} spellings, mismatches: {mismatches}")
+    return mismatches == 0 and index_rate >= args.min_hit_rate
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--min-hit-rate", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    if not run(parser.parse_args()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
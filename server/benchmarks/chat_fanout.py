@@ -0,0 +1,133 @@
+"""Load test for the chat hub's cross-worker fan-out.
+
+Simulates several worker processes (one ``ChatHub`` each) sharing an
+in-process pub/sub broker, with thousands of fake sockets per group. A small
+share of the sockets are slow and never finish a send; the run reports how
+quickly each message reaches every healthy socket and how many slow
+consumers were disconnected.
+
+Usage (from ``server/``)::
+
+    python -m benchmarks.chat_fanout --workers 4 --groups 2 --sockets 5000 --rate 5
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.core.redis import MemoryRedis
+from app.services.chat_hub import ChatHub
+from benchmarks._common import make_parser, summarize
+
+
+class FakeSocket:
+    """Socket that records deliveries; slow sockets block on every send."""
+
+    def __init__(self, tracker: "DeliveryTracker", slow: bool) -> None:
+        self.tracker = tracker
+        self.slow = slow
+        self.closed_with = None
+
+    async def send_text(self, data: str) -> None:
+        if self.slow:
+            await asyncio.sleep(3600)
+        self.tracker.record(data)
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed_with = code
+
+
+class DeliveryTracker:
+    """Tracks when each message has reached all healthy sockets of its group."""
+
+    def __init__(self, expected: int) -> None:
+        self.expected = expected
+        self.sent_at: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        self.latencies: list[float] = []
+        self.deliveries = 0
+        self.done = asyncio.Event()
+        self.pending = 0
+
+    def start(self, payload: str) -> None:
+        self.sent_at[payload] = time.perf_counter()
+        self.counts[payload] = 0
+        self.pending += 1
+
+    def record(self, payload: str) -> None:
+        self.deliveries += 1
+        count = self.counts[payload] = self.counts[payload] + 1
+        if count == self.expected:
+            self.latencies.append((time.perf_counter() - self.sent_at[payload]) * 1000)
+            self.pending -= 1
+            if self.pending == 0:
+                self.done.set()
+
+
+async def run(args: argparse.Namespace) -> None:
+    broker = MemoryRedis()
+    hubs = [
+        ChatHub(redis=broker, queue_size=args.queue_size, send_timeout=args.send_timeout)
+        for _ in range(args.workers)
+    ]
+    slow_every = int(1 / args.slow_ratio) if args.slow_ratio else 0
+    healthy_per_group = args.sockets - (args.sockets // slow_every if slow_every else 0)
+    trackers = {}
+
+    connect_start = time.perf_counter()
+    for group in range(args.groups):
+        group_id = f"group-{group}"
+        tracker = trackers[group_id] = DeliveryTracker(healthy_per_group)
+        for index in range(args.sockets):
+            slow = bool(slow_every) and index % slow_every == slow_every - 1
+            hub = hubs[index % args.workers]
+            connection = hub.connect(FakeSocket(tracker, slow), f"user-{group}-{index}")
+            await hub.join(connection, group_id)
+    connect_ms = (time.perf_counter() - connect_start) * 1000
+
+    publish_start = time.perf_counter()
+    for seq in range(args.messages):
+        for group_id, tracker in trackers.items():
+            event = {"type": "new_message", "group_id": group_id, "seq": seq}
+            tracker.start(json.dumps(event, default=str))
+            await hubs[seq % args.workers].publish(group_id, event)
+        # Pace publishing; 0 publishes as fast as possible (burst test)
+        await asyncio.sleep(1 / args.rate if args.rate else 0)
+
+    await asyncio.wait_for(
+        asyncio.gather(*(tracker.done.wait() for tracker in trackers.values())),
+        timeout=args.timeout,
+    )
+    elapsed = time.perf_counter() - publish_start
+
+    latencies = [ms for tracker in trackers.values() for ms in tracker.latencies]
+    deliveries = sum(tracker.deliveries for tracker in trackers.values())
+    slow_consumers = sum(hub.slow_consumers for hub in hubs)
+
+    print(f"workers={args.workers} groups={args.groups} sockets/group={args.sockets}")
+    print(f"connect+join: {connect_ms:.0f} ms")
+    print(f"messages: {args.messages * args.groups}, deliveries: {deliveries}")
+    print(f"throughput: {deliveries / elapsed:,.0f} deliveries/s")
+    print(f"fan-out latency ms: {summarize(latencies, 1)}")
+    print(f"slow consumers disconnected: {slow_consumers}")
+
+    for hub in hubs:
+        await hub.close()
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--groups", type=int, default=2)
+    parser.add_argument("--sockets", type=int, default=5000, help="sockets per group")
+    parser.add_argument("--messages", type=int, default=200, help="messages per group")
+    parser.add_argument("--rate", type=float, default=20.0, help="messages/s per group")
+    parser.add_argument("--slow-ratio", type=float, default=0.01)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--send-timeout", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
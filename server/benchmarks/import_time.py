@@ -0,0 +1,192 @@
+"""Cold-start budget: import time of the app, its models and the Celery app.
+
+Each target runs ``--runs`` times in a fresh interpreter, which times the
+import (or ``create_app()``) and lists the modules it loaded. The script
+reports the median time against the target's budget and fails when:
+
+- the median exceeds the budget times ``--budget-scale`` (raise the scale
+  on slow machines rather than editing the budgets);
+- a heavy optional dependency is loaded by a target that must not need it.
+  The API, Alembic and scripts must not pull in NumPy, asyncpg, boto3,
+  Firebase, Pillow or Celery just by importing; they load where used.
+
+One extra run per target under ``-X importtime`` lists the top-level
+packages that cost the most, which is where to look after a regression.
+``--output`` and ``--baseline`` work as in ``benchmarks.api_load``. No
+database or Redis server is needed: nothing may connect at import.
+
+Usage (from ``server/``)::
+
+    python -m benchmarks.import_time --runs 7 --output imports.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from benchmarks._common import make_parser
+
+HEAVY = ("numpy", "asyncpg", "boto3", "botocore", "firebase_admin", "PIL", "celery")
+
+# name -> (statement, budget in ms, heavy modules it is allowed to load)
+TARGETS = {
+    "app.database": ("import app.database", 1_000, ()),
+    "app.models": ("import app.models", 1_200, ()),
+    "app.main": ("import app.main", 1_000, ()),
+    "create_app": ("from app.main import create_app; create_app()", 2_000, ()),
+    "app.tasks.celery_app": ("import app.tasks.celery_app", 1_600, ("celery",)),
+}
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(sys.modules)}}))
+"""
+
+
+@dataclass
+class Result:
+    target: str
+    median_ms: float
+    min_ms: float
+    budget_ms: float
+    forbidden: list[str] = field(default_factory=list)
+
+
+def _child(statement: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD.format(statement=statement)]
+    return subprocess.run(command, capture_output=True, text=True, check=True)
+
+
+def _top_packages(stderr: str, limit: int) -> list[tuple[str, float]]:
+    """Sum ``-X importtime`` self times (µs) by top-level package."""
+    totals: Counter = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us)
+    return [(name, us / 1000) for name, us in totals.most_common(limit)]
+
+
+def measure(name: str, runs: int, scale: float, top: int) -> Result:
+    statement, budget, allowed = TARGETS[name]
+    timings = []
+    loaded: set[str] = set()
+    for _ in range(runs):
+        report = json.loads(_child(statement).stdout.splitlines()[-1])
+        timings.append(report["ms"])
+        loaded.update(module.split(".")[0] for module in report["modules"])
+    result = Result(
+        target=name,
+        median_ms=round(statistics.median(timings), 1),
+        min_ms=round(min(timings), 1),
+        budget_ms=budget * scale,
+        forbidden=sorted(module for module in HEAVY if module in loaded and module not in allowed),
+    )
+    breakdown = _top_packages(_child(statement, importtime=True).stderr, top)
+    print(
+        f"{name:<22} median {result.median_ms:7.1f} ms  min {result.min_ms:7.1f} ms"
+        f"  budget {result.budget_ms:7.0f} ms"
+        + (f"  loads {', '.join(result.forbidden)}" if result.forbidden else "")
+    )
+    print("    " + "  ".join(f"{package} {ms:.0f}" for package, ms in breakdown))
+    return result
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _regressions(results: list[Result], baseline: dict, limit: float) -> list[str]:
+    before = {entry["target"]: entry for entry in baseline["targets"]}
+    found = []
+    for result in results:
+        old = before.get(result.target)
+        if old is None:
+            continue
+        change = result.median_ms / old["median_ms"] - 1
+        print(
+            f"{result.target:<22} {old['median_ms']:>7.1f} -> {result.median_ms:>7.1f} ms"
+            f" ({change:+.0%})"
+        )
+        if change > limit:
+            found.append(result.target)
+    return found
+
+
+def run(args: argparse.Namespace) -> bool:
+    print("median / min import time; below it, self time (ms) of the costliest packages")
+    results = [
+        measure(name, args.runs, args.budget_scale, args.top)
+        for name in args.target or TARGETS
+    ]
+
+    report = {
+        "commit": _commit(),
+        "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parameters": {
+            key: value for key, value in vars(args).items() if key not in ("output", "baseline")
+        },
+        "targets": [asdict(result) for result in results],
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+        print(f"wrote {args.output}")
+
+    ok = True
+    for result in results:
+        if result.median_ms > result.budget_ms:
+            print(f"{result.target}: over budget")
+            ok = False
+        if result.forbidden:
+            print(f"{result.target}: loads {', '.join(result.forbidden)} at import")
+            ok = False
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        print(f"compared with {args.baseline} (commit {baseline.get('commit')}):")
+        regressed = _regressions(results, baseline, args.max_regression)
+        if regressed:
+            print(f"regressed beyond {args.max_regression:.0%}: {', '.join(regressed)}")
+            ok = False
+    return ok
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--target", action="append", choices=list(TARGETS), help="repeat to pick several"
+    )
+    parser.add_argument("--budget-scale", type=float, default=1.0)
+    parser.add_argument("--top", type=int, default=6)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    if not run(args):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Micro-benchmark of request and query instrumentation overhead.
+
+Serves the same route from four in-process FastAPI apps: plain, with only
+``MetricsMiddleware``, with only an engine instrumented by
+``Metrics.instrument_engine``, and with both. Each request runs
+``--queries`` statements against an in-memory SQLite engine. Each
+statement waits ``--rtt-ms`` to stand in for the network round trip to
+Postgres. The request then returns a small JSON body.
+
+Requests go to the apps in ``--rounds`` short rounds, in a rotating order,
+so drift and position affect every app alike. Each round yields one median
+latency and one CPU time per request per app. The figures compared are the
+trimmed means of those per-round values, which drops the rounds a GC pause
+or a noisy neighbour landed in.
+
+The script reports the latency and CPU time per request of each app. The
+middleware's added CPU is charged per request and the engine hooks' added
+CPU per statement, each measured on its own. It checks that every request
+and statement was counted. It fails when the latency overhead of the fully
+instrumented app exceeds ``--max-overhead``. SQLite statements cost almost
+no CPU, so the relative CPU figure overstates what the hooks cost next to
+real asyncpg queries; the per-statement figure is the one to watch. No
+database server is needed.
+
+Usage (from ``server/``)::
+
+    python -m benchmarks.instrumentation_overhead --queries 5 --rtt-ms 0.5 --requests 5000
+"""
+import asyncio
+import itertools
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import Metrics, MetricsMiddleware
+from benchmarks._common import make_parser, trimmed_mean
+
+# Share of rounds dropped at each end before averaging
+TRIM = 0.1
+
+
+def _app(queries: int, rtt: float, middleware: Metrics | None, hooks: Metrics | None) -> FastAPI:
+    engine = create_engine("sqlite://")
+    if hooks is not None:
+        hooks.instrument_engine(engine)
+    app = FastAPI()
+    if middleware is not None:
+        app.add_middleware(MetricsMiddleware, registry=middleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        total = 0
+        with engine.connect() as conn:
+            for n in range(queries):
+                total += conn.execute(text("SELECT :a + :b"), {"a": item_id, "b": n}).scalar()
+                await asyncio.sleep(rtt)
+        return {"id": item_id, "total": total}
+
+    return app
+
+
+async def _drive(app: FastAPI, requests: int) -> tuple[list[float], float]:
+    """Return per-request latencies and the CPU time of the whole batch."""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.process_time()
+        for number in range(requests):
+            began = time.perf_counter()
+            response = await client.get(f"/items/{number}")
+            latencies.append(time.perf_counter() - began)
+            response.raise_for_status()
+        return latencies, time.process_time() - started
+
+
+async def run(
+    queries: int, rtt_ms: float, requests: int, rounds: int, max_overhead: float
+) -> bool:
+    # Every request repeats its statement; keep the N+1 check quiet
+    metrics = {
+        name: Metrics(n_plus_one_threshold=queries + 1)
+        for name in ("middleware", "hooks", "instrumented")
+    }
+    rtt = rtt_ms / 1000
+    apps = {
+        "plain": _app(queries, rtt, None, None),
+        "middleware": _app(queries, rtt, metrics["middleware"], None),
+        "hooks": _app(queries, rtt, None, metrics["hooks"]),
+        "instrumented": _app(queries, rtt, metrics["instrumented"], metrics["instrumented"]),
+    }
+    for app in apps.values():
+        await _drive(app, 200)
+    warmup = {
+        name: (sum(registry.requests.values()), registry.queries)
+        for name, registry in metrics.items()
+    }
+
+    latency: dict[str, list[float]] = {name: [] for name in apps}
+    cpu: dict[str, list[float]] = {name: [] for name in apps}
+    per_round = max(requests // rounds, 1)
+    names = list(apps)
+    for number in range(rounds):
+        shift = number % len(names)
+        for name in itertools.chain(names[shift:], names[:shift]):
+            batch, seconds = await _drive(apps[name], per_round)
+            latency[name].append(statistics.median(batch))
+            cpu[name].append(seconds / per_round)
+
+    typical = {name: trimmed_mean(values, TRIM) for name, values in latency.items()}
+    cpu_per_request = {name: trimmed_mean(values, TRIM) for name, values in cpu.items()}
+    for name in apps:
+        print(
+            f"{name:<13} median {typical[name] * 1000:7.3f} ms"
+            f" (best round {min(latency[name]) * 1000:7.3f} ms)"
+            f"  {cpu_per_request[name] * 1e6:8.1f} µs CPU per request"
+        )
+    middleware_cost = cpu_per_request["middleware"] - cpu_per_request["plain"]
+    hook_cost = (cpu_per_request["hooks"] - cpu_per_request["plain"]) / max(queries, 1)
+    total_cost = cpu_per_request["instrumented"] - cpu_per_request["plain"]
+    print(
+        f"added CPU: middleware {middleware_cost * 1e6:.1f} µs per request,"
+        f" engine hooks {hook_cost * 1e6:.1f} µs per statement,"
+        f" both {total_cost * 1e6:.1f} µs per request"
+    )
+    overhead = typical["instrumented"] / typical["plain"] - 1
+    print(
+        f"latency overhead: {overhead:+.1%}"
+        f" ({queries} statements per request, {rtt_ms} ms round trip;"
+        f" trimmed mean of {rounds} round medians of {per_round} requests)"
+    )
+
+    done = per_round * rounds
+    ok = True
+    for name, registry in metrics.items():
+        counted = sum(registry.requests.values()) - warmup[name][0]
+        statements = registry.queries - warmup[name][1]
+        expected = (
+            done if name != "hooks" else 0,
+            done * queries if name != "middleware" else 0,
+        )
+        matched = (counted, statements) == expected
+        ok = ok and matched
+        print(
+            f"{name:<13} counted {counted} requests and {statements} statements"
+            f" (expected {expected[0]} and {expected[1]}): {'ok' if matched else 'MISMATCH'}"
+        )
+    if overhead > max_overhead:
+        print(f"overhead above {max_overhead:.0%}")
+        ok = False
+    return ok
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--max-overhead", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if not asyncio.run(
+        run(args.queries, args.rtt_ms, args.requests, args.rounds, args.max_overhead)
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
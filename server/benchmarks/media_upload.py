@@ -0,0 +1,169 @@
+"""Benchmark streamed uploads and process-pool thumbnailing.
+
+Streams ``--uploads`` concurrent uploads of ``--size-mb`` each through
+``LocalMediaStorage.write`` in 64 KiB chunks, as the upload routes receive
+them, and compares peak Python memory with joining each body before writing
+it. It then renders thumbnails of ``--images`` generated photos inline on
+the event loop and on a ``ThumbnailPool`` of ``--workers`` processes,
+reporting throughput and the worst event-loop stall seen by a 10 ms ticker.
+Every stored file and thumbnail is checked. No database is needed.
+
+Usage (from ``server/``)::
+
+    python -m benchmarks.media_upload --uploads 32 --size-mb 8 --images 48 --workers 4
+"""
+import argparse
+import asyncio
+import io
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import AsyncIterator, Awaitable, Callable
+
+from PIL import Image
+
+from app.core.config import settings
+from app.services.media_storage import LocalMediaStorage
+from app.services.thumbnails import ThumbnailPool, render_thumbnails
+from benchmarks._common import make_parser
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def _body(size: int) -> AsyncIterator[bytes]:
+    chunk = b"\xab" * CHUNK_SIZE
+    sent = 0
+    while sent < size:
+        piece = chunk[: min(CHUNK_SIZE, size - sent)]
+        sent += len(piece)
+        # Hand control back like a socket read would
+        await asyncio.sleep(0)
+        yield piece
+
+
+async def _buffered(storage: LocalMediaStorage, key: str, size: int) -> int:
+    data = b"".join([chunk async for chunk in _body(size)])
+    await storage.put(key, data, "image/jpeg")
+    return len(data)
+
+
+async def _streamed(storage: LocalMediaStorage, key: str, size: int) -> int:
+    return await storage.write(key, _body(size), "image/jpeg", size)
+
+
+async def _uploads(
+    upload: Callable[[LocalMediaStorage, str, int], Awaitable[int]],
+    storage: LocalMediaStorage,
+    prefix: str,
+    args: argparse.Namespace,
+) -> tuple[float, float]:
+    size = int(args.size_mb * 1024 * 1024)
+    tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(upload(storage, f"{prefix}/{number}.jpg", size) for number in range(args.uploads))
+    )
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024
+
+
+def _photo(rng: random.Random) -> bytes:
+    width, height = rng.choice(((4032, 3024), (3024, 4032), (1920, 1080)))
+    image = Image.effect_noise((width // 8, height // 8), 64).resize((width, height)).convert("RGB")
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+async def _stall(work: Awaitable[list]) -> tuple[list, float]:
+    """Run ``work`` while a 10 ms ticker records the longest loop stall."""
+    worst = 0.0
+    done = asyncio.Event()
+
+    async def tick() -> None:
+        nonlocal worst
+        while not done.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst = max(worst, time.perf_counter() - before - 0.01)
+
+    ticker = asyncio.create_task(tick())
+    try:
+        return await work, worst * 1000
+    finally:
+        done.set()
+        await ticker
+
+
+async def _inline(photos: list[bytes], sizes: tuple[int, ...]) -> list:
+    results = []
+    for photo in photos:
+        results.append(render_thumbnails(photo, sizes))
+        await asyncio.sleep(0)
+    return results
+
+
+async def run(args: argparse.Namespace) -> bool:
+    ok = True
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalMediaStorage(root)
+        expected = int(args.size_mb * 1024 * 1024)
+        for name, upload in (("buffered", _buffered), ("streamed", _streamed)):
+            seconds, peak_mb = await _uploads(upload, storage, name, args)
+            sizes = [await storage.size(f"{name}/{n}.jpg") for n in range(args.uploads)]
+            ok &= all(size == expected for size in sizes)
+            total_mb = args.uploads * args.size_mb
+            print(
+                f"{name}: {args.uploads} x {args.size_mb} MB in {seconds:.2f} s"
+                f" ({total_mb / seconds:.0f} MB/s), peak Python memory {peak_mb:.1f} MB"
+            )
+
+    rng = random.Random(args.seed)
+    photos = [_photo(rng) for _ in range(args.images)]
+    sizes = tuple(settings.MEDIA_THUMBNAIL_SIZES)
+    pool = ThumbnailPool(workers=args.workers, sizes=sizes)
+    # Start the workers outside the timing
+    await pool.render(photos[0])
+
+    start = time.perf_counter()
+    inline, inline_stall = await _stall(_inline(photos, sizes))
+    inline_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    pooled, pooled_stall = await _stall(asyncio.gather(*(pool.render(p) for p in photos)))
+    pooled_seconds = time.perf_counter() - start
+    pool.shutdown()
+
+    for result in (*inline, *pooled):
+        for side, data in result.images.items():
+            ok &= max(Image.open(io.BytesIO(data)).size) <= side
+    ok &= [r.images.keys() for r in inline] == [r.images.keys() for r in pooled]
+
+    print(
+        f"inline thumbnails: {args.images / inline_seconds:.1f} images/s,"
+        f" worst loop stall {inline_stall:.0f} ms"
+    )
+    print(
+        f"pool of {args.workers}: {args.images / pooled_seconds:.1f} images/s,"
+        f" worst loop stall {pooled_stall:.0f} ms"
+    )
+    print(f"checks {'passed' if ok else 'FAILED'}")
+    return ok
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--uploads", type=int, default=32)
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--images", type=int, default=48)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    if not asyncio.run(run(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
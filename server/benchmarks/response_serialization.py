@@ -0,0 +1,161 @@
+"""Micro-benchmark of list endpoint serialization, before and after single-pass rendering.
+
+Serves ``--rows`` ORM rows from two pairs of in-process FastAPI routes: a
+dog list and a post page. The "before" routes build a list of response
+models by hand and return it under ``response_model``, which FastAPI
+validates and encodes again. The "after" routes return
+``render_list`` / ``render`` from ``app.api.responses``. Each route is
+called ``--requests`` times through an in-memory ASGI client, and the
+process CPU time per request is reported for the whole request and for the
+serialization step alone. Response bodies must match. No database is
+needed.
+
+Usage (from ``server/``)::
+
+    python -m benchmarks.response_serialization --rows 50 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.responses import render, render_list
+from app.models.dog import Dog, DogGender, DogSize
+from app.models.post import Post
+from app.schemas.dog import DogResponse
+from app.schemas.post import PostPage, PostResponse
+from benchmarks._common import make_parser
+
+
+def _dogs(rng: random.Random, count: int) -> list[Dog]:
+    return [
+        Dog(
+            id=uuid.UUID(int=rng.getrandbits(128)),
+            user_id=uuid.UUID(int=rng.getrandbits(128)),
+            name=f"狗狗{number}",
+            breed=rng.choice(["柯基犬", "金毛寻回犬", "柴犬", "贵宾犬"]),
+            size=rng.choice(list(DogSize)),
+            gender=rng.choice(list(DogGender)),
+            age_months=rng.randint(1, 200),
+            avatar=f"/media/dog_avatar/{number}.jpg",
+            mbti=rng.choice([None, "ENFP", "ISTJ"]),
+        )
+        for number in range(count)
+    ]
+
+
+def _posts(rng: random.Random, count: int) -> list[Post]:
+    start = datetime(2026, 10, 1)
+    return [
+        Post(
+            id=uuid.UUID(int=rng.getrandbits(128)),
+            user_id=uuid.UUID(int=rng.getrandbits(128)),
+            dog_id=uuid.UUID(int=rng.getrandbits(128)),
+            content="今天去公园遛狗啦" * rng.randint(1, 8),
+            images=[f"/media/post_image/{number}_{i}.jpg" for i in range(rng.randint(0, 4))],
+            tags=rng.sample(["周末遛狗", "柯基", "萌宠日常", "公园"], 2),
+            like_count=rng.randint(0, 500),
+            comment_count=rng.randint(0, 50),
+            created_at=start + timedelta(minutes=number),
+        )
+        for number in range(count)
+    ]
+
+
+def _app(dogs: list[Dog], posts: list[Post]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before/dogs", response_model=list[DogResponse])
+    async def dogs_before():
+        return [DogResponse.model_validate(dog, from_attributes=True) for dog in dogs]
+
+    @app.get("/after/dogs", response_model=list[DogResponse])
+    async def dogs_after():
+        return render_list(DogResponse, dogs)
+
+    @app.get("/before/posts", response_model=PostPage)
+    async def posts_before():
+        return PostPage(
+            posts=[PostResponse.model_validate(post) for post in posts],
+            has_more=True,
+            next_cursor="abc",
+        )
+
+    @app.get("/after/posts", response_model=PostPage)
+    async def posts_after():
+        page = {"posts": posts, "has_more": True, "next_cursor": "abc"}
+        return render(PostPage, page)
+
+    return app
+
+
+def _cpu_us(call: Callable[[], Any], repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        call()
+    return (time.process_time() - start) / repeat * 1e6
+
+
+async def _request_cpu_us(client: httpx.AsyncClient, path: str, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        response = await client.get(path)
+        response.raise_for_status()
+    return (time.process_time() - start) / repeat * 1e6
+
+
+async def run(args: argparse.Namespace) -> bool:
+    rng = random.Random(args.seed)
+    dogs, posts = _dogs(rng, args.rows), _posts(rng, args.rows)
+    app = _app(dogs, posts)
+    transport = httpx.ASGITransport(app=app)
+    ok = True
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in ("dogs", "posts"):
+            before = (await client.get(f"/before/{name}")).json()
+            after = (await client.get(f"/after/{name}")).json()
+            same = before == after
+            ok &= same
+            before_us = await _request_cpu_us(client, f"/before/{name}", args.requests)
+            after_us = await _request_cpu_us(client, f"/after/{name}", args.requests)
+            print(
+                f"{name} ({args.rows} rows): request CPU {before_us:.0f} µs before,"
+                f" {after_us:.0f} µs after ({before_us / after_us:.1f}x), bodies match: {same}"
+            )
+
+    # The serialization step alone, without routing and the ASGI round trip
+    repeat = max(1, args.requests // 2)
+    adapter = DogResponse.model_validate
+    handwritten = _cpu_us(
+        lambda: json.dumps(
+            [adapter(dog, from_attributes=True).model_dump(mode="json") for dog in dogs]
+        ),
+        repeat,
+    )
+    single = _cpu_us(lambda: render_list(DogResponse, dogs), repeat)
+    print(
+        f"dog list serialization only: {handwritten:.0f} µs model_validate + dump,"
+        f" {single:.0f} µs single pass"
+    )
+    return ok
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    if not asyncio.run(run(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark tag autocomplete from the in-memory prefix index.
+
+Generates ``--tags`` hashtags (Chinese and pinyin/Latin) with Zipf-like
+use counts, builds a ``TagIndex`` and times ``--queries`` suggestions for
+prefixes typed one character at a time, against scanning every tag. It
+then applies ``--updates`` incremental count changes, as new posts would,
+times them and checks every suggestion against the scan. No database is
+needed.
+
+Usage (from ``server/``)::
+
+    python -m benchmarks.tag_autocomplete --tags 100000 --queries 20000
+"""
+import argparse
+import heapq
+import random
+import sys
+import time
+
+from app.services.tag_index import TagIndex
+from benchmarks._common import make_parser, summarize
+
+SYLLABLES = "周末遛狗公园柯基金毛柴犬泰迪萨摩耶草地下雨天晒太阳游泳训练零食生日快乐萌宠日常打卡"
+LATIN = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _tag(rng: random.Random) -> str:
+    if rng.random() < 0.7:
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 6)))
+    return "".join(rng.choice(LATIN) for _ in range(rng.randint(3, 12)))
+
+
+def _scan(counts: dict[str, int], prefix: str, limit: int) -> list[tuple[str, int]]:
+    matches = (tag for tag in counts if tag.startswith(prefix))
+    top = heapq.nsmallest(limit, matches, key=lambda tag: (-counts[tag], tag))
+    return [(tag, counts[tag]) for tag in top]
+
+
+def run(args: argparse.Namespace) -> bool:
+    rng = random.Random(args.seed)
+    counts: dict[str, int] = {}
+    while len(counts) < args.tags:
+        counts[_tag(rng)] = max(1, int(100_000 / (len(counts) + 1) ** 1.1))
+
+    start = time.perf_counter()
+    index = TagIndex(counts, top_k=args.limit)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    tags = list(counts)
+    typed = []
+    for tag in rng.choices(tags, k=args.queries):
+        typed.append(tag[: rng.randint(0, len(tag))])
+
+    index_ms, scan_ms = [], []
+    for prefix in typed:
+        start = time.perf_counter()
+        index.suggest(prefix, args.limit)
+        index_ms.append((time.perf_counter() - start) * 1000)
+    for prefix in typed[: args.scan_queries]:
+        start = time.perf_counter()
+        _scan(counts, prefix, args.limit)
+        scan_ms.append((time.perf_counter() - start) * 1000)
+
+    update_ms = []
+    for _ in range(args.updates):
+        tag = rng.choice(tags) if rng.random() < 0.9 else _tag(rng)
+        counts[tag] = max(1, counts.get(tag, 0) + rng.randint(-20, 50))
+        start = time.perf_counter()
+        index.set(tag, counts[tag])
+        update_ms.append((time.perf_counter() - start) * 1000)
+        if tag not in tags:
+            tags.append(tag)
+
+    checked = rng.sample(typed, min(len(typed), args.scan_queries))
+    checked += [tag[:length] for tag in rng.sample(tags, 200) for length in range(len(tag) + 1)]
+    mismatches = sum(
+        index.suggest(prefix, args.limit) != _scan(counts, prefix, args.limit)
+        for prefix in checked
+    )
+
+    print(f"tags={args.tags} build={build_ms:.0f} ms prefixes={len(index.top)}")
+    print(f"index suggest ms: {summarize(index_ms, 4)}")
+    print(f"full scan ms ({len(scan_ms)} queries): {summarize(scan_ms, 4)}")
+    print(f"incremental update ms ({args.updates}): {summarize(update_ms, 4)}")
+    print(f"checked {len(checked)} prefixes after updates, mismatches: {mismatches}")
+    return mismatches == 0
+
+
+def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--tags", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--scan-queries", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    if not run(parser.parse_args()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
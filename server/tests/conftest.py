@@ -0,0 +1,12 @@
+import pytest
+
+from app.core.redis import MemoryRedis, set_redis
+
+
+@pytest.fixture
+def redis():
+    """A fresh in-process Redis stand-in installed as the app's client."""
+    client = MemoryRedis()
+    set_redis(client)
+    yield client
+    set_redis(None)
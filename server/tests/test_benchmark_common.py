@@ -0,0 +1,31 @@
+import pytest
+
+from benchmarks._common import batched, percentile, summarize, trimmed_mean
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 0.50) == 50
+    assert percentile(samples, 0.99) == 99
+    assert percentile(samples, 1.0) == 100
+    assert percentile([7.0], 0.99) == 7.0
+    assert percentile([3, 1, 2], 0.0) == 1
+
+
+def test_percentile_needs_samples():
+    with pytest.raises(ValueError):
+        percentile([], 0.5)
+
+
+def test_trimmed_mean_drops_outliers():
+    assert trimmed_mean([1.0] * 8 + [0.0, 100.0]) == 1.0
+    assert trimmed_mean([4.0, 2.0]) == 3.0
+    assert trimmed_mean([5.0], 0.4) == 5.0
+
+
+def test_summarize():
+    assert summarize([1.0, 2.0, 3.0, 4.0], 1) == "p50=2.0 p95=4.0 p99=4.0 max=4.0"
+
+
+def test_batched():
+    assert list(batched(list(range(5)), 2)) == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,51 @@
+import pytest
+
+from app.services.breed_catalogue import BreedIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    return BreedIndex()
+
+
+def names(index, query, limit=3):
+    return [match.breed.name for match in index.search(query, limit)]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("柴犬", "柴犬"),
+        ("chai", "柴犬"),
+        ("shiba", "柴犬"),
+        ("jinmao", "金毛寻回犬"),
+        ("jin毛", "金毛寻回犬"),
+        ("labrodor", "拉布拉多寻回犬"),
+        ("Golden Retriever", "金毛寻回犬"),
+    ],
+)
+def test_best_match(index, query, expected):
+    assert names(index, query)[0] == expected
+
+
+def test_infix(index):
+    assert set(names(index, "寻回")) >= {"金毛寻回犬", "拉布拉多寻回犬"}
+
+
+def test_typed_characters_rank_above_pinyin(index):
+    assert names(index, "金")[:2] == ["金毛寻回犬", "京巴犬"]
+
+
+def test_scores_are_ordered_and_limited(index):
+    matches = index.search("犬", limit=5)
+    assert len(matches) == 5
+    scores = [match.score for match in matches]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_empty_query_lists_catalogue(index):
+    assert len(index.search("", limit=4)) == 4
+
+
+def test_unknown_query(index):
+    assert index.search("zzzzqqq") == []
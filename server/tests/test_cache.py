@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.core.cache import ReadThroughCache
+from app.core.redis import set_redis
+
+
+def counting_loader(value, delay=0.0):
+    calls = []
+
+    async def loader():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+
+    return loader, calls
+
+
+async def test_hit_after_miss(redis):
+    cache = ReadThroughCache("test", ttl_seconds=60)
+    loader, calls = counting_loader({"name": "旺财"})
+    assert await cache.get_or_load("test:1", loader) == {"name": "旺财"}
+    assert await cache.get_or_load("test:1", loader) == {"name": "旺财"}
+    assert len(calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+async def test_missing_row_is_cached(redis):
+    cache = ReadThroughCache("test", ttl_seconds=60)
+    loader, calls = counting_loader(None)
+    assert await cache.get_or_load("test:1", loader) is None
+    assert await cache.get_or_load("test:1", loader) is None
+    assert len(calls) == 1
+
+
+async def test_concurrent_misses_share_one_load(redis):
+    cache = ReadThroughCache("test", ttl_seconds=60)
+    loader, calls = counting_loader(42, delay=0.05)
+    results = await asyncio.gather(*(cache.get_or_load("test:1", loader) for _ in range(10)))
+    assert results == [42] * 10
+    assert len(calls) == 1
+
+
+async def test_waiter_takes_over_when_owner_is_cancelled(redis):
+    cache = ReadThroughCache("test", ttl_seconds=60)
+    loader, calls = counting_loader(42, delay=0.05)
+    owner = asyncio.create_task(cache.get_or_load("test:1", loader))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(cache.get_or_load("test:1", loader))
+    await asyncio.sleep(0.01)
+    owner.cancel()
+    assert await waiter == 42
+    assert owner.cancelled()
+    assert len(calls) == 2
+
+
+async def test_cancelled_waiter_does_not_take_over(redis):
+    cache = ReadThroughCache("test", ttl_seconds=60)
+    loader, calls = counting_loader(42, delay=0.05)
+    owner = asyncio.create_task(cache.get_or_load("test:1", loader))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(cache.get_or_load("test:1", loader))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    assert await owner == 42
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert len(calls) == 1
+
+
+async def test_loader_failure_reaches_every_waiter(redis):
+    cache = ReadThroughCache("test", ttl_seconds=60)
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise LookupError("gone")
+
+    results = await asyncio.gather(
+        *(cache.get_or_load("test:1", loader) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(result, LookupError) for result in results)
+
+
+class BrokenRedis:
+    async def get(self, *args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    set = delete = get
+
+
+async def test_falls_back_to_loader_when_redis_fails():
+    set_redis(BrokenRedis())
+    try:
+        cache = ReadThroughCache("test", ttl_seconds=60)
+        loader, calls = counting_loader(7)
+        assert await cache.get_or_load("test:1", loader) == 7
+        assert await cache.get_or_load("test:1", loader) == 7
+        assert len(calls) == 2
+        await cache.invalidate("test:1")
+    finally:
+        set_redis(None)
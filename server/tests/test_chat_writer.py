@@ -0,0 +1,127 @@
+import uuid
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.services import chat_writer as chat_writer_module
+from app.services.chat_writer import ChatMessageWriter
+
+
+class FakeDatabase:
+    """Stands in for the session factory; ``fail`` decides what a batch raises."""
+
+    def __init__(self):
+        self.rows = []
+        self.statements = 0
+        self.fail = lambda batch: None
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, stmt, batch):
+        self.statements += 1
+        error = self.fail(batch)
+        if error is not None:
+            raise error
+        self._pending = list(batch)
+
+    async def commit(self):
+        self.rows.extend(self._pending)
+
+
+def rejecting(content):
+    def fail(batch):
+        if any(row["content"] == content for row in batch):
+            return IntegrityError("INSERT", {}, Exception("check violation"))
+
+    return fail
+
+
+def unavailable(batch):
+    return OperationalError("INSERT", {}, Exception("connection refused"))
+
+
+@pytest.fixture
+def database():
+    return FakeDatabase()
+
+
+@pytest.fixture
+async def writer(database, monkeypatch):
+    monkeypatch.setattr(chat_writer_module, "RETRY_PAUSE_SECONDS", 0)
+    monkeypatch.setattr(chat_writer_module, "STOP_RETRY_SECONDS", 0)
+    writer = ChatMessageWriter(
+        session_factory=database, batch_size=100, flush_interval=60.0, max_attempts=3
+    )
+    yield writer
+    database.fail = lambda batch: None
+    await writer.stop()
+
+
+async def submit(writer, count, group_id=None, content="汪"):
+    group_id = group_id or uuid.uuid4()
+    return [await writer.submit(group_id, uuid.uuid4(), content) for _ in range(count)]
+
+
+async def test_flush_writes_in_order_in_batches(database, writer):
+    writer.batch_size = 4
+    group_id = uuid.uuid4()
+    messages = await submit(writer, 10, group_id)
+    await writer.flush()
+    assert [row["id"] for row in database.rows] == [message["id"] for message in messages]
+    stamps = [row["created_at"] for row in database.rows]
+    assert stamps == sorted(stamps) and len(set(stamps)) == len(stamps)
+    assert writer.stats()["pending"] == 0
+    assert writer.rows_written == 10
+
+
+async def test_failed_flush_keeps_the_batch_for_retry(database, writer):
+    await submit(writer, 3)
+    database.fail = unavailable
+    await writer.flush()
+    assert writer.stats()["pending"] == 3
+    assert writer.failed_flushes == 1
+
+    database.fail = lambda batch: None
+    await writer.flush()
+    assert len(database.rows) == 3
+    assert writer.dead_lettered == 0
+
+
+async def test_batch_is_dead_lettered_after_max_attempts(database, writer):
+    await submit(writer, 3)
+    database.fail = unavailable
+    for _ in range(writer.max_attempts):
+        await writer.flush()
+    assert writer.stats()["pending"] == 0
+    assert writer.dead_lettered == 3
+    assert writer.failed_flushes == writer.max_attempts
+    assert database.rows == []
+
+
+async def test_rejected_rows_are_isolated(database, writer):
+    messages = await submit(writer, 8)
+    bad = await submit(writer, 1, content="bad")
+    messages += await submit(writer, 7)
+    database.fail = rejecting("bad")
+    await writer.flush()
+    assert [row["id"] for row in database.rows] == [message["id"] for message in messages]
+    assert [row["id"] for row in writer.dead_letters] == [bad[0]["id"]]
+    assert writer.failed_flushes == 0
+    # One bad row in 16 costs about 2 * log2(16) extra statements
+    assert database.statements <= 1 + 2 * 4
+
+
+async def test_stop_dead_letters_what_it_cannot_write(database, writer):
+    writer.max_attempts = 100
+    await submit(writer, 5)
+    database.fail = unavailable
+    await writer.stop()
+    assert writer.stats()["pending"] == 0
+    assert writer.dead_lettered == 5
@@ -0,0 +1,150 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.counters import (
+    COMMENTS,
+    FLUSHING_PREFIX,
+    LIKES,
+    LOCK_KEY,
+    PENDING_PREFIX,
+    PostCounters,
+)
+
+
+class FakeDatabase:
+    """Records the deltas each flush applies; serves post ids to recounts."""
+
+    def __init__(self, post_ids=()):
+        self.post_ids = sorted(post_ids, key=str)
+        self.applied = []
+        self.recounted = []
+        self.fail = False
+        self.on_commit = None
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, stmt):
+        if self.fail:
+            raise OSError("database went away")
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        if "deltas" in str(compiled):
+            params = list(compiled.params.values())
+            self.applied += [tuple(params[i : i + 3]) for i in range(0, len(params), 3)]
+        return SimpleNamespace(rowcount=1)
+
+    async def scalars(self, stmt):
+        params = stmt.compile().params
+        after = params.get("id_1")
+        ids = [post_id for post_id in self.post_ids if after is None or str(post_id) > str(after)]
+        batch = ids[: params["param_1"]]
+        self.recounted.append(batch)
+        return batch
+
+    async def commit(self):
+        if self.on_commit is not None:
+            await self.on_commit()
+
+
+def totals(applied):
+    result = {}
+    for post_id, likes, comments in applied:
+        counts = result.setdefault(post_id, [0, 0])
+        counts[0] += likes
+        counts[1] += comments
+    return {post_id: tuple(counts) for post_id, counts in result.items()}
+
+
+async def test_pending_sums_every_shard(redis):
+    counters = PostCounters(FakeDatabase(), redis, shards=4)
+    post_id, other = uuid.uuid4(), uuid.uuid4()
+    for _ in range(20):
+        await counters.increment(post_id, LIKES)
+    await counters.increment(post_id, COMMENTS, 2)
+    await counters.increment(post_id, LIKES, -1)
+    # Deltas already moved aside by a running flush still count
+    await redis.hincrby(FLUSHING_PREFIX + "3", f"{post_id}:{LIKES}", 5)
+
+    assert len(await redis.keys(PENDING_PREFIX + "*")) > 1
+    assert await counters.pending([post_id, other]) == {post_id: {LIKES: 24, COMMENTS: 2}}
+    assert await counters.pending([]) == {}
+
+
+async def test_flush_applies_summed_deltas(redis):
+    database = FakeDatabase()
+    counters = PostCounters(database, redis, shards=4)
+    posts = [uuid.uuid4() for _ in range(3)]
+    for number, post_id in enumerate(posts):
+        for _ in range(number + 1):
+            await counters.increment(post_id, LIKES)
+    await counters.increment(posts[0], COMMENTS)
+
+    assert await counters.flush() == 3
+    assert totals(database.applied) == {posts[0]: (1, 1), posts[1]: (2, 0), posts[2]: (3, 0)}
+    assert await counters.pending(posts) == {}
+    assert await redis.get(LOCK_KEY) is None
+
+
+async def test_flush_picks_up_a_hash_left_by_a_failed_flush(redis):
+    database = FakeDatabase()
+    counters = PostCounters(database, redis, shards=1)
+    post_id = uuid.uuid4()
+    await counters.increment(post_id, LIKES, 3)
+
+    database.fail = True
+    with pytest.raises(OSError):
+        await counters.flush()
+    assert await redis.exists(FLUSHING_PREFIX + "0")
+    # Counted after the failed flush; must wait for the flush after next
+    await counters.increment(post_id, LIKES, 10)
+    assert await counters.pending([post_id]) == {post_id: {LIKES: 13, COMMENTS: 0}}
+
+    database.fail = False
+    assert await counters.flush() == 1
+    assert totals(database.applied) == {post_id: (3, 0)}
+    assert await counters.flush() == 1
+    assert totals(database.applied) == {post_id: (13, 0)}
+    assert not await redis.exists(FLUSHING_PREFIX + "0")
+
+
+async def test_flush_skipped_while_another_worker_holds_the_lock(redis):
+    counters = PostCounters(FakeDatabase(), redis, shards=1)
+    await redis.set(LOCK_KEY, "other-worker")
+    assert await counters.flush() is None
+    assert await counters.reconcile() is None
+
+
+async def test_recount_walks_every_batch(redis):
+    database = FakeDatabase(uuid.uuid4() for _ in range(5))
+    counters = PostCounters(database, redis, shards=1, batch_size=2)
+    assert await counters.reconcile() == 3
+    assert [len(batch) for batch in database.recounted] == [2, 2, 1, 0]
+
+
+async def test_recount_stops_when_the_lock_passes_to_another_worker(redis):
+    database = FakeDatabase(uuid.uuid4() for _ in range(10))
+    counters = PostCounters(database, redis, shards=1, batch_size=2)
+
+    commits = 0
+
+    async def steal_lock():
+        nonlocal commits
+        commits += 1
+        if commits == 2:
+            # Our lock expired during a stall and another worker took it
+            await redis.set(LOCK_KEY, "other-worker")
+
+    database.on_commit = steal_lock
+    assert await counters.reconcile() == 2
+    assert len(database.recounted) == 2
+    # The other worker's lock is left alone
+    assert await redis.get(LOCK_KEY) == b"other-worker"
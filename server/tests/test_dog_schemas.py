@@ -0,0 +1,22 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.dog import DogUpdate
+
+
+def test_omitted_fields_are_unset():
+    assert DogUpdate.model_validate({"name": "旺财"}).model_dump(exclude_unset=True) == {
+        "name": "旺财"
+    }
+
+
+@pytest.mark.parametrize("field", ["name", "breed", "size", "gender", "age_months"])
+def test_explicit_null_is_rejected(field):
+    with pytest.raises(ValidationError, match=f"{field} must not be null"):
+        DogUpdate.model_validate({field: None})
+
+
+def test_avatar_can_be_cleared():
+    assert DogUpdate.model_validate({"avatar": None}).model_dump(exclude_unset=True) == {
+        "avatar": None
+    }
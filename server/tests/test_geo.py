@@ -0,0 +1,106 @@
+import math
+import random
+
+import pytest
+
+from app.core import geo
+
+SHANGHAI = (31.2304, 121.4737)
+
+
+def test_encode_known_geohash():
+    assert geo.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_decode_bbox_contains_point():
+    min_lat, min_lng, max_lat, max_lng = geo.decode_bbox(geo.encode(*SHANGHAI))
+    assert min_lat <= SHANGHAI[0] <= max_lat
+    assert min_lng <= SHANGHAI[1] <= max_lng
+
+
+@pytest.mark.parametrize("precision", [1, 5, 9])
+def test_cell_size_matches_decoded_box(precision):
+    min_lat, min_lng, max_lat, max_lng = geo.decode_bbox(geo.encode(*SHANGHAI, precision))
+    height, width = geo.cell_size_deg(precision)
+    assert math.isclose(max_lat - min_lat, height)
+    assert math.isclose(max_lng - min_lng, width)
+
+
+def test_haversine():
+    assert geo.haversine_km(*SHANGHAI, *SHANGHAI) == 0.0
+    # One degree of latitude
+    assert geo.haversine_km(0.0, 0.0, 1.0, 0.0) == pytest.approx(111.195, abs=0.01)
+
+
+@pytest.mark.parametrize(
+    "center, radius_km",
+    [(SHANGHAI, 0.5), (SHANGHAI, 10.0), ((0.0, 179.99), 5.0), ((89.9, 0.0), 20.0)],
+)
+def test_covering_cells_cover_circle(center, radius_km):
+    cells = geo.covering_cells(*center, radius_km)
+    assert 0 < len(cells) <= 16
+    km_per_deg = math.pi * geo.EARTH_RADIUS_KM / 180.0
+    for step in range(16):
+        angle = 2 * math.pi * step / 16
+        lat = center[0] + radius_km * math.sin(angle) / km_per_deg * 0.99
+        lng_scale = max(math.cos(math.radians(lat)), 1e-3)
+        lng = center[1] + radius_km * math.cos(angle) / (km_per_deg * lng_scale) * 0.99
+        lng = (lng + 180.0) % 360.0 - 180.0
+        if abs(lat) > 90.0:
+            continue
+        point = geo.encode(lat, lng)
+        assert any(cell <= point < cell + geo.PREFIX_END for cell in cells)
+
+
+def random_point_near(rng, center, max_km):
+    km_per_deg = math.pi * geo.EARTH_RADIUS_KM / 180.0
+    lat = center[0] + rng.uniform(-max_km, max_km) / km_per_deg
+    lng_scale = max(math.cos(math.radians(min(abs(lat), 89.9))), 1e-3)
+    lng = center[1] + rng.uniform(-max_km, max_km) / (km_per_deg * lng_scale)
+    return max(-90.0, min(90.0, lat)), (lng + 180.0) % 360.0 - 180.0
+
+
+@pytest.mark.parametrize(
+    "center, inner_km, radius_km",
+    [
+        (SHANGHAI, 0.0, 1.0),
+        (SHANGHAI, 3.0, 4.0),
+        (SHANGHAI, 9.5, 10.0),
+        (SHANGHAI, 50.0, 200.0),
+        ((0.0, 179.99), 2.0, 5.0),
+        ((-60.0, -70.0), 10.0, 40.0),
+    ],
+)
+def test_covering_cells_cover_ring(center, inner_km, radius_km):
+    rng = random.Random(radius_km)
+    cells = geo.covering_cells(*center, radius_km, inner_km=inner_km)
+    assert 0 < len(cells) <= 16
+    checked = 0
+    while checked < 500:
+        lat, lng = random_point_near(rng, center, radius_km)
+        if not inner_km <= geo.haversine_km(*center, lat, lng) <= radius_km:
+            continue
+        point = geo.encode(lat, lng)
+        assert any(cell <= point < cell + geo.PREFIX_END for cell in cells)
+        checked += 1
+
+
+def test_ring_skips_cells_inside_inner_radius():
+    cells = geo.covering_cells(*SHANGHAI, 6.0, inner_km=5.0)
+    assert geo.encode(*SHANGHAI, len(cells[0])) not in cells
+    assert all(geo.max_distance_km(*SHANGHAI, cell) >= 5.0 for cell in cells)
+
+
+@pytest.mark.parametrize("center", [SHANGHAI, (0.0, 179.99), (-89.0, 10.0), (60.0, 0.0)])
+@pytest.mark.parametrize("precision", [2, 4, 6])
+def test_cell_distance_bounds(center, precision):
+    rng = random.Random(precision)
+    for _ in range(50):
+        cell = geo.encode(*random_point_near(rng, center, 3000.0 / precision**2), precision)
+        min_lat, min_lng, max_lat, max_lng = geo.decode_bbox(cell)
+        low = geo.min_distance_km(*center, cell)
+        high = geo.max_distance_km(*center, cell)
+        for _ in range(20):
+            lat, lng = rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng)
+            distance = geo.haversine_km(*center, lat, lng)
+            assert low - 1e-9 <= distance <= high + 1e-9
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from app.services.loaders import Loader
+
+
+def make_loader(rows, missing=lambda: None):
+    calls = []
+
+    async def batch(keys):
+        calls.append(list(keys))
+        return {key: rows[key] for key in keys if key in rows}
+
+    return Loader(batch, asyncio.Lock(), missing), calls
+
+
+async def test_one_batch_per_iteration():
+    loader, calls = make_loader({1: "a", 2: "b"})
+    assert await loader.load_many([2, 1, 2, 3]) == ["b", "a", "b", None]
+    assert calls == [[2, 1, 3]]
+    assert loader.batches == 1
+
+
+async def test_results_are_cached_including_misses():
+    loader, calls = make_loader({1: "a"}, missing=list)
+    assert await loader.load(1) == "a"
+    assert await loader.load(9) == []
+    assert await loader.load_many([1, 9]) == ["a", []]
+    assert calls == [[1], [9]]
+
+
+async def test_prime_skips_query():
+    loader, calls = make_loader({})
+    loader.prime(5, "primed")
+    loader.prime(5, "ignored")
+    assert await loader.load(5) == "primed"
+    assert calls == []
+
+
+async def test_failed_keys_are_retried():
+    attempts = []
+
+    async def batch(keys):
+        attempts.append(list(keys))
+        if len(attempts) == 1:
+            raise RuntimeError("database went away")
+        return {key: key * 10 for key in keys}
+
+    loader = Loader(batch, asyncio.Lock())
+    with pytest.raises(RuntimeError):
+        await loader.load_many([1, 2])
+    assert await loader.load_many([1, 2]) == [10, 20]
+    assert attempts == [[1, 2], [1, 2]]
+
+
+async def test_shared_lock_serialises_batches():
+    lock = asyncio.Lock()
+    running, peak = 0, 0
+
+    async def batch(keys):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return {key: key for key in keys}
+
+    users, dogs = Loader(batch, lock), Loader(batch, lock)
+    assert await asyncio.gather(users.load_many([1, 2]), dogs.load_many([3])) == [[1, 2], [3]]
+    assert peak == 1
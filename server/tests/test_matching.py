@@ -0,0 +1,173 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BooleanClauseList, False_
+
+from app.core.breeds import BREEDS
+from app.models.dog import DogSize
+from app.schemas.session import SessionRequirements
+from app.services.matching import (
+    MBTI_TYPES,
+    CompiledRequirements,
+    DogProfile,
+    SessionIndex,
+    dog_matches,
+    eligible_clause,
+    requirement_columns,
+)
+
+NOW = datetime(2026, 10, 18, 12, 0)
+# Spellings that must fold to the same catalogue breed
+BREED_SPELLINGS = [
+    spelling for breed in BREEDS[:6] for spelling in (breed.name, breed.en, *breed.aliases)
+] + ["Golden Retriever", "golden retriever", "哈基米"]
+AGE_EDGES = [0, 1, 11, 12, 35, 36, 359, 360]
+
+
+def evaluate(clause, row):
+    """Evaluate an ``eligible_clause`` expression against one row of columns."""
+    if isinstance(clause, False_):
+        return False
+    if isinstance(clause, BooleanClauseList):
+        results = [evaluate(part, row) for part in clause.clauses]
+        return any(results) if clause.operator is operators.or_ else all(results)
+    assert isinstance(clause, BinaryExpression)
+    column, value = row[clause.left.key], clause.right.value
+    if clause.operator is operators.le:
+        return column <= value
+    if clause.operator is operators.ge:
+        return column >= value
+    assert clause.operator.opstring == "&&"
+    return bool(set(column) & set(value))
+
+
+def random_requirements(rng):
+    low, high = sorted(rng.sample(AGE_EDGES, 2))
+    return SessionRequirements(
+        sizes=rng.sample(list(DogSize), rng.choice([0, 0, 1, 2, 3])),
+        age_min_months=rng.choice([None, low]),
+        age_max_months=rng.choice([None, high]),
+        breeds=rng.sample(BREED_SPELLINGS, rng.choice([0, 0, 1, 3])),
+        mbti=rng.sample(MBTI_TYPES, rng.choice([0, 0, 1, 4])),
+    )
+
+
+def random_dog(rng):
+    return DogProfile(
+        id=uuid.uuid4(),
+        size=rng.choice(list(DogSize)),
+        breed=rng.choice(BREED_SPELLINGS),
+        age_months=rng.choice(AGE_EDGES),
+        mbti=rng.choice([None, "", "xxxx", *MBTI_TYPES, "intj"]),
+    )
+
+
+@pytest.fixture(scope="module")
+def sessions():
+    rng = random.Random(7)
+    rows = []
+    for number in range(400):
+        columns = requirement_columns(random_requirements(rng))
+        rows.append(
+            (
+                uuid.uuid4(),
+                NOW + timedelta(minutes=number % 50),
+                columns["allowed_sizes"],
+                columns["age_min_months"],
+                columns["age_max_months"],
+                columns["allowed_breeds"],
+                columns["allowed_mbti"],
+            )
+        )
+    return rows
+
+
+def columns_of(row):
+    return dict(
+        zip(
+            (
+                "allowed_sizes",
+                "age_min_months",
+                "age_max_months",
+                "allowed_breeds",
+                "allowed_mbti",
+            ),
+            row[2:],
+        )
+    )
+
+
+def reference(row, dog):
+    return dog_matches(CompiledRequirements.from_columns(**columns_of(row)), dog)
+
+
+def test_index_sql_and_reference_agree(sessions):
+    rng = random.Random(11)
+    dogs = [random_dog(rng) for _ in range(300)]
+    index = SessionIndex(sessions)
+    position = {session_id: number for number, session_id in enumerate(index.ids)}
+    eligibility = index.eligibility(dogs)
+    clauses = [eligible_clause([dog]) for dog in dogs]
+    matched = 0
+    for row in sessions:
+        columns = columns_of(row)
+        compiled = CompiledRequirements.from_columns(**columns)
+        for number, dog in enumerate(dogs):
+            expected = dog_matches(compiled, dog)
+            assert evaluate(clauses[number], columns) is expected, (columns, dog)
+            assert bool(eligibility[number, position[row[0]]]) is expected, (columns, dog)
+            matched += expected
+    # The generator must exercise both outcomes
+    assert 0 < matched < len(sessions) * len(dogs)
+
+
+def test_match_pages_agree_with_reference(sessions):
+    rng = random.Random(3)
+    dogs = [random_dog(rng) for _ in range(3)]
+    index = SessionIndex(sessions)
+    expected = []
+    for row in sorted(sessions, key=lambda row: (row[1], str(row[0]))):
+        ids = [dog.id for dog in dogs if reference(row, dog)]
+        if ids:
+            expected.append((row[0], ids))
+
+    seen, after = [], None
+    while True:
+        page, after = index.match(dogs, NOW - timedelta(minutes=1), after, limit=7)
+        seen += page
+        if after is None:
+            break
+    assert seen == expected
+    clause = eligible_clause(dogs)
+    for row in sessions:
+        assert evaluate(clause, columns_of(row)) is any(reference(row, dog) for dog in dogs)
+
+
+def test_no_dogs_match_nothing():
+    assert evaluate(eligible_clause([]), {}) is False
+
+
+@pytest.mark.parametrize(
+    "requirements, dog, expected",
+    [
+        (SessionRequirements(age_min_months=12, age_max_months=36), (12, None, "柴犬"), True),
+        (SessionRequirements(age_min_months=12, age_max_months=36), (36, None, "柴犬"), True),
+        (SessionRequirements(age_min_months=12, age_max_months=36), (37, None, "柴犬"), False),
+        (SessionRequirements(mbti=["INTJ"]), (12, None, "柴犬"), False),
+        (SessionRequirements(mbti=["INTJ"]), (12, "intj", "柴犬"), True),
+        (SessionRequirements(breeds=["金毛"]), (12, None, "Golden Retriever"), True),
+        (SessionRequirements(breeds=["金毛"]), (12, None, "拉布拉多"), False),
+        (SessionRequirements(sizes=[DogSize.large]), (12, None, "柴犬"), False),
+    ],
+)
+def test_edge_cases(requirements, dog, expected):
+    columns = requirement_columns(requirements)
+    age, mbti, breed = dog
+    profile = DogProfile(uuid.uuid4(), DogSize.small, breed, age, mbti)
+    row = (uuid.uuid4(), NOW + timedelta(hours=1), *columns.values())
+    assert dog_matches(CompiledRequirements.from_columns(**columns), profile) is expected
+    assert evaluate(eligible_clause([profile]), columns) is expected
+    assert bool(SessionIndex([row]).eligibility([profile])[0, 0]) is expected
@@ -0,0 +1,29 @@
+import pytest
+
+from app.core.metrics import normalize_sql
+
+
+@pytest.mark.parametrize(
+    "statement, shape",
+    [
+        (
+            "SELECT * FROM t WHERE a = 'x''y' AND b = 12",
+            "SELECT * FROM t WHERE a = ? AND b = ?",
+        ),
+        ("SELECT * FROM t WHERE id IN ($1, $2, $3)", "SELECT * FROM t WHERE id IN (?, ...)"),
+        (
+            "INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4)",
+            "INSERT INTO t (a, b) VALUES (?, ...), ...",
+        ),
+        ("SELECT  a\n  FROM t WHERE id = %(id_1)s", "SELECT a FROM t WHERE id = ?"),
+        ("SELECT col1 FROM t2", "SELECT col1 FROM t2"),
+    ],
+)
+def test_normalize_sql(statement, shape):
+    assert normalize_sql(statement) == shape
+
+
+def test_list_length_does_not_change_shape():
+    assert normalize_sql("SELECT 1 FROM t WHERE id IN ($1, $2)") == normalize_sql(
+        "SELECT 1 FROM t WHERE id IN ($1, $2, $3, $4)"
+    )
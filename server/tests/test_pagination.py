@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    key = (datetime(2026, 10, 18, 12, 30), uuid4())
+    assert decode_cursor(encode_cursor(*key), datetime.fromisoformat, UUID) == key
+
+
+def test_float_accepts_int():
+    session_id = uuid4()
+    assert decode_cursor(encode_cursor(3, session_id), float, UUID) == (
+        3.0,
+        session_id,
+    )
+
+
+def test_aware_timestamp_becomes_naive_utc():
+    cursor = encode_cursor("2026-10-18T20:30:00+08:00")
+    assert decode_cursor(cursor, datetime.fromisoformat) == (datetime(2026, 10, 18, 12, 30),)
+
+
+@pytest.mark.parametrize(
+    "cursor, types",
+    [
+        ("not base64!", (int,)),
+        (encode_cursor(1, 2), (int,)),
+        (encode_cursor("7"), (int,)),
+        (encode_cursor(True), (int,)),
+        (encode_cursor(float("nan")), (float,)),
+        (encode_cursor(12), (datetime.fromisoformat,)),
+        (encode_cursor("yesterday"), (datetime.fromisoformat,)),
+        (encode_cursor("not-a-uuid"), (UUID,)),
+    ],
+)
+def test_invalid(cursor, types):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, *types)
+
+
+def test_invalid_cursor_is_value_error():
+    assert issubclass(InvalidCursor, ValueError)
+
+
+def test_aware_datetime_round_trip():
+    moment = datetime(2026, 10, 18, 12, 30, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(moment), datetime.fromisoformat) == (
+        moment.replace(tzinfo=None),
+    )
@@ -0,0 +1,47 @@
+import uuid
+
+from redis.exceptions import ConnectionError
+
+from app.services import presence as presence_module
+from app.services.presence import Presence
+
+
+async def test_online_while_any_worker_holds_a_socket(redis):
+    first, second = Presence(redis), Presence(redis)
+    user, other = uuid.uuid4(), uuid.uuid4()
+    await first.mark_online(user)
+    await second.mark_online(user)
+    assert await first.online([user, other]) == {user}
+
+    await first.mark_offline(user)
+    assert await first.online([user]) == {user}
+    await second.mark_offline(user)
+    assert await first.online([user]) == set()
+
+
+async def test_claims_of_a_crashed_worker_lapse(redis, monkeypatch):
+    crashed, alive = Presence(redis, ttl_seconds=90), Presence(redis, ttl_seconds=90)
+    user = uuid.uuid4()
+    now = 1_000_000.0
+    monkeypatch.setattr(presence_module.time, "time", lambda: now)
+    await crashed.mark_online(user)
+
+    now += 60
+    assert await alive.online([user]) == {user}
+    now += 60
+    assert await alive.online([user]) == set()
+
+
+async def test_nobody_is_online_when_redis_fails():
+    class BrokenRedis:
+        def pipeline(self, transaction=True):
+            raise ConnectionError("redis is down")
+
+        async def zrem(self, *args):
+            raise ConnectionError("redis is down")
+
+    presence = Presence(BrokenRedis())
+    user = uuid.uuid4()
+    await presence.mark_online(user)
+    await presence.mark_offline(user)
+    assert await presence.online([user]) == set()
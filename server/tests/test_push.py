@@ -0,0 +1,55 @@
+from app.core.config import settings
+from app.services.push import (
+    Delivery,
+    FakePushProvider,
+    PushDispatcher,
+    PushMessage,
+    get_push_provider,
+)
+
+MESSAGE = PushMessage(title="聚会提醒", body="15 分钟后开始")
+
+
+def deliveries(count):
+    return [Delivery(f"token-{i}", MESSAGE) for i in range(count)]
+
+
+async def test_dispatch_batches_and_prunes_invalid_tokens():
+    provider = FakePushProvider(max_batch_size=4, invalid_tokens={"token-3"})
+    dispatcher = PushDispatcher(provider, batch_size=10)
+    report = await dispatcher.dispatch(deliveries(10))
+    assert report.sent == 9
+    assert report.invalid_tokens == {"token-3"}
+    assert report.batches == 3
+
+
+async def test_transient_failures_are_retried():
+    provider = FakePushProvider(failure_rate=0.5, seed=1)
+    dispatcher = PushDispatcher(provider, max_attempts=10, retry_base_seconds=0)
+    report = await dispatcher.dispatch(deliveries(50))
+    assert report.sent == 50
+    assert report.retries > 0
+
+
+async def test_fake_provider_keeps_a_bounded_log():
+    provider = FakePushProvider(keep=5)
+    await PushDispatcher(provider).dispatch(deliveries(20))
+    assert provider.delivered == 20
+    assert [delivery.token for delivery in provider.sent] == [f"token-{i}" for i in range(15, 20)]
+
+
+def test_fake_provider_is_opt_in(monkeypatch):
+    monkeypatch.setattr(settings, "FIREBASE_SERVICE_ACCOUNT_KEY", "")
+    monkeypatch.setattr(settings, "PUSH_FAKE_PROVIDER", False)
+    assert get_push_provider() is None
+    monkeypatch.setattr(settings, "PUSH_FAKE_PROVIDER", True)
+    assert isinstance(get_push_provider(), FakePushProvider)
+
+
+async def test_dispatch_without_provider_drops_deliveries(monkeypatch):
+    monkeypatch.setattr(settings, "FIREBASE_SERVICE_ACCOUNT_KEY", "")
+    monkeypatch.setattr(settings, "PUSH_FAKE_PROVIDER", False)
+    dispatcher = PushDispatcher()
+    report = await dispatcher.dispatch(deliveries(3))
+    assert (report.sent, report.failed) == (0, 3)
+    assert dispatcher.stats()["failed"] == 3
@@ -0,0 +1,73 @@
+import random
+import uuid
+from types import SimpleNamespace
+
+from app.core import geo
+from app.models.session import SquareCard
+from app.services.square import SquareService
+
+SHANGHAI = (31.2304, 121.4737)
+
+
+class FakeDatabase:
+    """Answers the nearby query from a list of cards, recording the cells scanned."""
+
+    def __init__(self, cards):
+        self.cards = cards
+        self.scans = []
+
+    async def execute(self, stmt):
+        bounds = [value for value in stmt.compile().params.values() if isinstance(value, str)]
+        cells = bounds[::2]
+        self.scans.append(cells)
+        found = [
+            card
+            for card in self.cards
+            if any(cell <= card.geohash < cell + geo.PREFIX_END for cell in cells)
+        ]
+        return SimpleNamespace(scalars=lambda: found)
+
+
+def make_cards(count, spread_km, seed=0):
+    rng = random.Random(seed)
+    km_per_deg = 111.195
+    cards = []
+    for _ in range(count):
+        lat = SHANGHAI[0] + rng.uniform(-spread_km, spread_km) / km_per_deg
+        lng = SHANGHAI[1] + rng.uniform(-spread_km, spread_km) / (km_per_deg * 0.855)
+        cards.append(
+            SquareCard(
+                session_id=uuid.UUID(int=rng.getrandbits(128)),
+                latitude=lat,
+                longitude=lng,
+                geohash=geo.encode(lat, lng),
+            )
+        )
+    return cards
+
+
+async def test_nearby_pages_through_every_card_in_order():
+    cards = make_cards(300, 12.0)
+    db = FakeDatabase(cards)
+    expected = sorted(
+        (geo.haversine_km(*SHANGHAI, card.latitude, card.longitude), card.session_id)
+        for card in cards
+    )
+    expected = [key for key in expected if key[0] <= 10.0]
+
+    seen, after = [], None
+    while True:
+        page, after = await SquareService.nearby(db, *SHANGHAI, 10.0, after, limit=25)
+        seen += [(distance, card.session_id) for card, distance in page]
+        if after is None:
+            break
+    assert seen == expected
+
+
+async def test_later_pages_skip_cells_inside_the_cursor():
+    db = FakeDatabase(make_cards(400, 8.0))
+    after = (5.0, uuid.UUID(int=0))
+    await SquareService.nearby(db, *SHANGHAI, 8.0, after, limit=1)
+    for cells in db.scans:
+        assert all(geo.max_distance_km(*SHANGHAI, cell) >= 5.0 for cell in cells)
+    assert geo.encode(*SHANGHAI, len(db.scans[0][0])) not in db.scans[0]
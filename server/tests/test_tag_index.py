@@ -0,0 +1,39 @@
+from app.services.tag_index import TagIndex
+
+COUNTS = {"金毛": 9, "金毛控": 4, "柯基": 7, "柯基短腿": 2, "遛狗": 5}
+
+
+def test_suggest_orders_by_count():
+    index = TagIndex(COUNTS, top_k=3)
+    assert index.suggest("") == [("金毛", 9), ("柯基", 7), ("遛狗", 5)]
+    assert index.suggest("柯") == [("柯基", 7), ("柯基短腿", 2)]
+    assert index.suggest("猫") == []
+    assert len(index) == 5
+
+
+def test_limit_is_capped_by_top_k():
+    index = TagIndex(COUNTS, top_k=2)
+    assert index.suggest("", limit=1) == [("金毛", 9)]
+    assert len(index.suggest("", limit=10)) == 2
+
+
+def test_add_new_tag_and_promote():
+    index = TagIndex(COUNTS, top_k=2)
+    index.add("金毛控", 10)
+    index.add("金毛宝宝")
+    assert index.suggest("金") == [("金毛控", 14), ("金毛", 9)]
+    assert index.suggest("金毛宝") == [("金毛宝宝", 1)]
+
+
+def test_demoted_tag_falls_behind_unlisted_one():
+    index = TagIndex(COUNTS, top_k=2)
+    index.set("金毛", 1)
+    assert index.suggest("") == [("柯基", 7), ("遛狗", 5)]
+
+
+def test_long_prefix_uses_range_scan():
+    counts = {"abcdefghij": 1, "abcdefghik": 3, "abcdefghx": 5}
+    index = TagIndex(counts, top_k=5, max_prefix=4)
+    assert index.suggest("abcdefghi") == [("abcdefghik", 3), ("abcdefghij", 1)]
+    index.add("abcdefghij", 5)
+    assert index.suggest("abcdefghi") == [("abcdefghij", 6), ("abcdefghik", 3)]
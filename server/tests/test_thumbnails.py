@@ -0,0 +1,101 @@
+import io
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from PIL import Image
+
+from app.services import thumbnails
+from app.services.thumbnails import (
+    InvalidImage,
+    ThumbnailPool,
+    ThumbnailsUnavailable,
+    render_thumbnails,
+)
+
+
+def encode(width, height, fmt="PNG"):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(out, fmt)
+    return out.getvalue()
+
+
+def test_render_scales_to_each_size():
+    rendered = render_thumbnails(encode(400, 200, "JPEG"), (64, 256))
+    assert (rendered.width, rendered.height) == (400, 200)
+    assert set(rendered.images) == {64, 256}
+    with Image.open(io.BytesIO(rendered.images[64])) as image:
+        assert image.format == "WEBP"
+        assert image.size == (64, 32)
+
+
+def test_render_rejects_unreadable_bytes():
+    with pytest.raises(InvalidImage):
+        render_thumbnails(b"not an image", (64,))
+
+
+@pytest.mark.parametrize("limit", [300, 100])
+def test_render_rejects_images_over_the_pixel_limit(monkeypatch, limit):
+    # 400 pixels is under twice 300, where Pillow only warns, and over twice 100
+    monkeypatch.setattr(thumbnails, "MAX_IMAGE_PIXELS", limit)
+    with pytest.raises(InvalidImage):
+        render_thumbnails(encode(20, 20), (8,))
+
+
+def test_render_accepts_images_at_the_pixel_limit(monkeypatch):
+    monkeypatch.setattr(thumbnails, "MAX_IMAGE_PIXELS", 400)
+    assert render_thumbnails(encode(20, 20), (8,)).images
+
+
+class BrokenExecutor:
+    """Fails every task the way a pool whose worker was killed does."""
+
+    def __init__(self, *args, **kwargs):
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("a worker exited"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def executors(*kinds):
+    """Stand in for ProcessPoolExecutor, handing out ``kinds`` in turn."""
+    made = []
+
+    def make(max_workers, mp_context):
+        executor = kinds[len(made)](max_workers=max_workers)
+        made.append(executor)
+        return executor
+
+    return make, made
+
+
+async def test_render_restarts_a_broken_pool(monkeypatch):
+    make, made = executors(BrokenExecutor, ThreadPoolExecutor)
+    monkeypatch.setattr(thumbnails, "ProcessPoolExecutor", make)
+    pool = ThumbnailPool(workers=1, sizes=(16,))
+
+    rendered = await pool.render(encode(32, 32))
+    assert set(rendered.images) == {16}
+    assert made[0].shut_down
+    assert pool._executor is made[1]
+    assert pool.stats()["restarts"] == 1
+    pool.shutdown()
+
+
+async def test_render_gives_up_after_a_second_broken_pool(monkeypatch):
+    make, made = executors(BrokenExecutor, BrokenExecutor, ThreadPoolExecutor)
+    monkeypatch.setattr(thumbnails, "ProcessPoolExecutor", make)
+    pool = ThumbnailPool(workers=1, sizes=(16,))
+
+    with pytest.raises(ThumbnailsUnavailable):
+        await pool.render(encode(32, 32))
+    assert pool.stats()["restarts"] == 2
+    assert pool.stats()["in_flight"] == 0
+    # The next upload gets a fresh pool
+    assert (await pool.render(encode(32, 32))).images
+    pool.shutdown()
@@ -0,0 +1,206 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.services.timeline import AUTHOR_PREFIX, HOME_PREFIX, Timelines, _bound, _score
+
+START = datetime(2026, 10, 18, 8, 0)
+
+
+class FakeFeed:
+    """An in-memory social graph standing in for the database.
+
+    Serves the few statements ``Timelines`` runs besides the feed query,
+    told apart by the columns they select.
+    """
+
+    def __init__(self):
+        self.posts = {}  # post id -> (author id, created_at)
+        self.follows = set()  # (follower, followee)
+        self.follower_counts = {}
+        self.feed_queries = 0
+
+    def follow(self, follower, followee):
+        self.follows.add((follower, followee))
+        self.follower_counts[followee] = self.follower_counts.get(followee, 0) + 1
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def scalar(self, stmt):
+        params = stmt.compile().params
+        return self.follower_counts.get(params["id_1"], 0)
+
+    async def scalars(self, stmt):
+        params = stmt.compile().params
+        (column,) = [column.key for column in stmt.selected_columns]
+        if column == "follower_id":
+            followers = sorted(
+                (follower for follower, followee in self.follows
+                 if followee == params["followee_id_1"]),
+                key=str,
+            )
+            if "follower_id_1" in params:
+                followers = [f for f in followers if str(f) > str(params["follower_id_1"])]
+            return followers[: params["param_1"]]
+        return [
+            followee
+            for follower, followee in self.follows
+            if follower == params["follower_id_1"]
+            and self.follower_counts.get(followee, 0) > params["follower_count_1"]
+        ]
+
+    async def execute(self, stmt):
+        params = stmt.compile().params
+        rows = sorted(
+            ((post_id, created_at) for post_id, (author, created_at) in self.posts.items()
+             if author == params["user_id_1"]),
+            key=lambda row: row[1],
+            reverse=True,
+        )
+        return rows[: params["param_1"]]
+
+    async def read_database(self, db, user_id, before, count):
+        self.feed_queries += 1
+        authors = {user_id} | {followee for follower, followee in self.follows
+                               if follower == user_id}
+        entries = sorted(
+            ((_score(created_at), str(post_id))
+             for post_id, (author, created_at) in self.posts.items() if author in authors),
+            reverse=True,
+        )
+        return [entry for entry in entries if before is None or entry[0] < before][:count]
+
+
+@pytest.fixture
+def feed():
+    return FakeFeed()
+
+
+@pytest.fixture
+def timelines(feed, redis):
+    timelines = Timelines(feed, redis, max_length=50, fanout_limit=3, batch_size=2)
+    timelines._read_database = feed.read_database
+    return timelines
+
+
+async def post(feed, timelines, author, minutes):
+    post_id, created_at = uuid.uuid4(), START + timedelta(minutes=minutes)
+    feed.posts[post_id] = (author, created_at)
+    await timelines.publish(post_id, author, created_at)
+    return post_id
+
+
+async def read_all(timelines, feed, user, limit=3):
+    ids, before = [], None
+    while True:
+        page, before = await timelines.page(feed, user, before, limit)
+        ids += page
+        if before is None:
+            return ids
+
+
+def newest_first(feed, post_ids):
+    return sorted(post_ids, key=lambda post_id: feed.posts[post_id][1], reverse=True)
+
+
+def test_score_and_bound():
+    assert _score(datetime(1970, 1, 1, 0, 0, 1, 5)) == 1_000_005.0
+    assert _score(START) == _score(START.replace(tzinfo=None))
+    assert _bound(None) == "+inf"
+    assert _bound(1_000_005) == "(1000005"
+
+
+def test_merge_dedupes_newest_first():
+    merged = Timelines._merge(
+        [[(9.0, "a"), (5.0, "b"), (1.0, "c")], [(7.0, "d"), (5.0, "b"), (2.0, "e")]], 4
+    )
+    assert merged == [(9.0, "a"), (7.0, "d"), (5.0, "b"), (2.0, "e")]
+
+
+async def test_fan_out_and_paging(feed, timelines):
+    reader, authors = uuid.uuid4(), [uuid.uuid4() for _ in range(2)]
+    followers = [uuid.uuid4() for _ in range(2)]
+    for author in authors:
+        feed.follow(reader, author)
+        for follower in followers:
+            feed.follow(follower, author)
+    posts = [await post(feed, timelines, authors[n % 2], n) for n in range(10)]
+
+    assert await read_all(timelines, feed, reader) == newest_first(feed, posts)
+    # One rebuild on the first read, then every page comes from Redis
+    assert timelines.rebuilds == 1 and feed.feed_queries == 1
+    assert timelines.stats()["timelines_written"] == 10 * 3
+
+
+async def test_cursor_is_exclusive(feed, timelines):
+    reader, author = uuid.uuid4(), uuid.uuid4()
+    feed.follow(reader, author)
+    posts = [await post(feed, timelines, author, n) for n in range(3)]
+    first, before = await timelines.page(feed, reader, None, 1)
+    assert first == [posts[2]]
+    assert before == int(_score(START + timedelta(minutes=2)))
+    assert (await timelines.page(feed, reader, before, 5))[0] == [posts[1], posts[0]]
+
+
+async def test_falls_back_to_database_past_the_capped_window(feed, redis):
+    timelines = Timelines(feed, redis, max_length=5, fanout_limit=3)
+    timelines._read_database = feed.read_database
+    reader, author = uuid.uuid4(), uuid.uuid4()
+    feed.follow(reader, author)
+    await timelines.page(feed, reader)  # builds the empty timeline
+    posts = [await post(feed, timelines, author, n) for n in range(8)]
+    assert await redis.zcard(HOME_PREFIX + str(reader)) == 5
+    queries = feed.feed_queries
+
+    page, before = await timelines.page(feed, reader, None, 4)
+    assert page == newest_first(feed, posts)[:4]
+    assert feed.feed_queries == queries
+    page, before = await timelines.page(feed, reader, before, 4)
+    assert page == newest_first(feed, posts)[4:]
+    assert feed.feed_queries == queries + 1
+
+
+async def test_large_authors_are_pulled_on_read(feed, timelines):
+    star, friend = uuid.uuid4(), uuid.uuid4()
+    readers = [uuid.uuid4() for _ in range(4)]
+    for reader in readers:
+        feed.follow(reader, star)
+    feed.follow(readers[0], friend)
+
+    star_posts = [await post(feed, timelines, star, n) for n in range(0, 6, 2)]
+    friend_posts = [await post(feed, timelines, friend, n) for n in range(1, 6, 2)]
+    assert timelines.stats()["timelines_written"] == 0 + 1 * 3
+
+    expected = newest_first(feed, star_posts + friend_posts)
+    assert await read_all(timelines, feed, readers[0], limit=2) == expected
+    assert await read_all(timelines, feed, readers[1]) == newest_first(feed, star_posts)
+
+    # An expired author set is reloaded from the author's posts
+    await timelines.redis.delete(AUTHOR_PREFIX + str(star))
+    assert await read_all(timelines, feed, readers[0], limit=2) == expected
+    assert await timelines.redis.zcard(AUTHOR_PREFIX + str(star)) == 3
+
+
+async def test_reads_database_when_redis_fails(feed):
+    class BrokenRedis:
+        def pipeline(self, transaction=True):
+            raise ConnectionError("redis is down")
+
+    timelines = Timelines(feed, BrokenRedis())
+    timelines._read_database = feed.read_database
+    reader, author = uuid.uuid4(), uuid.uuid4()
+    feed.follow(reader, author)
+    assert await timelines.publish(uuid.uuid4(), author, START) == 0
+    feed.posts[uuid.uuid4()] = (author, START)
+    page, before = await timelines.page(feed, reader)
+    assert len(page) == 1 and before is None
+    assert timelines.stats()["database_fallbacks"] == 1